@@ -1,18 +1,23 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from typing import List, Optional
 from pydantic import BaseModel
 from app.services.analysis import AnalysisService
 from app.services.ai_agent import AIAgentService
-from app.services.latlong_client import LatLongClient
+from app.services.latlong_client import get_latlong_client
 from app.services.business_location_agent import get_business_location_agent
-from app.core.db import get_db_cursor, execute_query
+from app.core.db import get_db_cursor, execute_query, fetch_points_as_ndarray
 from cachetools import TTLCache
+from shapely import wkb
+from shapely.geometry import Point
+from shapely.prepared import prep
 from functools import wraps
+import asyncio
 import hashlib
 import json
+import numpy as np
 
 agent = AIAgentService()
-latlong_client = LatLongClient()
+latlong_client = get_latlong_client()
 router = APIRouter()
 
 # Request models
@@ -52,7 +57,9 @@ def cached(cache_instance):
 
 @router.get("/health")
 def health_check():
-    return {"status": "ok", "version": "0.1.0", "db": "postgis"}
+    from app.services.area_business_analyzer import caches_ready
+    return {"status": "ok", "version": "0.1.0", "db": "postgis",
+            "analyzer_ready": caches_ready()}
 
 @router.get("/cache/stats")
 def cache_stats():
@@ -98,7 +105,7 @@ def _get_points_cached(category: Optional[str], limit: int):
         """
         params = (min_lat, max_lat, min_lon, max_lon, limit)
     
-    results = execute_query(query, params)
+    results = execute_query(query, params, prepared=True)
     
     return [
         {"id": r[0], "name": r[1], "category": r[2], "lat": r[3], "lon": r[4]}
@@ -156,7 +163,7 @@ def _get_viewport_cached(min_lat, min_lon, max_lat, max_lon, limit, buffer_frac)
     params = (q_min_lat, q_max_lat, q_min_lon, q_max_lon, limit)
 
     try:
-        results = execute_query(query, params)
+        results = execute_query(query, params, prepared=True)
     except Exception:
         # Fallback: if points_area/area_scores not available, query delhi_points directly
         fallback_q = """
@@ -212,7 +219,7 @@ def _search_areas_cached(q: str, limit: int):
     """
     search_term = f"%{q}%"
     starts_with = f"{q}%"
-    results = execute_query(query, (search_term, q, starts_with, limit))
+    results = execute_query(query, (search_term, q, starts_with, limit), prepared=True)
     
     return [{
         "id": r[0],
@@ -243,7 +250,7 @@ def _search_pois_cached(q: str, limit: int):
     """
     search_term = f"%{q}%"
     starts_with = f"{q}%"
-    results = execute_query(query, (search_term, q, starts_with, limit))
+    results = execute_query(query, (search_term, q, starts_with, limit), prepared=True)
     
     return [{
         "id": r[0],
@@ -293,7 +300,7 @@ def _search_categories_cached(q: str, limit: int):
     """
     search_term = f"%{q}%"
     starts_with = f"{q}%"
-    results = execute_query(query, (search_term, q, starts_with, limit))
+    results = execute_query(query, (search_term, q, starts_with, limit), prepared=True)
     
     return [{
         "category": r[0],
@@ -340,7 +347,7 @@ def _search_super_categories_cached(q: str, limit: int):
     """
     search_term = f"%{q}%"
     starts_with = f"{q}%"
-    results = execute_query(query, (search_term, q, starts_with, limit))
+    results = execute_query(query, (search_term, q, starts_with, limit), prepared=True)
     
     return [{
         "super_category": r[0],
@@ -362,7 +369,7 @@ def _get_pois_by_category_cached(category: str, limit: int):
         WHERE category = %s
         LIMIT %s
     """
-    results = execute_query(query, (category, limit))
+    results = execute_query(query, (category, limit), prepared=True)
     
     return [{
         "id": r[0],
@@ -386,7 +393,7 @@ def _get_pois_by_super_category_cached(super_category: str, limit: int):
         WHERE super_category = %s
         LIMIT %s
     """
-    results = execute_query(query, (super_category, limit))
+    results = execute_query(query, (super_category, limit), prepared=True)
     
     return [{
         "id": r[0],
@@ -422,7 +429,7 @@ def _unified_search_cached(q: str, limit: int):
     """
     search_term = f"%{q}%"
     starts_with = f"{q}%"
-    areas = execute_query(area_query, (search_term, q, starts_with, per_type_limit))
+    areas = execute_query(area_query, (search_term, q, starts_with, per_type_limit), prepared=True)
     for r in areas:
         results.append({
             "id": r[0],
@@ -446,7 +453,7 @@ def _unified_search_cached(q: str, limit: int):
             count DESC
         LIMIT %s
     """
-    categories = execute_query(cat_query, (search_term, q, starts_with, per_type_limit))
+    categories = execute_query(cat_query, (search_term, q, starts_with, per_type_limit), prepared=True)
     for r in categories:
         results.append({
             "name": r[0],
@@ -468,7 +475,7 @@ def _unified_search_cached(q: str, limit: int):
             count DESC
         LIMIT %s
     """
-    super_cats = execute_query(super_query, (search_term, q, starts_with, per_type_limit))
+    super_cats = execute_query(super_query, (search_term, q, starts_with, per_type_limit), prepared=True)
     for r in super_cats:
         results.append({
             "name": r[0],
@@ -491,7 +498,7 @@ def _unified_search_cached(q: str, limit: int):
                 name
             LIMIT %s
         """
-        pois = execute_query(poi_query, (search_term, q, starts_with, min(remaining, per_type_limit)))
+        pois = execute_query(poi_query, (search_term, q, starts_with, min(remaining, per_type_limit)), prepared=True)
         for r in pois:
             results.append({
                 "id": r[0],
@@ -535,16 +542,19 @@ def get_delhi_bounds():
 def check_point_in_delhi(lat: float, lon: float):
     """
     Check if a point is within the Delhi city boundary polygon.
-    Uses actual geometry for precise validation.
+    Uses actual geometry for precise validation, tested in-process against
+    the cached, prepared boundary instead of a database round-trip per point.
     """
-    query = """
-        SELECT ST_Contains(geom, ST_SetSRID(ST_Point(%s, %s), 4326)) as is_inside
-        FROM delhi_city
-        LIMIT 1
-    """
-    result = execute_query(query, (lon, lat), fetch="one")
-    
-    return {"is_inside": bool(result[0]) if result else False}
+    boundary = _delhi_city_boundary()
+    return {"is_inside": bool(boundary is not None and boundary.contains(Point(lon, lat)))}
+
+@cached(static_cache)
+def _delhi_city_boundary():
+    """Prepared Delhi city polygon (indexes its edges for fast repeated contains checks)"""
+    result = execute_query("SELECT ST_AsBinary(geom) FROM delhi_city LIMIT 1", fetch="one")
+    if not result or result[0] is None:
+        return None
+    return prep(wkb.loads(bytes(result[0])))
 
 @router.get("/pincodes", response_model=List[dict])
 def get_pincodes():
@@ -576,42 +586,70 @@ def analyze_clusters(locations: List[List[float]]):
     result = AnalysisService.cluster_competitors(locations)
     return result
 
+# Most POIs one category-clustering request will run DBSCAN on; larger
+# categories are clustered on a fixed-seed random sample of this size
+MAX_CLUSTER_POINTS = 20_000
+
+@router.get("/analyze/clusters")
+def analyze_category_clusters(category: str, eps_km: float = 0.5, min_samples: int = 3):
+    """
+    Cluster a category's POIs straight from PostGIS (sampled down to
+    MAX_CLUSTER_POINTS for very large categories).
+    """
+    coords = fetch_points_as_ndarray(category)
+    total_points = len(coords)
+    if total_points > MAX_CLUSTER_POINTS:
+        # Same sample for the same data, so repeated requests agree
+        keep = np.random.default_rng(0).choice(total_points, MAX_CLUSTER_POINTS, replace=False)
+        coords = coords[np.sort(keep)]
+    result = AnalysisService.cluster_competitors(coords, eps_km=eps_km, min_samples=min_samples)
+    result["total_points"] = total_points
+    result["sampled"] = total_points > MAX_CLUSTER_POINTS
+    return result
+
 @router.post("/chat")
-def chat(message: dict):
+async def chat(message: dict):
     """
     Input: {"message": "Show me competitors"}
     Output: {"text": "...", "actions": [...]}
     """
     user_text = message.get("message", "")
-    response = agent.process_message(user_text)
+    response = await agent.process_message(user_text)
     return response
 
+# Builds a GeoJSON FeatureCollection inside PostGIS and returns it as text,
+# so geometries are serialized once and never parsed in Python.
+FEATURE_COLLECTION_SQL = """
+    SELECT json_build_object(
+        'type', 'FeatureCollection',
+        'features', COALESCE(json_agg(json_build_object(
+            'type', 'Feature',
+            'geometry', ST_AsGeoJSON(geom)::json,
+            'properties', json_build_object('name', name)
+        )), '[]'::json)
+    )::text
+    FROM ({source}) AS src
+"""
+EMPTY_FEATURE_COLLECTION = '{"type": "FeatureCollection", "features": []}'
+
+def geojson_response(content: str) -> Response:
+    """Wrap pre-serialized GeoJSON text in a JSON response"""
+    return Response(content=content, media_type="application/json")
+
 @router.get("/delhi_boundary")
 def get_delhi_boundary():
     """Get Delhi city boundary as GeoJSON (cached 1 hour)."""
-    return _get_delhi_boundary_cached()
+    return geojson_response(_get_delhi_boundary_cached())
 
 @cached(static_cache)
 def _get_delhi_boundary_cached():
     try:
-        query = "SELECT ST_AsGeoJSON(geom) as geometry, name FROM delhi_city LIMIT 1"
-        results = execute_query(query)
-        
-        features = []
-        for r in results:
-            features.append({
-                "type": "Feature",
-                "geometry": json.loads(r[0]),
-                "properties": {"name": r[1]}
-            })
-        
-        return {
-            "type": "FeatureCollection",
-            "features": features
-        }
+        query = FEATURE_COLLECTION_SQL.format(source="SELECT geom, name FROM delhi_city LIMIT 1")
+        result = execute_query(query, fetch="one")
+        return result[0] if result else EMPTY_FEATURE_COLLECTION
     except Exception as e:
         print(f"Error fetching boundary: {e}")
-        return {"type": "FeatureCollection", "features": []}
+        return EMPTY_FEATURE_COLLECTION
 
 
 # ============================================
@@ -704,7 +742,7 @@ def _external_landmarks_cached(lat: float, lon: float):
 # ============================================
 
 @router.post("/recommend/location")
-def recommend_business_location(request: LocationRecommendRequest):
+async def recommend_business_location(request: LocationRecommendRequest):
     """
     Recommend top 3 areas for a business based on user query.
     
@@ -718,8 +756,8 @@ def recommend_business_location(request: LocationRecommendRequest):
     Returns top 3 areas with their centroids for map highlighting.
     """
     try:
-        location_agent = get_business_location_agent()
-        result = location_agent.recommend_locations(
+        location_agent = await asyncio.to_thread(get_business_location_agent)
+        result = await location_agent.arecommend_locations(
             request.query, 
             request.radius_km,
             request.deep_research
@@ -751,26 +789,14 @@ def get_area_geometry(names: str):
     """
     area_list = [n.strip() for n in names.split(',') if n.strip()]
     if not area_list:
-        return {"type": "FeatureCollection", "features": []}
-    
-    placeholders = ','.join(['%s'] * len(area_list))
-    query = f"""
-        SELECT name, ST_AsGeoJSON(geom) as geojson
-        FROM delhi_area
-        WHERE name IN ({placeholders})
-    """
-    results = execute_query(query, tuple(area_list))
+        return geojson_response(EMPTY_FEATURE_COLLECTION)
     
-    features = []
-    if results:
-        for row in results:
-            features.append({
-                "type": "Feature",
-                "properties": {"name": row[0]},
-                "geometry": json.loads(row[1])
-            })
+    query = FEATURE_COLLECTION_SQL.format(
+        source="SELECT geom, name FROM delhi_area WHERE name = ANY(%s)"
+    )
+    result = execute_query(query, (area_list,), fetch="one")
     
-    return {"type": "FeatureCollection", "features": features}
+    return geojson_response(result[0] if result else EMPTY_FEATURE_COLLECTION)
 
 
 # ============================================
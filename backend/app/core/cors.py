@@ -0,0 +1,72 @@
+"""
+Minimal CORS middleware for the allow-all prototype policy.
+Equivalent to Starlette's CORSMiddleware with allow_origins=["*"],
+allow_methods=["*"], allow_headers=["*"] and allow_credentials=True,
+but with all response headers pre-encoded so no per-request list scans
+or lowercasing are needed.
+"""
+
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+MAX_AGE = b"600"
+
+# Sent on every CORS response (the origin itself is echoed per request,
+# since browsers reject "*" on credentialed requests)
+_SIMPLE_HEADERS = (
+    (b"access-control-allow-credentials", b"true"),
+    (b"vary", b"Origin"),
+)
+
+_PREFLIGHT_HEADERS = _SIMPLE_HEADERS + (
+    (b"access-control-allow-methods", ALLOW_METHODS),
+    (b"access-control-max-age", MAX_AGE),
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", b"2"),
+)
+_PREFLIGHT_BODY = {"type": "http.response.body", "body": b"OK"}
+
+
+class FastCORS:
+    """ASGI middleware implementing the allow-all CORS policy."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        
+        # Not a cross-origin request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        # Preflight: answer directly without touching the app
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = [(b"access-control-allow-origin", origin), *_PREFLIGHT_HEADERS]
+            if request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send(_PREFLIGHT_BODY)
+            return
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"access-control-allow-origin", origin))
+                headers.extend(_SIMPLE_HEADERS)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
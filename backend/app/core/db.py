@@ -3,10 +3,15 @@ Database connection module for PostGIS with connection pooling.
 Supports concurrent reads for better UI performance.
 """
 import os
+import hashlib
+import io
+import re
 from contextlib import contextmanager
 from typing import Generator, Any
+import numpy as np
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extensions import connection as _PGConnection
 from psycopg2.extras import RealDictCursor
 
 # Database configuration from environment
@@ -18,13 +23,34 @@ DB_NAME = os.getenv("DB_NAME", "atlas_db")
 DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
 # Connection pool configuration
-MIN_CONNECTIONS = 10
-MAX_CONNECTIONS = 80
+# psycopg2 pools open MIN_CONNECTIONS eagerly and close any connection
+# returned beyond that count, so MIN_CONNECTIONS is also how many connections
+# (and their prepared statements) stay alive between bursts. Raise it towards
+# MAX_CONNECTIONS only when the server's max_connections leaves room.
+MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_SIZE", "80"))
+MIN_CONNECTIONS = min(int(os.getenv("DB_POOL_MIN_SIZE", "10")), MAX_CONNECTIONS)
+# Eager connections to fall back to if the server refuses MIN_CONNECTIONS
+FALLBACK_MIN_CONNECTIONS = 1
 
 # Global connection pool (thread-safe)
 _connection_pool: pool.ThreadedConnectionPool | None = None
 
 
+class PreparingConnection(_PGConnection):
+    """
+    psycopg2 connection that remembers which server-side prepared statements
+    exist in its session. Prepared statements live as long as the connection,
+    so pooled connections keep their plans across requests.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+
+
+# Matches psycopg2 placeholders (%s) and escaped percent signs (%%)
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
 def get_pool() -> pool.ThreadedConnectionPool:
     """
     Get or create the connection pool.
@@ -32,18 +58,30 @@ def get_pool() -> pool.ThreadedConnectionPool:
     """
     global _connection_pool
     if _connection_pool is None:
-        _connection_pool = pool.ThreadedConnectionPool(
-            MIN_CONNECTIONS,
-            MAX_CONNECTIONS,
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-        )
+        try:
+            _connection_pool = _create_pool(MIN_CONNECTIONS)
+        except psycopg2.OperationalError as e:
+            if MIN_CONNECTIONS <= FALLBACK_MIN_CONNECTIONS:
+                raise
+            print(f"Warning: could not open {MIN_CONNECTIONS} database connections ({e}); "
+                  f"retrying with {FALLBACK_MIN_CONNECTIONS}")
+            _connection_pool = _create_pool(FALLBACK_MIN_CONNECTIONS)
     return _connection_pool
 
 
+def _create_pool(min_connections: int) -> pool.ThreadedConnectionPool:
+    return pool.ThreadedConnectionPool(
+        min_connections,
+        MAX_CONNECTIONS,
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        connection_factory=PreparingConnection,
+    )
+
+
 @contextmanager
 def get_db_connection() -> Generator[Any, None, None]:
     """
@@ -91,7 +129,48 @@ def get_db_cursor(dict_cursor: bool = False) -> Generator[Any, None, None]:
             cursor.close()
 
 
-def execute_query(query: str, params: tuple = None, fetch: str = "all", dict_cursor: bool = False):
+def _to_prepared_sql(query: str) -> str:
+    """Convert psycopg2 %s placeholders to positional $n parameters for PREPARE."""
+    counter = 0
+    
+    def replace(match):
+        nonlocal counter
+        if match.group(0) == "%%":
+            return "%"
+        counter += 1
+        return f"${counter}"
+    
+    return _PLACEHOLDER_RE.sub(replace, query)
+
+
+def _execute_prepared(cursor, query: str, params: tuple = None):
+    """
+    Execute a query through a per-connection server-side prepared statement.
+    The statement is PREPAREd on first use and EXECUTEd on every later call,
+    so PostgreSQL skips parse and planning for hot queries.
+    """
+    name = f"p_{hashlib.md5(query.encode()).hexdigest()[:12]}"
+    conn = cursor.connection
+    prepared = getattr(conn, "prepared", None)
+    
+    if prepared is None:
+        # Connection was not created by our pool; run the query directly
+        cursor.execute(query, params)
+        return
+    
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {_to_prepared_sql(query)}")
+        prepared.add(name)
+    
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
+
+def execute_query(query: str, params: tuple = None, fetch: str = "all", dict_cursor: bool = False,
+                  prepared: bool = False):
     """
     Execute a query and return results.
     
@@ -100,12 +179,17 @@ def execute_query(query: str, params: tuple = None, fetch: str = "all", dict_cur
         params: Query parameters as tuple
         fetch: "all", "one", or "none"
         dict_cursor: Return rows as dicts
+        prepared: Run through a cached server-side prepared statement.
+            Use for hot, fixed-shape queries issued on every request.
     
     Returns:
         Query results based on fetch mode
     """
     with get_db_cursor(dict_cursor=dict_cursor) as cursor:
-        cursor.execute(query, params)
+        if prepared:
+            _execute_prepared(cursor, query, params)
+        else:
+            cursor.execute(query, params)
         if fetch == "all":
             return cursor.fetchall()
         elif fetch == "one":
@@ -113,6 +197,56 @@ def execute_query(query: str, params: tuple = None, fetch: str = "all", dict_cur
         return None
 
 
+# Binary COPY row layout for two non-null float8 columns:
+# int16 field count, then (int32 length, float8 value) per field
+_COPY_POINT_DTYPE = np.dtype([
+    ("nfields", ">i2"),
+    ("lat_len", ">i4"), ("lat", ">f8"),
+    ("lon_len", ">i4"), ("lon", ">f8"),
+])
+_COPY_HEADER_SIZE = 19   # signature (11) + flags (4) + extension length (4)
+_COPY_TRAILER_SIZE = 2   # int16 -1
+
+
+def fetch_points_as_ndarray(category: str = None, table: str = "delhi_points",
+                            category_column: str = "category") -> np.ndarray:
+    """
+    Fetch point coordinates straight into a NumPy array via binary COPY.
+    Avoids building a Python tuple per row.
+    
+    Args:
+        category: Optional category filter
+        table: Points table to read (delhi_points, points_super, ...)
+        category_column: Column the category filter applies to
+    
+    Returns:
+        Contiguous float64 array of shape (N, 2) with [lat, lon] rows
+    """
+    where = "WHERE geom IS NOT NULL"
+    params = None
+    if category:
+        where += f" AND {category_column} = %s"
+        params = (category,)
+    
+    buffer = io.BytesIO()
+    with get_db_cursor() as cursor:
+        select_sql = cursor.mogrify(
+            f"SELECT ST_Y(geom)::float8, ST_X(geom)::float8 FROM {table} {where}", params
+        ).decode()
+        cursor.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH (FORMAT binary)", buffer)
+    
+    data = buffer.getbuffer()
+    count = (len(data) - _COPY_HEADER_SIZE - _COPY_TRAILER_SIZE) // _COPY_POINT_DTYPE.itemsize
+    if count <= 0:
+        return np.empty((0, 2), dtype=np.float64)
+    
+    rows = np.frombuffer(data, dtype=_COPY_POINT_DTYPE, count=count, offset=_COPY_HEADER_SIZE)
+    coords = np.empty((count, 2), dtype=np.float64)
+    coords[:, 0] = rows["lat"]
+    coords[:, 1] = rows["lon"]
+    return coords
+
+
 def init_pool():
     """Initialize the connection pool explicitly."""
     get_pool()
@@ -126,127 +260,110 @@ def close_pool():
         _connection_pool = None
 
 
+# Schema bootstrap DDL, sent to the server as a single multi-statement batch
+SCHEMA_DDL = """
+    -- Enable PostGIS extension
+    CREATE EXTENSION IF NOT EXISTS postgis;
+    
+    -- Create delhi_city table
+    CREATE TABLE IF NOT EXISTS delhi_city (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        geom GEOMETRY(MULTIPOLYGON, 4326)
+    );
+    
+    -- Create delhi_area table
+    CREATE TABLE IF NOT EXISTS delhi_area (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        geom GEOMETRY(MULTIPOLYGON, 4326)
+    );
+    
+    -- Create delhi_pincode table
+    CREATE TABLE IF NOT EXISTS delhi_pincode (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(50),
+        geom GEOMETRY(MULTIPOLYGON, 4326)
+    );
+    
+    -- Create delhi_points table
+    CREATE TABLE IF NOT EXISTS delhi_points (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(500),
+        category VARCHAR(255),
+        geom GEOMETRY(POINT, 4326)
+    );
+    
+    -- Create areaWithCentroid view/table
+    CREATE TABLE IF NOT EXISTS area_with_centroid (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        longitude DOUBLE PRECISION,
+        latitude DOUBLE PRECISION
+    );
+    
+    -- Create areaScores table
+    CREATE TABLE IF NOT EXISTS area_scores (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        longitude DOUBLE PRECISION,
+        latitude DOUBLE PRECISION,
+        score_population_density DOUBLE PRECISION DEFAULT 0,
+        score_footfall DOUBLE PRECISION DEFAULT 0,
+        score_transit DOUBLE PRECISION DEFAULT 0,
+        score_traffic DOUBLE PRECISION DEFAULT 0,
+        score_rent_value DOUBLE PRECISION DEFAULT 0,
+        score_parking DOUBLE PRECISION DEFAULT 0,
+        score_night_activity DOUBLE PRECISION DEFAULT 0,
+        score_walkability DOUBLE PRECISION DEFAULT 0,
+        score_safety DOUBLE PRECISION DEFAULT 0,
+        score_poi_synergy DOUBLE PRECISION DEFAULT 0
+    );
+    
+    -- Create points_area table (points with area mapping)
+    CREATE TABLE IF NOT EXISTS points_area (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(500),
+        category VARCHAR(255),
+        geom GEOMETRY(POINT, 4326),
+        area VARCHAR(255)
+    );
+    
+    -- Create spatial indexes for performance
+    CREATE INDEX IF NOT EXISTS idx_delhi_city_geom ON delhi_city USING GIST(geom);
+    CREATE INDEX IF NOT EXISTS idx_delhi_area_geom ON delhi_area USING GIST(geom);
+    CREATE INDEX IF NOT EXISTS idx_delhi_pincode_geom ON delhi_pincode USING GIST(geom);
+    CREATE INDEX IF NOT EXISTS idx_delhi_points_geom ON delhi_points USING GIST(geom);
+    CREATE INDEX IF NOT EXISTS idx_points_area_geom ON points_area USING GIST(geom);
+    
+    -- Create indexes on name columns for search
+    CREATE INDEX IF NOT EXISTS idx_area_with_centroid_name ON area_with_centroid(name);
+    CREATE INDEX IF NOT EXISTS idx_area_scores_name ON area_scores(name);
+    CREATE INDEX IF NOT EXISTS idx_points_area_area ON points_area(area);
+    
+    -- Data version cached analyses are keyed on (bumped by the migration)
+    CREATE TABLE IF NOT EXISTS data_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0
+    );
+    INSERT INTO data_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+"""
+
+
 def init_postgis_schema():
     """
     Initialize PostGIS schema with required tables.
     Creates spatial indexes for performance.
+    All DDL is sent in one round-trip and committed atomically.
     """
     with get_db_cursor() as cursor:
-        # Enable PostGIS extension
-        cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
-        
-        # Create delhi_city table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS delhi_city (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255),
-                geom GEOMETRY(MULTIPOLYGON, 4326)
-            );
-        """)
-        
-        # Create delhi_area table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS delhi_area (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255),
-                geom GEOMETRY(MULTIPOLYGON, 4326)
-            );
-        """)
-        
-        # Create delhi_pincode table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS delhi_pincode (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(50),
-                geom GEOMETRY(MULTIPOLYGON, 4326)
-            );
-        """)
-        
-        # Create delhi_points table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS delhi_points (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(500),
-                category VARCHAR(255),
-                geom GEOMETRY(POINT, 4326)
-            );
-        """)
-        
-        # Create areaWithCentroid view/table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS area_with_centroid (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255),
-                longitude DOUBLE PRECISION,
-                latitude DOUBLE PRECISION
-            );
-        """)
-        
-        # Create areaScores table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS area_scores (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255),
-                longitude DOUBLE PRECISION,
-                latitude DOUBLE PRECISION,
-                score_population_density DOUBLE PRECISION DEFAULT 0,
-                score_footfall DOUBLE PRECISION DEFAULT 0,
-                score_transit DOUBLE PRECISION DEFAULT 0,
-                score_traffic DOUBLE PRECISION DEFAULT 0,
-                score_rent_value DOUBLE PRECISION DEFAULT 0,
-                score_parking DOUBLE PRECISION DEFAULT 0,
-                score_night_activity DOUBLE PRECISION DEFAULT 0,
-                score_walkability DOUBLE PRECISION DEFAULT 0,
-                score_safety DOUBLE PRECISION DEFAULT 0,
-                score_poi_synergy DOUBLE PRECISION DEFAULT 0
-            );
-        """)
-        
-        # Create points_area table (points with area mapping)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS points_area (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(500),
-                category VARCHAR(255),
-                geom GEOMETRY(POINT, 4326),
-                area VARCHAR(255)
-            );
-        """)
-        
-        # Create spatial indexes for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delhi_city_geom ON delhi_city USING GIST(geom);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delhi_area_geom ON delhi_area USING GIST(geom);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delhi_pincode_geom ON delhi_pincode USING GIST(geom);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delhi_points_geom ON delhi_points USING GIST(geom);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_points_area_geom ON points_area USING GIST(geom);")
-        
-        # Create indexes on name columns for search
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_area_with_centroid_name ON area_with_centroid(name);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_area_scores_name ON area_scores(name);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_points_area_area ON points_area(area);")
+        cursor.execute(SCHEMA_DDL)
         
     print("PostGIS schema initialized successfully.")
 
 
-# Legacy DuckDB support (for migration)
-def get_duckdb_connection():
-    """
-    Get a DuckDB connection for migration purposes.
-    """
-    import duckdb
-    from pathlib import Path
-    
-    duckdb_path = os.getenv("DUCKDB_PATH", "/app/data/delhi.db")
-    if not Path(duckdb_path).exists():
-        # Fallback for local development
-        backend_dir = Path(__file__).resolve().parent.parent.parent
-        project_root = backend_dir.parent
-        duckdb_path = str(project_root / "data" / "delhi.db")
-    
-    conn = duckdb.connect(duckdb_path)
-    conn.install_extension("spatial")
-    conn.load_extension("spatial")
-    return conn
+# Legacy DuckDB support (for migration) lives in its own module
+from app.core.duckdb_legacy import get_duckdb_connection  # noqa: E402,F401
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""
+Legacy DuckDB helpers.
+Only used by migration and seeding scripts; the API itself runs on PostGIS
+(see app.core.db).
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+def get_duckdb_path() -> str:
+    """Resolve the DuckDB file path (Docker path first, then local data/ dir)."""
+    duckdb_path = os.getenv("DUCKDB_PATH", "/app/data/delhi.db")
+    if not Path(duckdb_path).exists():
+        # Fallback for local development
+        backend_dir = Path(__file__).resolve().parent.parent.parent
+        project_root = backend_dir.parent
+        duckdb_path = str(project_root / "data" / "delhi.db")
+    return duckdb_path
+
+
+def _connect():
+    """Open a DuckDB connection with the spatial extension loaded."""
+    import duckdb
+    
+    conn = duckdb.connect(get_duckdb_path())
+    conn.install_extension("spatial")
+    conn.load_extension("spatial")
+    return conn
+
+
+@lru_cache(maxsize=1)
+def get_duckdb_connection():
+    """
+    Get the shared DuckDB connection for migration purposes.
+    The connection (and its extensions) is created once per process.
+    """
+    return _connect()
+
+
+def get_db_connection():
+    """
+    Get a new DuckDB connection owned by the caller.
+    Used by scripts that close the connection when they are done.
+    """
+    return _connect()
+
+
+def init_db():
+    """Create the base Delhi tables in DuckDB if they don't exist."""
+    conn = get_duckdb_connection()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS delhi_city (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR,
+            geom GEOMETRY
+        );
+        CREATE TABLE IF NOT EXISTS delhi_area (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR,
+            geom GEOMETRY
+        );
+        CREATE TABLE IF NOT EXISTS delhi_pincode (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR,
+            geom GEOMETRY
+        );
+        CREATE TABLE IF NOT EXISTS delhi_points (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR,
+            category VARCHAR,
+            geom GEOMETRY
+        );
+    """)
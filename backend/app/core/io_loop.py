@@ -0,0 +1,32 @@
+"""
+Shared background event loop for outbound async HTTP (web research, LatLong).
+Async clients keep their connection pools bound to the loop they first run
+on, so every such client lives on this one loop: synchronous code blocks on
+run_sync(), and other event loops (e.g. the server's) await await_on_io_loop().
+"""
+import asyncio
+import threading
+from typing import Optional
+
+_io_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_loop_lock = threading.Lock()
+
+
+def get_io_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared I/O event loop on first use"""
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None:
+            _io_loop = asyncio.new_event_loop()
+            threading.Thread(target=_io_loop.run_forever, name="io-loop", daemon=True).start()
+    return _io_loop
+
+
+def run_sync(coro):
+    """Run a coroutine on the I/O loop and block until it completes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_io_loop()).result()
+
+
+async def await_on_io_loop(coro):
+    """Await a coroutine that must run on the I/O loop from another event loop"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_io_loop()))
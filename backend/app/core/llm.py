@@ -0,0 +1,64 @@
+"""
+Shared Groq chat clients.
+Every agent gets its ChatGroq from get_groq_llm(), so all of them reuse one
+HTTP connection pool and the process-wide completion cache.
+"""
+import os
+import re
+import json
+from functools import cache
+from typing import Any, Optional
+
+import httpx
+from langchain_groq import ChatGroq
+
+from app.core.llm_cache import llm_cache
+
+# orjson for faster JSON decoding (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+GROQ_MODEL = "openai/gpt-oss-120b"
+
+# Connection pools shared by every client below: sync for invoke, async for
+# ainvoke (async calls all run on the shared I/O loop, app.core.io_loop)
+_http_client = httpx.Client()
+_http_async_client = httpx.AsyncClient()
+
+
+@cache
+def get_groq_llm(temperature: float = 0) -> Optional[ChatGroq]:
+    """Shared ChatGroq client for a sampling temperature, or None without GROQ_API_KEY"""
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        return None
+    return ChatGroq(
+        model=GROQ_MODEL,
+        temperature=temperature,
+        api_key=groq_api_key,
+        cache=llm_cache,
+        http_client=_http_client,
+        http_async_client=_http_async_client
+    )  # type: ignore
+
+
+async def aclose_groq_clients() -> None:
+    """Close the shared connection pools (await on the I/O loop, at shutdown)"""
+    _http_client.close()
+    await _http_async_client.aclose()
+
+
+# A reply wrapped in a markdown code fence (optionally tagged json): captures the body
+_FENCE_RE = re.compile(r'^```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
+def parse_llm_json(text: str) -> Any:
+    """Decode a JSON reply from an LLM, unwrapping a markdown code fence if present"""
+    text = text.strip()
+    match = _FENCE_RE.match(text)
+    if match:
+        text = match.group(1)
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
@@ -0,0 +1,12 @@
+"""
+Shared completion cache for the Groq chat models.
+Keys are the full prompt plus the model's parameters (model name,
+temperature, ...), so a repeated extraction or research prompt is served
+from memory instead of another API round-trip.
+"""
+from langchain_core.caches import InMemoryCache
+
+# Entries are evicted oldest-first once this many completions are cached
+LLM_CACHE_SIZE = 2048
+
+llm_cache = InMemoryCache(maxsize=LLM_CACHE_SIZE)
@@ -1,11 +1,16 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.api.routes import router
-from app.core.db import init_postgis_schema, init_pool, close_pool
+from app.core.db import init_postgis_schema, init_pool, close_pool, get_pool
+from app.core.cors import FastCORS
+from app.core.io_loop import await_on_io_loop
+from app.core.llm import aclose_groq_clients
+from app.services.area_business_analyzer import warm_caches
+from app.services.latlong_client import get_async_latlong_client, BulkheadFull
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -13,25 +18,31 @@ async def lifespan(app: FastAPI):
     # Startup
     init_pool()
     init_postgis_schema()
-    print("PostGIS connection pool initialized and schema ready")
+    print(f"PostGIS connection pool initialized ({get_pool().minconn} connections) and schema ready")
+    warm_caches()
     yield
     # Shutdown
+    await await_on_io_loop(get_async_latlong_client().aclose())
+    await await_on_io_loop(aclose_groq_clients())
     close_pool()
     print("PostGIS connection pool closed")
 
 app = FastAPI(title="Atlas API", version="0.1.0", lifespan=lifespan)
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], # Allow all for prototype
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS (allow all for prototype)
+app.add_middleware(FastCORS)
 
 app.include_router(router, prefix="/api/v1")
 
+@app.exception_handler(BulkheadFull)
+async def latlong_busy_handler(request: Request, exc: BulkheadFull):
+    """Shed load with 503 + Retry-After when the LatLong bulkhead is saturated."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,9 +1,10 @@
-from langchain_groq import ChatGroq
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, SystemMessage
 from typing import List, Dict, Any
+import asyncio
 import json
-import os
+from app.core.io_loop import await_on_io_loop
+from app.core.llm import get_groq_llm
 from app.services.text_to_sql_service import TextToSQLService
 
 # Define Tools
@@ -43,28 +44,34 @@ def query_database(question: str):
     - "Show me points by category"
     Returns structured data results from the database.
     """
-    sql_service = TextToSQLService()
-    result = sql_service.query_database_with_nl(question)
+    result = _get_sql_service().query_database_with_nl(question)
     return result
 
-class AIAgentService:
-    def __init__(self):
-        # Initialize ChatGroq with API key from environment
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
+TOOLS = [set_map_layer, get_delhi_info, query_database]
+
+# Shared clients (created lazily, reused across requests)
+_llm_with_tools = None
+_sql_service = None
+
+def _get_llm_with_tools():
+    """Get the shared ChatGroq client with tools bound"""
+    global _llm_with_tools
+    if _llm_with_tools is None:
+        llm = get_groq_llm(0)
+        if llm is None:
             raise ValueError("GROQ_API_KEY environment variable is not set")
-        
-        self.llm = ChatGroq(
-            model="openai/gpt-oss-120b",
-            temperature=0,
-            api_key=groq_api_key
-        )  # type: ignore
-        
-        # Bind tools to the LLM
-        self.tools = [set_map_layer, get_delhi_info, query_database]
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
-        
-        self.system_prompt = SystemMessage(content="""
+        _llm_with_tools = llm.bind_tools(TOOLS)
+    return _llm_with_tools
+
+def _get_sql_service() -> TextToSQLService:
+    """Get the shared TextToSQLService instance"""
+    global _sql_service
+    if _sql_service is None:
+        _sql_service = TextToSQLService()
+    return _sql_service
+
+class AIAgentService:
+    system_prompt = SystemMessage(content="""
         You are Atlas, an intelligent geospatial assistant.
         Your goal is to help users explore and analyze geographic data for Delhi, India (National Capital Territory).
         
@@ -92,11 +99,16 @@ class AIAgentService:
         Always be concise and professional.
         """)
 
-    def process_message(self, user_message: str) -> Dict[str, Any]:
+    def __init__(self):
+        self.tools = TOOLS
+        self.llm_with_tools = _get_llm_with_tools()
+
+    async def process_message(self, user_message: str) -> Dict[str, Any]:
         messages = [self.system_prompt, HumanMessage(content=user_message)]
         
-        # Invoke the LLM
-        result = self.llm_with_tools.invoke(messages)
+        # Invoke the LLM without blocking the event loop; the shared async
+        # connection pool lives on the I/O loop
+        result = await await_on_io_loop(self.llm_with_tools.ainvoke(messages))
         
         response_data = {
             "text": result.content,
@@ -124,10 +136,10 @@ class AIAgentService:
                     pass
                 
                 elif tool_name == "query_database":
-                    # Execute the database query tool
-                    from app.services.text_to_sql_service import TextToSQLService
-                    sql_service = TextToSQLService()
-                    query_result = sql_service.query_database_with_nl(tool_args.get("question", ""))
+                    # Execute the database query tool (blocking DuckDB/Groq calls run in a worker thread)
+                    query_result = await asyncio.to_thread(
+                        _get_sql_service().query_database_with_nl, tool_args.get("question", "")
+                    )
                     
                     response_data["actions"].append({
                         "type": "databaseQuery",
@@ -1,6 +1,6 @@
 import numpy as np
 from sklearn.cluster import DBSCAN
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
 class AnalysisService:
     
@@ -37,19 +37,23 @@ class AnalysisService:
         return round(score, 2)
 
     @staticmethod
-    def cluster_competitors(locations: List[List[float]], eps_km: float = 0.5, min_samples: int = 3) -> Dict[str, Any]:
+    def cluster_competitors(locations: Union[np.ndarray, List[List[float]]], eps_km: float = 0.5,
+                            min_samples: int = 3) -> Dict[str, Any]:
         """
         Performs DBSCAN clustering on competitor locations.
         
         Args:
-            locations: List of [lat, lon] coordinates.
+            locations: float64 array of shape (N, 2) with [lat, lon] rows
+                (e.g. from fetch_points_as_ndarray), or a list of [lat, lon] pairs.
             eps_km: The maximum distance between two samples for one to be considered as in the neighborhood of the other.
             min_samples: The number of samples (or total weight) in a neighborhood for a point to be considered as a core point.
             
         Returns:
             Dict containing cluster labels and centroids.
         """
-        if not locations:
+        # No copy when an (N, 2) float64 array is passed in
+        coords = np.asarray(locations, dtype=np.float64)
+        if coords.size == 0:
             return {"clusters": [], "noise": []}
             
         # Convert km to radians for use with haversine metric
@@ -59,36 +63,39 @@ class AnalysisService:
         
         # DBSCAN with haversine metric (expects radians)
         # Scikit-learn expects [lat, lon] in radians for haversine
-        coords_rad = np.radians(locations)
+        coords_rad = np.radians(coords)
         
         db = DBSCAN(eps=eps_rad, min_samples=min_samples, metric='haversine', algorithm='ball_tree').fit(coords_rad)
-        
         labels = db.labels_
         
-        # Process results
-        clusters = {}
-        noise = []
+        mask = labels != -1
+        noise = coords[~mask].tolist()
+        
+        # Sort clustered points by label so each cluster is a contiguous run,
+        # then compute all centroids with a single reduction.
+        clustered = coords[mask]
+        clustered_labels = labels[mask]
+        if clustered_labels.size == 0:
+            return {"clusters": [], "noise": noise}
+        
+        order = np.argsort(clustered_labels, kind='stable')
+        sorted_coords = clustered[order]
+        sorted_labels = clustered_labels[order]
+        
+        cluster_ids, starts, counts = np.unique(sorted_labels, return_index=True, return_counts=True)
+        sums = np.add.reduceat(sorted_coords, starts, axis=0)
+        centroids = sums / counts[:, None]
+        cluster_points = np.split(sorted_coords, starts[1:])
         
-        for idx, label in enumerate(labels):
-            point = locations[idx] # [lat, lon]
-            if label == -1:
-                noise.append(point)
-            else:
-                if label not in clusters:
-                    clusters[label] = []
-                clusters[label].append(point)
-                
-        # Calculate centroids for clusters
-        cluster_summaries = []
-        for label, points in clusters.items():
-            points_np = np.array(points)
-            centroid = np.mean(points_np, axis=0).tolist()
-            cluster_summaries.append({
+        cluster_summaries = [
+            {
                 "cluster_id": int(label),
-                "centroid": centroid,
-                "count": len(points),
-                "points": points
-            })
+                "centroid": centroid.tolist(),
+                "count": int(count),
+                "points": points.tolist()
+            }
+            for label, centroid, count, points in zip(cluster_ids, centroids, counts, cluster_points)
+        ]
             
         return {
             "clusters": cluster_summaries,
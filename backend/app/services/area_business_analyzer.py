@@ -4,49 +4,520 @@ Analyzes what businesses would be good to open in a specific area
 by looking at gaps (underserved categories) and complementary opportunities.
 """
 import os
-import pandas as pd
-from typing import Dict, List, Any, Optional
-from app.core.db import execute_query
-from app.services.location_recommender import WEIGHTS, COMPLEMENTARY_CATEGORIES
+import bisect
+import copy
+import csv
+import heapq
+import math
+import threading
+import h3
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+from typing import Dict, List, Any, Optional, Tuple
+from cachetools import LRUCache
+from cachetools.func import ttl_cache
+from sklearn.neighbors import BallTree
+from app.core.db import execute_query, fetch_points_as_ndarray
+
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+from app.services.location_recommender import (
+    COMPLEMENTARY_CATEGORIES, CRITERIA, WEIGHTS_MATRIX, SUPER_CATEGORY_INDEX
+)
 
 # Path to area scores CSV
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
 AREA_SCORES_CSV = os.path.join(DATA_DIR, 'Delhi_Areas_All_11_Criteria_Real_Data.csv')
 
 # Complementary business relationships
-COMPLEMENTARY_MAP = {
-    'Food & Beverages': ['Shopping & Retail', 'Entertainment & Leisure', 'Fitness & Wellness'],
-    'Shopping & Retail': ['Food & Beverages', 'Entertainment & Leisure', 'Financial & Legal Services'],
-    'Health & Medical': ['Fitness & Wellness', 'Food & Beverages', 'Shopping & Retail'],
-    'Education & Training': ['Food & Beverages', 'Shopping & Retail', 'Transport & Auto Services'],
-    'Fitness & Wellness': ['Health & Medical', 'Food & Beverages', 'Shopping & Retail'],
-    'Entertainment & Leisure': ['Food & Beverages', 'Shopping & Retail', 'Transport & Auto Services'],
-    'Accommodation & Lodging': ['Food & Beverages', 'Transport & Auto Services', 'Entertainment & Leisure'],
-    'Financial & Legal Services': ['Shopping & Retail', 'Food & Beverages', 'Education & Training'],
-    'Transport & Auto Services': ['Food & Beverages', 'Shopping & Retail', 'Accommodation & Lodging'],
-    'Parks & Outdoor Recreation': ['Food & Beverages', 'Fitness & Wellness', 'Entertainment & Leisure'],
-    'Religious & Spiritual Places': ['Food & Beverages', 'Shopping & Retail', 'Accommodation & Lodging'],
-    'Government & Public Services': ['Food & Beverages', 'Financial & Legal Services', 'Shopping & Retail'],
-    'Other / Misc': ['Food & Beverages', 'Shopping & Retail', 'Entertainment & Leisure'],
+COMPLEMENTARY_MAP: Dict[str, Tuple[str, ...]] = {
+    'Food & Beverages': ('Shopping & Retail', 'Entertainment & Leisure', 'Fitness & Wellness'),
+    'Shopping & Retail': ('Food & Beverages', 'Entertainment & Leisure', 'Financial & Legal Services'),
+    'Health & Medical': ('Fitness & Wellness', 'Food & Beverages', 'Shopping & Retail'),
+    'Education & Training': ('Food & Beverages', 'Shopping & Retail', 'Transport & Auto Services'),
+    'Fitness & Wellness': ('Health & Medical', 'Food & Beverages', 'Shopping & Retail'),
+    'Entertainment & Leisure': ('Food & Beverages', 'Shopping & Retail', 'Transport & Auto Services'),
+    'Accommodation & Lodging': ('Food & Beverages', 'Transport & Auto Services', 'Entertainment & Leisure'),
+    'Financial & Legal Services': ('Shopping & Retail', 'Food & Beverages', 'Education & Training'),
+    'Transport & Auto Services': ('Food & Beverages', 'Shopping & Retail', 'Accommodation & Lodging'),
+    'Parks & Outdoor Recreation': ('Food & Beverages', 'Fitness & Wellness', 'Entertainment & Leisure'),
+    'Religious & Spiritual Places': ('Food & Beverages', 'Shopping & Retail', 'Accommodation & Lodging'),
+    'Government & Public Services': ('Food & Beverages', 'Financial & Legal Services', 'Shopping & Retail'),
+    'Other / Misc': ('Food & Beverages', 'Shopping & Retail', 'Entertainment & Leisure'),
 }
 
 # Business examples for each super category
-BUSINESS_EXAMPLES = {
-    'Food & Beverages': ['Cafe', 'Restaurant', 'Bakery', 'Juice Bar', 'Cloud Kitchen', 'Food Truck'],
-    'Shopping & Retail': ['Clothing Store', 'Electronics Shop', 'Grocery Store', 'Bookstore', 'Gift Shop'],
-    'Health & Medical': ['Clinic', 'Pharmacy', 'Diagnostic Lab', 'Dental Clinic', 'Physiotherapy Center'],
-    'Education & Training': ['Coaching Center', 'Language School', 'Music Classes', 'Computer Training', 'Preschool'],
-    'Fitness & Wellness': ['Gym', 'Yoga Studio', 'Spa', 'Salon', 'Wellness Center'],
-    'Entertainment & Leisure': ['Gaming Zone', 'Bowling Alley', 'Escape Room', 'Art Studio', 'Dance Studio'],
-    'Accommodation & Lodging': ['Boutique Hotel', 'Guest House', 'Co-living Space', 'Service Apartment'],
-    'Financial & Legal Services': ['CA Office', 'Insurance Agency', 'Tax Consultant', 'Legal Consultancy'],
-    'Transport & Auto Services': ['Car Wash', 'Bike Service', 'Auto Parts Shop', 'Parking Facility'],
-    'Parks & Outdoor Recreation': ['Sports Academy', 'Adventure Sports', 'Outdoor Gym'],
-    'Religious & Spiritual Places': ['Meditation Center', 'Yoga Retreat'],
-    'Government & Public Services': ['Document Services', 'Notary'],
-    'Other / Misc': ['Co-working Space', 'Photography Studio', 'Pet Shop', 'Laundry Service'],
+BUSINESS_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    'Food & Beverages': ('Cafe', 'Restaurant', 'Bakery', 'Juice Bar', 'Cloud Kitchen', 'Food Truck'),
+    'Shopping & Retail': ('Clothing Store', 'Electronics Shop', 'Grocery Store', 'Bookstore', 'Gift Shop'),
+    'Health & Medical': ('Clinic', 'Pharmacy', 'Diagnostic Lab', 'Dental Clinic', 'Physiotherapy Center'),
+    'Education & Training': ('Coaching Center', 'Language School', 'Music Classes', 'Computer Training', 'Preschool'),
+    'Fitness & Wellness': ('Gym', 'Yoga Studio', 'Spa', 'Salon', 'Wellness Center'),
+    'Entertainment & Leisure': ('Gaming Zone', 'Bowling Alley', 'Escape Room', 'Art Studio', 'Dance Studio'),
+    'Accommodation & Lodging': ('Boutique Hotel', 'Guest House', 'Co-living Space', 'Service Apartment'),
+    'Financial & Legal Services': ('CA Office', 'Insurance Agency', 'Tax Consultant', 'Legal Consultancy'),
+    'Transport & Auto Services': ('Car Wash', 'Bike Service', 'Auto Parts Shop', 'Parking Facility'),
+    'Parks & Outdoor Recreation': ('Sports Academy', 'Adventure Sports', 'Outdoor Gym'),
+    'Religious & Spiritual Places': ('Meditation Center', 'Yoga Retreat'),
+    'Government & Public Services': ('Document Services', 'Notary'),
+    'Other / Misc': ('Co-working Space', 'Photography Studio', 'Pet Shop', 'Laundry Service'),
 }
 
+# Marker shown next to each recommendation type in the chat message
+RECOMMENDATION_EMOJI = {'gap': "🔵", 'complementary': "🟢"}
+
+# Density-ratio cut points and the trend bucket each interval maps to
+TREND_THRESHOLDS = (0.5, 1.2)
+TREND_BUCKETS = (
+    ("emerging", "🌱", "Emerging Market"),
+    ("growing", "📈", "Growing Market"),
+    ("saturated", "🔴", "Saturated Market"),
+)
+
+# Examples shown per recommendation, sliced once at import
+BUSINESS_EXAMPLES_TOP4 = {k: v[:4] for k, v in BUSINESS_EXAMPLES.items()}
+
+
+# Fixed super-category order used by the vectorized scoring below
+CATEGORIES = tuple(COMPLEMENTARY_MAP)
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+
+
+def _build_complementary_pairs():
+    """
+    Flatten COMPLEMENTARY_MAP into parallel edge arrays over CATEGORIES:
+    source index, target index, and the target's position in the source's list
+    """
+    edges = [
+        (CATEGORY_INDEX[category], CATEGORY_INDEX[comp_cat], position)
+        for category in CATEGORIES
+        for position, comp_cat in enumerate(COMPLEMENTARY_MAP[category])
+    ]
+    sources, targets, ranks = zip(*edges)
+    return np.array(sources), np.array(targets), np.array(ranks)
+
+
+COMP_SOURCES, COMP_TARGETS, COMP_RANKS = _build_complementary_pairs()
+
+
+def _build_adjacency(mapping: Dict[str, Any]) -> np.ndarray:
+    """(num_categories, num_categories) 0/1 matrix: row i marks CATEGORIES[i]'s complements"""
+    adjacency = np.zeros((len(CATEGORIES), len(CATEGORIES)), dtype=np.int64)
+    for category, comp_cats in mapping.items():
+        if category in CATEGORY_INDEX:
+            for comp_cat in comp_cats:
+                if comp_cat in CATEGORY_INDEX:
+                    adjacency[CATEGORY_INDEX[category], CATEGORY_INDEX[comp_cat]] = 1
+    adjacency.setflags(write=False)
+    return adjacency
+
+
+# Complement adjacency for gap ecosystems (COMPLEMENTARY_MAP) and for
+# complementary recommendations (the recommender's COMPLEMENTARY_CATEGORIES)
+GAP_ECOSYSTEM_ADJACENCY = _build_adjacency(COMPLEMENTARY_MAP)
+RECOMMENDER_ECOSYSTEM_ADJACENCY = _build_adjacency(COMPLEMENTARY_CATEGORIES)
+
+# Both maps stacked as (2 * num_categories, num_categories) so one matmul
+# yields the gap-ecosystem counts followed by the recommender-ecosystem counts
+ECOSYSTEM_ADJACENCY = np.vstack([GAP_ECOSYSTEM_ADJACENCY, RECOMMENDER_ECOSYSTEM_ADJACENCY])
+ECOSYSTEM_ADJACENCY.setflags(write=False)
+
+
+# H3 resolution of the points_super.h3_9 column (set by the migration script)
+H3_RESOLUTION = 9
+
+
+def h3_cells_covering(lat: float, lon: float, radius_km: float) -> List[int]:
+    """H3 cells (as integers) whose disk fully covers a circle of radius_km"""
+    center = h3.latlng_to_cell(lat, lon, H3_RESOLUTION)
+    # Local hexagon edge length, derived from the actual cell area
+    edge_km = math.sqrt(2 * h3.cell_area(center, unit='km^2') / (3 * math.sqrt(3)))
+    # Each ring advances at least 1.5 edges; one extra ring covers the
+    # offset between the point and its cell centre
+    k = math.ceil(radius_km / (1.5 * edge_km)) + 1
+    return [h3.str_to_int(cell) for cell in h3.grid_disk(center, k)]
+
+
+# City-wide aggregates only change when data is re-migrated
+DELHI_AGGREGATE_TTL = 3600  # 1 hour
+
+# Name lookups hit trigram GIN indexes on LOWER(name); results (including
+# misses) are memoized per normalized (stripped, lowercased) name and expire
+# with the city-wide aggregates
+NAME_LOOKUP_CACHE_SIZE = 1024
+
+# Most POIs averaged into a POI-name location centroid
+POI_MATCH_LIMIT = 5000
+
+
+@ttl_cache(maxsize=1, ttl=DELHI_AGGREGATE_TTL)
+def _load_all_area_distributions() -> Dict[str, Tuple[Tuple[str, int], ...]]:
+    """
+    The whole area_category_counts view (a few thousand rows) as
+    {lowercased area name: ((super_category, count), ...) largest first}
+    """
+    query = """
+        SELECT LOWER(area_name), super_category, cnt
+        FROM area_category_counts
+        ORDER BY LOWER(area_name), cnt DESC
+    """
+    distributions: Dict[str, List[Tuple[str, int]]] = {}
+    for area_name, category, count in execute_query(query, (), prepared=True) or []:
+        distributions.setdefault(area_name, []).append((category, count))
+    return {area_name: tuple(rows) for area_name, rows in distributions.items()}
+
+
+def _load_area_distribution(area_name: str) -> Tuple[Tuple[str, int], ...]:
+    """(super_category, count) pairs for an area, largest first"""
+    return _load_all_area_distributions().get(area_name, ())
+
+
+@ttl_cache(maxsize=NAME_LOOKUP_CACHE_SIZE, ttl=DELHI_AGGREGATE_TTL)
+def _get_area_centroid(area_name: str) -> Optional[Tuple[str, float, float]]:
+    """(name, lon, lat) of the area whose name matches exactly (case-insensitive)"""
+    query = """
+        SELECT name, longitude, latitude 
+        FROM area_with_centroid 
+        WHERE LOWER(name) = %s
+        LIMIT 1
+    """
+    results = execute_query(query, (area_name,), prepared=True)
+    if results:
+        name, lon, lat = results[0]
+        return name, lon, lat
+    return None
+
+
+# Fuzzy area matches are only a typo fallback ("laxmi nagr"): whole-string
+# similarity (RapidFuzz ratio, 0-100) strict enough that landmarks such as
+# "Khan Market" or "Red Fort" don't snap onto a similarly named area and
+# fall through to the POI-name search instead
+AREA_TYPO_CUTOFF = 88
+
+
+def match_area_name(area_name: str, candidates: List[str]) -> Optional[int]:
+    """
+    Index of the lowercased candidate matching area_name: exact match, then
+    the shortest name containing it, then (with RapidFuzz) a near-identical
+    spelling. None if nothing qualifies.
+    """
+    needle = area_name.strip().lower()
+    partial = None
+    for i, candidate in enumerate(candidates):
+        if candidate == needle:
+            return i
+        if needle in candidate and (partial is None or len(candidate) < len(candidates[partial])):
+            partial = i
+    if partial is not None:
+        return partial
+    if RAPIDFUZZ_AVAILABLE:
+        match = process.extractOne(needle, candidates, scorer=fuzz.ratio, score_cutoff=AREA_TYPO_CUTOFF)
+        return match[2] if match else None
+    return None
+
+
+@ttl_cache(maxsize=1, ttl=DELHI_AGGREGATE_TTL)
+def _load_area_centroids() -> Dict[str, Tuple[str, float, float]]:
+    """All areas as {lowercased name: (name, lon, lat)}, loaded once"""
+    query = "SELECT name, longitude, latitude FROM area_with_centroid"
+    results = execute_query(query, (), prepared=True)
+    return {name.lower(): (name, lon, lat) for name, lon, lat in results or [] if name}
+
+
+@ttl_cache(maxsize=NAME_LOOKUP_CACHE_SIZE, ttl=DELHI_AGGREGATE_TTL)
+def _find_area_with_centroid(area_name: str) -> Optional[Tuple[str, float, float]]:
+    """
+    Closest matching area as (name, lon, lat): exact match first, then the
+    shortest partial match, then (RapidFuzz, in memory) a typo-level match
+    """
+    if RAPIDFUZZ_AVAILABLE:
+        areas = _load_area_centroids()
+        if area_name in areas:
+            return areas[area_name]
+        names = list(areas)
+        match = match_area_name(area_name, names)
+        return areas[names[match]] if match is not None else None
+    
+    # Exact and partial matches are separate branches so the exact lookup
+    # is a plain equality probe instead of being ranked inside the LIKE scan
+    query = """
+        WITH exact AS (
+            SELECT name, longitude, latitude, 1 AS pri FROM area_with_centroid
+            WHERE LOWER(name) = %s
+            LIMIT 1
+        ),
+        partial AS (
+            SELECT name, longitude, latitude, 2 AS pri FROM area_with_centroid
+            WHERE LOWER(name) LIKE %s
+            ORDER BY LENGTH(name)
+            LIMIT 1
+        )
+        SELECT name, longitude, latitude
+        FROM (SELECT * FROM exact UNION ALL SELECT * FROM partial) s
+        ORDER BY pri
+        LIMIT 1
+    """
+    results = execute_query(query, (area_name, f"%{area_name}%"), prepared=True)
+    if results:
+        name, lon, lat = results[0]
+        return name, lon, lat
+    return None
+
+
+@ttl_cache(maxsize=NAME_LOOKUP_CACHE_SIZE, ttl=DELHI_AGGREGATE_TTL)
+def _find_location_from_pois(location_name: str) -> Optional[Dict]:
+    """Centroid of POIs whose name contains location_name"""
+    # Matches are capped so a very common substring can't turn the trigram
+    # index scan into a walk over most of the table
+    query = """
+        SELECT 
+            AVG(ST_X(geom)) as lon,
+            AVG(ST_Y(geom)) as lat,
+            COUNT(*) as count
+        FROM (
+            SELECT geom FROM points_super
+            WHERE LOWER(name) LIKE %s
+            LIMIT %s
+        ) matches
+    """
+    results = execute_query(query, (f"%{location_name}%", POI_MATCH_LIMIT), prepared=True)
+    if not results:
+        return None
+    lon, lat, count = results[0]
+    if lon is not None and count > 0:
+        return {
+            "name": location_name.title(),
+            "lon": float(lon),
+            "lat": float(lat),
+            "poi_count": int(count),
+            "source": "poi"
+        }
+    return None
+
+
+@ttl_cache(maxsize=1, ttl=DELHI_AGGREGATE_TTL)
+def _load_delhi_averages() -> Tuple[Dict[str, float], Tuple[str, ...], np.ndarray]:
+    """
+    Average POI count per super category from the delhi_category_avg view,
+    as the dict and the (categories, averages) arrays derived from it, so
+    both views always come from the same load
+    """
+    query = "SELECT super_category, avg_count FROM delhi_category_avg"
+    distribution = {category: float(avg_count) for category, avg_count in execute_query(query, (), prepared=True) or []}
+    averages = np.fromiter(distribution.values(), dtype=np.float64, count=len(distribution))
+    averages.setflags(write=False)
+    return distribution, tuple(distribution), averages
+
+
+def _load_delhi_average_distribution() -> Dict[str, float]:
+    """Dict view of _load_delhi_averages, for the response path"""
+    return _load_delhi_averages()[0]
+
+
+def _load_delhi_average_arrays() -> Tuple[Tuple[str, ...], np.ndarray]:
+    """(categories, averages) view of _load_delhi_averages, for vectorized scoring"""
+    _, categories, averages = _load_delhi_averages()
+    return categories, averages
+
+
+@ttl_cache(maxsize=1, ttl=DELHI_AGGREGATE_TTL)
+def _load_delhi_total_stats() -> Tuple[int, int, int]:
+    """(total POIs, number of areas, number of super categories) in one round-trip"""
+    query = """
+        SELECT COUNT(*), COUNT(DISTINCT super_category),
+               (SELECT COUNT(*) FROM delhi_area)
+        FROM points_super
+    """
+    results = execute_query(query, (), prepared=True)
+    if not results:
+        return 0, 1, 0
+    total_pois, total_categories, num_areas = results[0]
+    return total_pois, num_areas, total_categories
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+# The POI index is expensive (a binary COPY per category and a BallTree
+# build), so it has no TTL: it lives until invalidate_city_stats, which
+# _data_version calls when the data actually changes. The lock makes
+# concurrent first lookups wait for one build instead of each running
+# their own.
+_poi_index_lock = threading.Lock()
+
+
+def _load_poi_index() -> Tuple[Optional[BallTree], np.ndarray, Tuple[str, ...]]:
+    """See _build_poi_index; built once per data version"""
+    with _poi_index_lock:
+        return _build_poi_index()
+
+
+@cache
+def _build_poi_index() -> Tuple[Optional[BallTree], np.ndarray, Tuple[str, ...]]:
+    """
+    In-process spatial index over every categorized POI: a haversine BallTree,
+    each point's category code, and the category names the codes refer to
+    """
+    results = execute_query(
+        "SELECT DISTINCT super_category FROM points_super WHERE super_category IS NOT NULL",
+        (), prepared=True
+    )
+    categories = tuple(sorted(category for (category,) in results or []))
+    
+    coords, codes = [], []
+    for code, category in enumerate(categories):
+        points = fetch_points_as_ndarray(category, table="points_super", category_column="super_category")
+        coords.append(points)
+        codes.append(np.full(len(points), code, dtype=np.int64))
+    
+    if not coords or sum(len(c) for c in coords) == 0:
+        return None, np.empty(0, dtype=np.int64), categories
+    return BallTree(np.radians(np.concatenate(coords)), metric='haversine'), np.concatenate(codes), categories
+
+
+def invalidate_city_stats() -> None:
+    """Drop cached city-wide aggregates and analyses (call after a data reload)"""
+    _load_delhi_averages.cache_clear()
+    _load_delhi_total_stats.cache_clear()
+    _load_area_centroids.cache_clear()
+    _find_area_with_centroid.cache_clear()
+    _load_all_area_distributions.cache_clear()
+    _get_area_centroid.cache_clear()
+    _find_location_from_pois.cache_clear()
+    _build_poi_index.cache_clear()
+    with _analysis_cache_lock:
+        _analysis_cache.clear()
+
+
+@dataclass(frozen=True)
+class DistributionSummary:
+    """Aggregates of an area's category distribution, computed in one pass"""
+    total: int
+    hhi: float  # Herfindahl-Hirschman concentration, 0 to 1
+    dominant: List[Tuple[str, int]]  # top 3 (category, count), largest first
+    num_categories: int
+
+
+def _summarize_distribution(distribution: Dict[str, int]) -> DistributionSummary:
+    """Total, concentration and top 3 categories in a single pass"""
+    total = 0
+    sum_squares = 0
+    heap = []  # (count, -position, category); -position keeps ties in input order
+    for position, (category, count) in enumerate(distribution.items()):
+        total += count
+        sum_squares += count * count
+        item = (count, -position, category)
+        if len(heap) < 3:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return DistributionSummary(
+        total=total,
+        # sum((count / total) ** 2) == sum(count ** 2) / total ** 2
+        hhi=sum_squares / (total * total) if total > 0 else 0,
+        dominant=[(category, count) for count, _, category in sorted(heap, reverse=True)],
+        num_categories=len(distribution),
+    )
+
+
+# Runs independent analysis queries concurrently (each on its own pooled connection)
+_query_executor = ThreadPoolExecutor(max_workers=4)
+
+
+# In-memory tables every analysis reads from
+WARM_LOADERS = (
+    _load_delhi_averages, _load_delhi_total_stats,
+    _load_area_centroids, _load_all_area_distributions, _load_poi_index,
+)
+
+
+# Set once warm_caches has loaded every table (and the analyzer) successfully
+_caches_warm = threading.Event()
+
+
+def _warm(loader) -> bool:
+    try:
+        loader()
+        return True
+    except Exception as e:
+        print(f"[AreaBusinessAnalyzer] Cache warm-up failed for {loader.__name__}: {e}")
+        return False
+
+
+def warm_caches() -> None:
+    """
+    Start loading the in-memory lookup tables concurrently in the background,
+    so the first analysis doesn't pay for them one after another
+    """
+    threading.Thread(target=_warm_all, name="cache-warmup", daemon=True).start()
+
+
+def _warm_all() -> None:
+    """
+    Run every loader (get_area_analyzer covers the area score CSV) on a
+    short-lived pool of its own, so warm-up never queues ahead of request
+    fan-out on _query_executor
+    """
+    loaders = (*WARM_LOADERS, get_area_analyzer)
+    with ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="cache-warmup") as executor:
+        warmed = list(executor.map(_warm, loaders))
+    if all(warmed):
+        _caches_warm.set()
+
+
+def caches_ready() -> bool:
+    """True once warm_caches has finished; doesn't load anything itself"""
+    return _caches_warm.is_set()
+
+
+# Full analysis results, keyed by (normalized area name, data version)
+ANALYSIS_CACHE_SIZE = 512
+
+# How often the data_version row (bumped by the migration and by
+# refresh_derived_tables) is re-read
+DATA_VERSION_CHECK_S = 60
+
+_analysis_cache = LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
+_analysis_cache_lock = threading.Lock()
+_seen_data_version: Optional[int] = None
+
+
+@ttl_cache(maxsize=1, ttl=DATA_VERSION_CHECK_S)
+def _load_data_version() -> int:
+    results = execute_query("SELECT version FROM data_version", (), prepared=True)
+    return results[0][0] if results else 0
+
+
+def _data_version() -> int:
+    """
+    Current data version. When it moves on, every cached aggregate and
+    analysis was computed from the old data, so they are all dropped.
+    """
+    global _seen_data_version
+    version = _load_data_version()
+    if _seen_data_version is not None and version != _seen_data_version:
+        invalidate_city_stats()
+    _seen_data_version = version
+    return version
+
+
+def _analyze_area_cached(area_name: str, data_version: int) -> Dict[str, Any]:
+    """Run the full analysis once per area name and data version; errors aren't cached"""
+    key = (area_name, data_version)
+    with _analysis_cache_lock:
+        result = _analysis_cache.get(key)
+    if result is None:
+        result = get_area_analyzer()._analyze_area(area_name)
+        if result.get("success"):
+            with _analysis_cache_lock:
+                _analysis_cache[key] = result
+    return result
+
 
 class AreaBusinessAnalyzer:
     """Analyzes business opportunities in a specific area"""
@@ -55,112 +526,115 @@ class AreaBusinessAnalyzer:
         self._load_area_scores()
     
     def _load_area_scores(self):
-        """Load area scores from CSV"""
+        """Load area scores from CSV and precompute the scoring matrices"""
+        self._area_score_names = []
+        self._feature_matrix = None
         try:
-            self.areas_df = pd.read_csv(AREA_SCORES_CSV)
+            with open(AREA_SCORES_CSV, newline='') as f:
+                reader = csv.DictReader(f)
+                columns = reader.fieldnames or []
+                rows = list(reader)
         except FileNotFoundError:
-            self.areas_df = None
+            return
+        
+        # Lowercased names, positionally aligned with the feature matrix rows
+        self._area_score_names = [(row['name'] or '').lower() for row in rows]
+        self._name_lower_to_idx = {}
+        for i, name in enumerate(self._area_score_names):
+            self._name_lower_to_idx.setdefault(name, i)
+        
+        # (num_areas, num_criteria) scores aligned with the recommender's
+        # WEIGHTS_MATRIX columns; criteria missing from the CSV score 0
+        present = set(columns)
+        self._feature_matrix = np.array(
+            [[(float(row[f]) if row[f] else math.nan) if f in present else 0.0 for f in CRITERIA]
+             for row in rows],
+            dtype=np.float64
+        ).reshape(len(rows), len(CRITERIA))
+        # Every (area, category) base score, so lookups are pure indexing
+        self._score_table = self._feature_matrix @ WEIGHTS_MATRIX.T
+    
+    def _find_area_score_row(self, area_name: str) -> Optional[int]:
+        """Row index of an area in the score table (case-insensitive, then partial or typo match)"""
+        area_idx = self._name_lower_to_idx.get(area_name.lower())
+        if area_idx is not None:
+            return area_idx
+        return match_area_name(area_name, self._area_score_names)
     
     def get_area_base_score(self, area_name: str, super_category: str) -> Optional[float]:
         """Calculate base score for an area and business category"""
-        if self.areas_df is None:
-            return None
-        
-        weights = WEIGHTS.get(super_category, WEIGHTS.get('Other / Misc', {}))
-        if not weights:
-            return None
-        
-        # Find the area in dataframe (case-insensitive)
-        area_row = self.areas_df[self.areas_df['name'].str.lower() == area_name.lower()]
-        if area_row.empty:
-            # Try fuzzy match
-            area_row = self.areas_df[self.areas_df['name'].str.lower().str.contains(area_name.lower())]
-        
-        if area_row.empty:
-            return None
+        return self.get_area_base_scores(area_name, [super_category]).get(super_category)
+    
+    def get_area_base_scores(self, area_name: str, categories: List[str]) -> Dict[str, Optional[float]]:
+        """Base scores for several categories in one area, read from the precomputed table"""
+        if self._feature_matrix is None or not categories:
+            return {category: None for category in categories}
         
-        row = area_row.iloc[0]
-        score = 0.0
-        for feature, weight in weights.items():
-            if feature in row:
-                score += (row[feature] * weight / 100)
+        area_idx = self._find_area_score_row(area_name)
+        if area_idx is None:
+            return {category: None for category in categories}
         
-        return round(score, 2)
+        fallback = SUPER_CATEGORY_INDEX['Other / Misc']
+        weight_rows = [SUPER_CATEGORY_INDEX.get(category, fallback) for category in categories]
+        scores = self._score_table[area_idx, weight_rows]
+        return {category: round(float(score), 2) for category, score in zip(categories, scores)}
     
     def get_area_centroid(self, area_name: str) -> Optional[Dict]:
-        """Get centroid coordinates for an area"""
-        query = """
-            SELECT name, longitude, latitude 
-            FROM area_with_centroid 
-            WHERE LOWER(name) = LOWER(%s)
-            LIMIT 1
-        """
-        results = execute_query(query, (area_name,))
-        if results and len(results) > 0:
-            return {"name": results[0][0], "lon": results[0][1], "lat": results[0][2]}
+        """Get centroid coordinates for an area (memoized per normalized name)"""
+        match = _get_area_centroid(area_name.strip().lower())
+        if match:
+            name, lon, lat = match
+            return {"name": name, "lon": lon, "lat": lat}
+        return None
+    
+    def resolve_area(self, area_name: str) -> Optional[Tuple[str, Dict]]:
+        """Resolve an area name to (name, centroid) in a single lookup"""
+        match = _find_area_with_centroid(area_name.strip().lower())
+        if match:
+            name, lon, lat = match
+            return name, {"name": name, "lon": lon, "lat": lat}
         return None
     
     def find_area_by_name(self, area_name: str) -> Optional[str]:
-        """Find closest matching area name"""
-        # Try exact match first
-        query = """
-            SELECT name FROM area_with_centroid 
-            WHERE LOWER(name) = LOWER(%s)
-            LIMIT 1
+        """Find closest matching area name (memoized per normalized name)"""
+        resolved = self.resolve_area(area_name)
+        return resolved[0] if resolved else None
+    
+    def get_area_and_centroid(self, area_name: str) -> Optional[Dict]:
+        """Resolve an area name and its centroid in one lookup"""
+        resolved = self.resolve_area(area_name)
+        return resolved[1] if resolved else None
+    
+    def find_area_with_distribution(self, area_name: str) -> Optional[Dict[str, Any]]:
         """
-        results = execute_query(query, (area_name,))
-        if results:
-            return results[0][0]
+        Resolve an area name (through the same resolver as resolve_area) and
+        attach its centroid and POI category distribution.
         
-        # Try fuzzy match
-        query = """
-            SELECT name FROM area_with_centroid 
-            WHERE LOWER(name) LIKE LOWER(%s)
-            ORDER BY LENGTH(name)
-            LIMIT 1
+        Returns: {"name": str, "centroid": {...}, "distribution": {category: count}}
+        or None if no area matches.
         """
-        results = execute_query(query, (f"%{area_name}%",))
-        if results:
-            return results[0][0]
-        
-        return None
+        # Name resolution and distribution both come from in-memory tables
+        resolved = self.resolve_area(area_name)
+        if not resolved:
+            return None
+        name, centroid = resolved
+        return {
+            "name": name,
+            "centroid": centroid,
+            "distribution": dict(_load_area_distribution(name.lower()))
+        }
     
     def find_location_from_pois(self, location_name: str) -> Optional[Dict]:
         """
         Find a location by searching POI names when area is not found.
-        Returns centroid of matching POIs.
-        """
-        query = """
-            SELECT 
-                AVG(ST_X(geom)) as lon,
-                AVG(ST_Y(geom)) as lat,
-                COUNT(*) as count
-            FROM points_super
-            WHERE LOWER(name) LIKE LOWER(%s)
+        Returns centroid of matching POIs (memoized per normalized name).
         """
-        results = execute_query(query, (f"%{location_name}%",))
-        if results and results[0][0] is not None and results[0][2] > 0:
-            return {
-                "name": location_name.title(),
-                "lon": float(results[0][0]),
-                "lat": float(results[0][1]),
-                "poi_count": int(results[0][2]),
-                "source": "poi"
-            }
-        return None
+        location = _find_location_from_pois(location_name.strip().lower())
+        return dict(location) if location else None
     
     def get_category_distribution(self, area_name: str) -> Dict[str, int]:
-        """Get count of POIs by super_category in an area using spatial join"""
-        # Use spatial containment to find POIs within the area polygon
-        query = """
-            SELECT ps.super_category, COUNT(*) as count
-            FROM points_super ps
-            JOIN delhi_area da ON ST_Contains(da.geom, ps.geom)
-            WHERE LOWER(da.name) = LOWER(%s)
-            GROUP BY ps.super_category
-            ORDER BY count DESC
-        """
-        results = execute_query(query, (area_name,))
+        """Get count of POIs by super_category in an area (memoized per area)"""
+        results = _load_area_distribution(area_name.strip().lower())
         if not results:
             # Try using centroid with radius as fallback
             centroid = self.get_area_centroid(area_name)
@@ -169,63 +643,47 @@ class AreaBusinessAnalyzer:
                     centroid['lat'], centroid['lon'], radius_km=1.5
                 )
             return {}
-        return {r[0]: r[1] for r in results}
+        return dict(results)
     
     def get_category_distribution_by_radius(self, lat: float, lon: float, 
                                             radius_km: float = 1.5) -> Dict[str, int]:
         """Get count of POIs by super_category within a radius"""
+        tree, codes, categories = _load_poi_index()
+        if tree is not None:
+            # Served in-process from the cached BallTree (no DB round-trip)
+            idx = tree.query_radius(np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM)[0]
+            counts = np.bincount(codes[idx], minlength=len(categories))
+            order = np.argsort(-counts, kind='stable')
+            return {categories[i]: int(counts[i]) for i in order if counts[i] > 0}
+        
+        # The indexed H3 cell lookup narrows candidates to the hexagons around
+        # the point; ST_DWithin on the stored geog column (GIST-indexed, no
+        # per-row cast) then applies the exact radius
         query = """
             SELECT super_category, COUNT(*) as count
             FROM points_super
-            WHERE ST_DWithin(
-                geom::geography,
+            WHERE h3_9 = ANY(%s)
+            AND ST_DWithin(
+                geog,
                 ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
                 %s
             )
             GROUP BY super_category
             ORDER BY count DESC
         """
-        results = execute_query(query, (lon, lat, radius_km * 1000))
+        cells = h3_cells_covering(lat, lon, radius_km)
+        results = execute_query(query, (cells, lon, lat, radius_km * 1000), prepared=True)
         if not results:
             return {}
-        return {r[0]: r[1] for r in results}
+        return {category: count for category, count in results}
     
     def get_delhi_average_distribution(self) -> Dict[str, float]:
-        """Get average POI count per super category across Delhi areas"""
-        # Get total counts per category and divide by number of areas
-        query = """
-            SELECT super_category, COUNT(*) as total_count
-            FROM points_super
-            GROUP BY super_category
-        """
-        results = execute_query(query, ())
-        if not results:
-            return {}
-        
-        # Get number of areas for averaging
-        area_count_query = "SELECT COUNT(*) FROM delhi_area"
-        area_count_result = execute_query(area_count_query, ())
-        num_areas = area_count_result[0][0] if area_count_result else 1
-        
-        # Calculate average per area
-        return {r[0]: float(r[1]) / num_areas for r in results}
+        """Get average POI count per super category across Delhi areas (cached)"""
+        return dict(_load_delhi_average_distribution())
     
     def get_delhi_total_stats(self) -> Dict[str, Any]:
-        """Get city-wide statistics for trend comparison"""
-        # Get total POI count
-        total_query = "SELECT COUNT(*) FROM points_super"
-        total_result = execute_query(total_query, ())
-        total_pois = total_result[0][0] if total_result else 0
-        
-        # Get number of areas
-        area_count_query = "SELECT COUNT(*) FROM delhi_area"
-        area_result = execute_query(area_count_query, ())
-        num_areas = area_result[0][0] if area_result else 1
-        
-        # Get category count
-        cat_query = "SELECT COUNT(DISTINCT super_category) FROM points_super"
-        cat_result = execute_query(cat_query, ())
-        total_categories = cat_result[0][0] if cat_result else 0
+        """Get city-wide statistics for trend comparison (cached)"""
+        total_pois, num_areas, total_categories = _load_delhi_total_stats()
         
         return {
             "total_pois": total_pois,
@@ -236,7 +694,9 @@ class AreaBusinessAnalyzer:
     
     def calculate_area_trend(self, area_distribution: Dict[str, int], 
                              delhi_average: Dict[str, float],
-                             delhi_stats: Dict[str, Any]) -> Dict[str, Any]:
+                             delhi_stats: Dict[str, Any],
+                             summary: Optional[DistributionSummary] = None,
+                             include_reasons: bool = True) -> Dict[str, Any]:
         """
         Calculate area trend indicator based on:
         1. POI density relative to city average
@@ -247,11 +707,13 @@ class AreaBusinessAnalyzer:
             'indicator': 'emerging' | 'growing' | 'saturated',
             'emoji': '🌱' | '📈' | '🔴',
             'label': 'Emerging Market' | 'Growing Market' | 'Saturated Market',
-            'reason': explanation string,
+            'reason': explanation string (empty when include_reasons is False),
             'metrics': detailed breakdown
         }
         """
-        total_pois = sum(area_distribution.values())
+        if summary is None:
+            summary = _summarize_distribution(area_distribution)
+        total_pois = summary.total
         avg_pois_per_area = delhi_stats.get("avg_pois_per_area", 1)
         total_categories = delhi_stats.get("total_categories", 1)
         
@@ -261,16 +723,12 @@ class AreaBusinessAnalyzer:
         
         # 2. Category Diversity Score (0-100)
         # How many of the total categories are present
-        categories_present = len(area_distribution)
+        categories_present = summary.num_categories
         diversity_ratio = categories_present / total_categories if total_categories > 0 else 0
         
         # 3. Competition Concentration (0-100, higher = more concentrated = less diverse)
         # Using Herfindahl-Hirschman Index style calculation
-        if total_pois > 0:
-            shares = [(count / total_pois) ** 2 for count in area_distribution.values()]
-            concentration = sum(shares)  # 0 to 1, where 1 = perfectly concentrated
-        else:
-            concentration = 0
+        concentration = summary.hhi  # 0 to 1, where 1 = perfectly concentrated
         
         # Build metrics for detailed breakdown
         metrics = {
@@ -287,42 +745,33 @@ class AreaBusinessAnalyzer:
         # Growing: Medium density, good diversity, moderate concentration
         # Saturated: High density, high diversity, varied concentration
         
+        indicator, emoji, label = TREND_BUCKETS[bisect.bisect_right(TREND_THRESHOLDS, density_ratio)]
         reasons = []
-        
-        if density_ratio < 0.5:
-            # Low POI density - Emerging
-            indicator = "emerging"
-            emoji = "🌱"
-            label = "Emerging Market"
+        if include_reasons and indicator == "emerging":
+            # Low POI density
             reasons.append(f"Low business density ({total_pois} POIs vs {round(avg_pois_per_area)} city avg)")
             if diversity_ratio < 0.5:
                 reasons.append(f"Only {categories_present} of {total_categories} categories present")
             else:
                 reasons.append("Room for early movers in multiple categories")
                 
-        elif density_ratio < 1.2:
-            # Medium density - Growing
-            indicator = "growing"
-            emoji = "📈"
-            label = "Growing Market"
+        elif include_reasons and indicator == "growing":
+            # Medium density
             reasons.append(f"Moderate business activity ({total_pois} POIs, {round(density_ratio * 100)}% of city avg)")
             if concentration < 0.3:
                 reasons.append("Balanced business mix with opportunities")
             else:
                 # Find dominant category
-                dominant = max(area_distribution.items(), key=lambda x: x[1])
+                dominant = summary.dominant[0]
                 reasons.append(f"Some concentration in {dominant[0]} ({dominant[1]} POIs)")
                 
-        else:
-            # High density - Saturated
-            indicator = "saturated"
-            emoji = "🔴"
-            label = "Saturated Market"
+        elif include_reasons:
+            # High density
             reasons.append(f"High business density ({total_pois} POIs, {round(density_ratio * 100)}% of city avg)")
             if diversity_ratio > 0.7:
                 reasons.append(f"All major categories well-represented ({categories_present} categories)")
             # Find dominant category
-            dominant = max(area_distribution.items(), key=lambda x: x[1])
+            dominant = summary.dominant[0]
             dominant_pct = round((dominant[1] / total_pois) * 100)
             if dominant_pct > 30:
                 reasons.append(f"Heavy competition in {dominant[0]} ({dominant_pct}% market share)")
@@ -336,61 +785,92 @@ class AreaBusinessAnalyzer:
         }
     
     def analyze_gaps(self, area_distribution: Dict[str, int], 
-                     delhi_average: Dict[str, float]) -> List[Dict]:
-        """Find categories that are underrepresented in the area"""
-        gaps = []
-        
-        for category, avg_count in delhi_average.items():
-            area_count = area_distribution.get(category, 0)
-            if avg_count > 0:
-                ratio = area_count / avg_count
-                gap_score = max(0, 100 - (ratio * 100))  # Higher = bigger gap
-                
-                gaps.append({
-                    'category': category,
-                    'area_count': area_count,
-                    'delhi_average': round(avg_count, 1),
-                    'gap_score': round(gap_score, 1),
-                    'status': 'underserved' if ratio < 0.5 else 'moderate' if ratio < 1.0 else 'saturated'
-                })
+                     delhi_average: Dict[str, float], limit: Optional[int] = None,
+                     averages: Optional[Tuple[Tuple[str, ...], np.ndarray]] = None) -> List[Dict]:
+        """
+        Find categories that are underrepresented in the area (top `limit` gaps).
+        `averages` is delhi_average pre-decoded as (categories, averages) arrays;
+        when given, the dict is not re-scanned.
+        """
+        if averages is None:
+            averages = (tuple(delhi_average), np.fromiter(delhi_average.values(), dtype=np.float64,
+                                                          count=len(delhi_average)))
+        all_categories, all_avg = averages
+        if len(all_categories) == 0 or limit == 0:
+            return []
         
-        # Sort by gap score (highest gaps first)
-        gaps.sort(key=lambda x: x['gap_score'], reverse=True)
-        return gaps
+        positive = np.flatnonzero(all_avg > 0)
+        if positive.size == 0:
+            return []
+        categories = [all_categories[i] for i in positive]
+        avg = all_avg[positive]
+        area = np.array([area_distribution.get(c, 0) for c in categories], dtype=float)
+        ratio = area / avg
+        gap_score = np.round(np.maximum(0, 100 - ratio * 100), 1)  # Higher = bigger gap
+        
+        # Sort by gap score (highest gaps first); stable to keep ties in input order
+        if limit is not None and limit < len(categories):
+            # Partial selection: only scores >= the limit-th largest get sorted
+            kth = np.partition(gap_score, len(gap_score) - limit)[len(gap_score) - limit]
+            candidates = np.flatnonzero(gap_score >= kth)
+            order = candidates[np.argsort(-gap_score[candidates], kind='stable')][:limit]
+        else:
+            order = np.argsort(-gap_score, kind='stable')[:limit]
+        return [
+            {
+                'category': categories[i],
+                'area_count': area_distribution.get(categories[i], 0),
+                'delhi_average': round(float(avg[i]), 1),
+                'gap_score': float(gap_score[i]),
+                'status': 'underserved' if ratio[i] < 0.5 else 'moderate' if ratio[i] < 1.0 else 'saturated'
+            }
+            for i in order
+        ]
     
-    def analyze_complementary_opportunities(self, area_distribution: Dict[str, int]) -> List[Dict]:
+    def analyze_complementary_opportunities(self, area_distribution: Dict[str, int],
+                                            total_pois: Optional[int] = None) -> List[Dict]:
         """Find complementary business opportunities based on existing businesses"""
-        opportunities = []
-        
-        # Find dominant categories in the area
-        total_pois = sum(area_distribution.values())
+        if total_pois is None:
+            total_pois = sum(area_distribution.values())
         if total_pois == 0:
             return []
         
-        for category, count in area_distribution.items():
-            percentage = (count / total_pois) * 100
-            if percentage > 5:  # Category has significant presence
-                complementary = COMPLEMENTARY_MAP.get(category, [])
-                for comp_cat in complementary:
-                    comp_count = area_distribution.get(comp_cat, 0)
-                    # If complementary category is underrepresented, it's an opportunity
-                    if comp_count < count * 0.5:
-                        opportunities.append({
-                            'category': comp_cat,
-                            'reason': f"Complements existing {category} businesses ({count} POIs)",
-                            'existing_complementary': comp_count,
-                            'opportunity_score': round(100 - (comp_count / max(count, 1) * 100), 1)
-                        })
-        
-        # Remove duplicates and sort by score
-        seen = set()
-        unique_opportunities = []
-        for opp in sorted(opportunities, key=lambda x: x['opportunity_score'], reverse=True):
-            if opp['category'] not in seen:
-                seen.add(opp['category'])
-                unique_opportunities.append(opp)
-        
-        return unique_opportunities[:5]
+        # Per-category counts, and each category's position in area_distribution
+        # (score ties resolve to the earliest source, as the row-by-row scan did)
+        counts = np.zeros(len(CATEGORIES))
+        position = np.full(len(CATEGORIES), -1)
+        for i, (category, count) in enumerate(area_distribution.items()):
+            if category in CATEGORY_INDEX:
+                counts[CATEGORY_INDEX[category]] = count
+                position[CATEGORY_INDEX[category]] = i
+        
+        # A significant (>5%) source opens an opportunity for each
+        # complementary category that has less than half its count
+        source_counts = counts[COMP_SOURCES]
+        target_counts = counts[COMP_TARGETS]
+        valid = (source_counts / total_pois * 100 > 5) & (target_counts < source_counts * 0.5)
+        edges = np.flatnonzero(valid)
+        if edges.size == 0:
+            return []
+        scores = np.round(100 - target_counts[edges] / np.maximum(source_counts[edges], 1) * 100, 1)
+        
+        # Highest score first, ties in emission order (source position, then
+        # COMPLEMENTARY_MAP order); the first edge per target is its best one
+        order = np.lexsort((COMP_RANKS[edges], position[COMP_SOURCES[edges]], -scores))
+        ranked, ranked_scores = edges[order], scores[order]
+        _, first = np.unique(COMP_TARGETS[ranked], return_index=True)
+        
+        opportunities = []
+        for k in np.sort(first)[:5]:
+            comp_cat = CATEGORIES[COMP_TARGETS[ranked[k]]]
+            source_cat = CATEGORIES[COMP_SOURCES[ranked[k]]]
+            opportunities.append({
+                'category': comp_cat,
+                'reason': f"Complements existing {source_cat} businesses ({area_distribution[source_cat]} POIs)",
+                'existing_complementary': area_distribution.get(comp_cat, 0),
+                'opportunity_score': float(ranked_scores[k])
+            })
+        return opportunities
     
     def analyze_area(self, area_name: str) -> Dict[str, Any]:
         """
@@ -400,17 +880,36 @@ class AreaBusinessAnalyzer:
         1. Gap analysis (underserved categories)
         2. Complementary opportunities
         3. Business examples for each category
+        
+        Results are memoized per normalized area name; callers get a copy.
         """
-        # Find the area in area_with_centroid
-        actual_area = self.find_area_by_name(area_name)
+        result = _analyze_area_cached(area_name.strip().lower(), _data_version())
+        return copy.deepcopy(result)
+    
+    def _analyze_area(self, area_name: str) -> Dict[str, Any]:
+        """Uncached analysis pipeline behind analyze_area"""
+        # City-wide aggregates don't depend on the area; fetch them on pooled
+        # connections while the area lookup runs
+        delhi_average_future = _query_executor.submit(self.get_delhi_average_distribution)
+        delhi_stats_future = _query_executor.submit(self.get_delhi_total_stats)
+        
+        # Find the area in area_with_centroid (with its distribution, one round-trip)
+        area_match = self.find_area_with_distribution(area_name)
+        actual_area = None
         centroid = None
         area_distribution = None
         location_source = "area"
         
-        if actual_area:
+        if area_match:
             # Found as a defined area
-            centroid = self.get_area_centroid(actual_area)
-            area_distribution = self.get_category_distribution(actual_area)
+            actual_area = area_match["name"]
+            centroid = area_match["centroid"]
+            area_distribution = area_match["distribution"]
+            if not area_distribution:
+                # No POIs inside the polygon; use centroid with radius as fallback
+                area_distribution = self.get_category_distribution_by_radius(
+                    centroid['lat'], centroid['lon'], radius_km=1.5
+                )
         else:
             # Try to find as a POI location (e.g., "Khan Market")
             poi_location = self.find_location_from_pois(area_name)
@@ -434,14 +933,40 @@ class AreaBusinessAnalyzer:
                 "error": f"No business data found for '{actual_area}'"
             }
         
-        # Get Delhi average
-        delhi_average = self.get_delhi_average_distribution()
+        return self._build_analysis(
+            actual_area, centroid, area_distribution, location_source,
+            delhi_average_future.result(), delhi_stats_future.result()
+        )
+    
+    def _build_analysis(self, actual_area: str, centroid: Dict, area_distribution: Dict[str, int],
+                        location_source: str, delhi_average: Dict[str, float],
+                        delhi_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a resolved area's distribution against the city-wide aggregates"""
+        # Total POIs and dominant categories, in one pass over the distribution
+        summary = _summarize_distribution(area_distribution)
+        total_pois, dominant = summary.total, summary.dominant
         
         # Analyze gaps
-        gaps = self.analyze_gaps(area_distribution, delhi_average)
+        # Only the top 5 gaps are reported, so only those are materialized
+        gaps = self.analyze_gaps(area_distribution, delhi_average, limit=5,
+                                 averages=_load_delhi_average_arrays())
         
         # Analyze complementary opportunities
-        complementary = self.analyze_complementary_opportunities(area_distribution)
+        complementary = self.analyze_complementary_opportunities(area_distribution, total_pois)
+        
+        # Complementary POI counts for every category under both maps, one matmul
+        counts = np.zeros(len(CATEGORIES), dtype=np.int64)
+        for category, count in area_distribution.items():
+            if category in CATEGORY_INDEX:
+                counts[CATEGORY_INDEX[category]] = count
+        ecosystem_counts = (ECOSYSTEM_ADJACENCY @ counts).tolist()
+        gap_ecosystem = dict(zip(CATEGORIES, ecosystem_counts[:len(CATEGORIES)]))
+        comp_ecosystem = dict(zip(CATEGORIES, ecosystem_counts[len(CATEGORIES):]))
+        
+        # Base scores for every category that can become a recommendation, in one batch
+        base_scores = self.get_area_base_scores(
+            actual_area, list(dict.fromkeys([g['category'] for g in gaps[:3]] + [c['category'] for c in complementary]))
+        )
         
         # Generate top recommendations
         top_recommendations = []
@@ -451,7 +976,7 @@ class AreaBusinessAnalyzer:
         for gap in gaps[:3]:
             if gap['category'] not in seen_categories and gap['status'] in ['underserved', 'moderate']:
                 seen_categories.add(gap['category'])
-                examples = BUSINESS_EXAMPLES.get(gap['category'], [])
+                examples = BUSINESS_EXAMPLES_TOP4.get(gap['category'], ())
                 
                 # Generate data-driven cons for gap opportunities
                 gap_cons = []
@@ -465,13 +990,12 @@ class AreaBusinessAnalyzer:
                     gap_cons.append(f"Very low presence ({gap['area_count']} vs {gap['delhi_average']} avg) - may indicate unsuitable location")
                 
                 # Check if complementary businesses exist to drive traffic
-                complementary_cats = COMPLEMENTARY_MAP.get(gap['category'], [])
-                complementary_count = sum(area_distribution.get(c, 0) for c in complementary_cats)
+                complementary_count = gap_ecosystem.get(gap['category'], 0)
                 if complementary_count < 10:
                     gap_cons.append(f"Limited supporting businesses ({complementary_count} complementary POIs)")
                 
                 # Calculate scoring breakdown
-                base_score = self.get_area_base_score(actual_area, gap['category'])
+                base_score = base_scores[gap['category']]
                 # Opportunity score: inverse of competition (higher when fewer competitors)
                 opportunity_score = gap['gap_score']  # Already calculated as gap score
                 # Ecosystem score: based on complementary businesses
@@ -482,7 +1006,7 @@ class AreaBusinessAnalyzer:
                     'category': gap['category'],
                     'reason': f"Gap opportunity - only {gap['area_count']} vs {gap['delhi_average']} Delhi avg",
                     'score': gap['gap_score'],
-                    'examples': examples[:4],
+                    'examples': examples,
                     'type': 'gap',
                     'cons': gap_cons[:2] if gap_cons else ["Low competition - first mover advantage but unproven demand"],
                     'competitors': gap['area_count'],
@@ -496,7 +1020,7 @@ class AreaBusinessAnalyzer:
         for comp in complementary:
             if comp['category'] not in seen_categories and len(top_recommendations) < 5:
                 seen_categories.add(comp['category'])
-                examples = BUSINESS_EXAMPLES.get(comp['category'], [])
+                examples = BUSINESS_EXAMPLES_TOP4.get(comp['category'], ())
                 
                 # Generate data-driven cons for complementary opportunities
                 comp_cons = []
@@ -515,11 +1039,10 @@ class AreaBusinessAnalyzer:
                 comp_cons.append(f"Depends on traffic from {comp['reason'].split('(')[0].strip().split()[-1]} businesses")
                 
                 # Get complementary business count for this category
-                complementary_cats = COMPLEMENTARY_CATEGORIES.get(comp['category'], [])
-                complementary_count = sum(area_distribution.get(c, 0) for c in complementary_cats)
+                complementary_count = comp_ecosystem.get(comp['category'], 0)
                 
                 # Calculate scoring breakdown
-                base_score = self.get_area_base_score(actual_area, comp['category'])
+                base_score = base_scores[comp['category']]
                 # Opportunity score: inverse of competition
                 opportunity_score = max(0, 100 - (existing_count / max(cat_delhi_avg, 1) * 50)) if cat_delhi_avg > 0 else 50
                 # Ecosystem score: high because this is complementary (driven by existing businesses)
@@ -530,7 +1053,7 @@ class AreaBusinessAnalyzer:
                     'category': comp['category'],
                     'reason': comp['reason'],
                     'score': comp['opportunity_score'],
-                    'examples': examples[:4],
+                    'examples': examples,
                     'type': 'complementary',
                     'cons': comp_cons[:2],
                     'competitors': existing_count,
@@ -540,15 +1063,8 @@ class AreaBusinessAnalyzer:
                     'ecosystem_score': round(ecosystem_score, 2)
                 })
         
-        # Calculate total POIs
-        total_pois = sum(area_distribution.values())
-        
-        # Find dominant categories
-        dominant = sorted(area_distribution.items(), key=lambda x: x[1], reverse=True)[:3]
-        
         # Calculate area trend indicator
-        delhi_stats = self.get_delhi_total_stats()
-        trend_indicator = self.calculate_area_trend(area_distribution, delhi_average, delhi_stats)
+        trend_indicator = self.calculate_area_trend(area_distribution, delhi_average, delhi_stats, summary)
         
         return {
             "success": True,
@@ -560,7 +1076,7 @@ class AreaBusinessAnalyzer:
             "trend_indicator": trend_indicator,
             "dominant_categories": [{"category": d[0], "count": d[1]} for d in dominant],
             "recommendations": top_recommendations,
-            "gap_analysis": gaps[:5],
+            "gap_analysis": gaps,
             "complementary_opportunities": complementary,
             "message": self._generate_message(actual_area, top_recommendations, dominant, total_pois)
         }
@@ -568,24 +1084,25 @@ class AreaBusinessAnalyzer:
     def _generate_message(self, area: str, recommendations: List[Dict], 
                           dominant: List, total_pois: int) -> str:
         """Generate a formatted message for the analysis"""
-        msg = f"## Business Opportunities in {area}\n\n"
-        msg += f"**Area Overview:** {total_pois} total businesses\n\n"
-        
-        # Dominant categories
-        msg += "**Existing Business Landscape:**\n"
-        for cat, count in dominant:
-            msg += f"- {cat}: {count} businesses\n"
-        msg += "\n"
+        parts = [
+            f"## Business Opportunities in {area}\n\n",
+            f"**Area Overview:** {total_pois} total businesses\n\n",
+            # Dominant categories
+            "**Existing Business Landscape:**\n",
+        ]
+        parts.extend(f"- {cat}: {count} businesses\n" for cat, count in dominant)
+        parts.append("\n")
         
         # Top recommendations
-        msg += "### 🎯 Top Recommended Business Categories\n\n"
+        parts.append("### 🎯 Top Recommended Business Categories\n\n")
         for rec in recommendations[:5]:
-            emoji = "🔵" if rec['type'] == 'gap' else "🟢"
-            msg += f"**{rec['rank']}. {rec['category']}** {emoji}\n"
-            msg += f"   - *{rec['reason']}*\n"
-            msg += f"   - **Ideas:** {', '.join(rec['examples'])}\n\n"
+            parts.append(
+                f"**{rec['rank']}. {rec['category']}** {RECOMMENDATION_EMOJI[rec['type']]}\n"
+                f"   - *{rec['reason']}*\n"
+                f"   - **Ideas:** {', '.join(rec['examples'])}\n\n"
+            )
         
-        return msg
+        return "".join(parts)
     
     def analyze_with_research(self, area_name: str) -> Dict[str, Any]:
         """
@@ -645,12 +1162,7 @@ class AreaBusinessAnalyzer:
         return base_result
 
 
-# Singleton instance
-_analyzer = None
-
+@cache
 def get_area_analyzer() -> AreaBusinessAnalyzer:
     """Get singleton instance of AreaBusinessAnalyzer"""
-    global _analyzer
-    if _analyzer is None:
-        _analyzer = AreaBusinessAnalyzer()
-    return _analyzer
+    return AreaBusinessAnalyzer()
@@ -2,15 +2,35 @@
 Business Location Agent
 Uses Groq LLM to understand user's business query and recommend locations.
 """
-import os
+import sys
 import json
-from typing import Dict, Any, Optional
-from langchain_groq import ChatGroq
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+from types import MappingProxyType
+from cachetools import TTLCache
 from langchain_core.messages import HumanMessage, SystemMessage
-from app.services.location_recommender import get_recommender, VALID_SUPER_CATEGORIES
+from app.core.llm import get_groq_llm, parse_llm_json
+from app.services.location_recommender import (
+    get_recommender, VALID_SUPER_CATEGORIES, VALID_SUPER_CATEGORIES_SET
+)
+
+# Aho-Corasick for single-pass keyword matching (optional)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Distinct normalized queries whose extraction is kept in memory, and the
+# size / lifetime (seconds) of the cache of queries whose extraction failed
+EXTRACTION_CACHE_SIZE = 2048
+FAILED_EXTRACTION_CACHE_SIZE = 512
+FAILED_EXTRACTION_TTL = 300
 
 # Category mapping from common business types to super categories
-BUSINESS_TO_SUPER_CATEGORY = {
+BUSINESS_TO_SUPER_CATEGORY = MappingProxyType({
     # Food & Beverages
     'cafe': 'Food & Beverages',
     'coffee shop': 'Food & Beverages',
@@ -125,27 +145,57 @@ BUSINESS_TO_SUPER_CATEGORY = {
     'office': 'Other / Misc',
     'coworking': 'Other / Misc',
     'warehouse': 'Other / Misc',
-}
+})
 
 
-class BusinessLocationAgent:
-    """Agent that understands business queries and recommends locations"""
+# Each super category once (interned), and the keyword table packed as
+# (keyword, category id) pairs, longest keyword first (stable, so equal
+# lengths keep their listing order). A front-to-back scan therefore stops
+# at the most specific match.
+SUPER_CATEGORIES = tuple(sys.intern(c) for c in dict.fromkeys(BUSINESS_TO_SUPER_CATEGORY.values()))
+_KEYWORD_TABLE = tuple(sorted(
+    ((sys.intern(business), SUPER_CATEGORIES.index(super_cat))
+     for business, super_cat in BUSINESS_TO_SUPER_CATEGORY.items()),
+    key=lambda entry: -len(entry[0])
+))
+
+# Precomputed lowercase names for the closest-match scan
+_VALID_CATEGORIES_LOWER = tuple((c.lower(), c) for c in VALID_SUPER_CATEGORIES)
+
+
+def _build_keyword_automaton():
+    """Automaton over every business keyword, valued (table rank, keyword, category id)"""
+    automaton = ahocorasick.Automaton()
+    for rank, (business, category_id) in enumerate(_KEYWORD_TABLE):
+        automaton.add_word(business, (rank, business, category_id))
+    automaton.make_automaton()
+    return automaton
+
+
+_keyword_automaton = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def match_business_keyword(query_lower: str) -> Optional[Tuple[str, str]]:
+    """
+    Most specific business keyword contained in the query, as (keyword, super category).
+    The longest match wins ("nightclub" over "club"); ties go to the earlier entry.
+    """
+    if _keyword_automaton is not None:
+        # Lowest table rank among all hits is the longest, earliest keyword
+        best = min((entry for _, entry in _keyword_automaton.iter(query_lower)), default=None)
+        if best is None:
+            return None
+        _, business, category_id = best
+        return business, SUPER_CATEGORIES[category_id]
     
-    def __init__(self):
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        
-        # Use a capable model for understanding business intent
-        self.llm = ChatGroq(
-            model="openai/gpt-oss-120b",
-            temperature=0,
-            api_key=groq_api_key
-        )  # type: ignore
-        
-        self.recommender = get_recommender()
-        
-        self.system_prompt = SystemMessage(content=f"""
+    for business, category_id in _KEYWORD_TABLE:
+        if business in query_lower:
+            return business, SUPER_CATEGORIES[category_id]
+    return None
+
+
+# Built once at import; shared by every agent instance
+SYSTEM_PROMPT = SystemMessage(content=f"""
 You are a business location advisor assistant. Your task is to:
 1. Understand what type of business the user wants to start
 2. Map it to one of these super categories: {json.dumps(VALID_SUPER_CATEGORIES)}
@@ -174,61 +224,89 @@ Examples:
 - "Where should I start a gym?" -> {{"business_type": "gym", "super_category": "Fitness & Wellness", "confidence": "high", "reasoning": "Gym is a fitness facility"}}
 - "Best location for my clothing boutique" -> {{"business_type": "clothing boutique", "super_category": "Shopping & Retail", "confidence": "high", "reasoning": "Boutique is retail business"}}
 """)
+
+
+class BusinessLocationAgent:
+    """Agent that understands business queries and recommends locations"""
+    
+    def __init__(self):
+        # Use a capable model for understanding business intent
+        self.llm = get_groq_llm(temperature=0)
+        if self.llm is None:
+            raise ValueError("GROQ_API_KEY environment variable is not set")
+        
+        self.recommender = get_recommender()
+        
+        # Per-agent memo of extractions; callers get a copy of the cached dict
+        self._extract_cached = lru_cache(maxsize=EXTRACTION_CACHE_SIZE)(self._extract)
+        self._failed_extractions = TTLCache(maxsize=FAILED_EXTRACTION_CACHE_SIZE, ttl=FAILED_EXTRACTION_TTL)
+        self._failed_lock = threading.Lock()
+        
+        self.system_prompt = SYSTEM_PROMPT
     
     def extract_business_type(self, user_query: str) -> Dict[str, Any]:
-        """Use LLM to extract business type from user query"""
+        """Use LLM to extract business type from user query (memoized per normalized query)"""
+        normalized = " ".join(user_query.lower().split())
         
-        # First try simple keyword matching
-        query_lower = user_query.lower()
-        for business, super_cat in BUSINESS_TO_SUPER_CATEGORY.items():
-            if business in query_lower:
-                return {
-                    "business_type": business,
-                    "super_category": super_cat,
-                    "confidence": "high",
-                    "reasoning": f"Matched keyword '{business}'"
-                }
+        # Recently failed queries are answered from the negative cache until it expires
+        with self._failed_lock:
+            failed = self._failed_extractions.get(normalized)
+        if failed is not None:
+            return dict(failed)
         
-        # Use LLM for complex queries
         try:
-            messages = [self.system_prompt, HumanMessage(content=user_query)]
-            result = self.llm.invoke(messages)
-            
-            # Parse JSON response
-            response_text = result.content
-            if isinstance(response_text, list):
-                # Handle case where content is a list
-                response_text = str(response_text[0]) if response_text else ""
-            response_text = response_text.strip()
-            
-            # Handle markdown code blocks
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-            
-            parsed = json.loads(response_text)
-            
-            # Validate super category
-            if parsed.get("super_category") and parsed["super_category"] not in VALID_SUPER_CATEGORIES:
-                # Try to find closest match
-                parsed["super_category"] = self._find_closest_category(parsed["super_category"])
-            
-            return parsed
-            
+            return dict(self._extract_cached(normalized))
         except Exception as e:
-            return {
+            # Failures stay out of the lru_cache; they are remembered only for
+            # FAILED_EXTRACTION_TTL so the LLM gets another try afterwards
+            failed = {
                 "business_type": None,
                 "super_category": None,
                 "confidence": "low",
                 "reasoning": f"Error processing query: {str(e)}"
             }
+            with self._failed_lock:
+                self._failed_extractions[normalized] = failed
+            return dict(failed)
+    
+    def _extract(self, query: str) -> Dict[str, Any]:
+        """Keyword match, else LLM extraction; raises if the LLM call or its JSON fails"""
+        # First try simple keyword matching
+        match = match_business_keyword(query)
+        if match:
+            business, super_cat = match
+            return {
+                "business_type": business,
+                "super_category": super_cat,
+                "confidence": "high",
+                "reasoning": f"Matched keyword '{business}'"
+            }
+        
+        # Use LLM for complex queries
+        messages = [self.system_prompt, HumanMessage(content=query)]
+        result = self.llm.invoke(messages)
+        
+        # Parse JSON response
+        response_text = result.content
+        if isinstance(response_text, list):
+            # Handle case where content is a list
+            response_text = str(response_text[0]) if response_text else ""
+        
+        # Handles replies wrapped in markdown code blocks
+        parsed = parse_llm_json(response_text)
+        
+        # Validate super category
+        if parsed.get("super_category") and parsed["super_category"] not in VALID_SUPER_CATEGORIES_SET:
+            # Try to find closest match
+            parsed["super_category"] = self._find_closest_category(parsed["super_category"])
+        
+        return parsed
     
     def _find_closest_category(self, category: str) -> str:
         """Find closest matching super category"""
         category_lower = category.lower()
-        for valid_cat in VALID_SUPER_CATEGORIES:
-            if category_lower in valid_cat.lower() or valid_cat.lower() in category_lower:
+        for valid_lower, valid_cat in _VALID_CATEGORIES_LOWER:
+            if category_lower in valid_lower or valid_lower in category_lower:
                 return valid_cat
         return "Other / Misc"
     
@@ -249,12 +327,7 @@ Examples:
         extraction = self.extract_business_type(user_query)
         
         if not extraction.get("super_category"):
-            return {
-                "success": False,
-                "error": "Could not understand the business type from your query",
-                "extraction": extraction,
-                "recommendations": []
-            }
+            return self._extraction_failed(extraction)
         
         # Step 2: Get location recommendations
         super_category = extraction["super_category"]
@@ -268,6 +341,47 @@ Examples:
         else:
             recommendations = self.recommender.find_best_locations(super_category, isochrone_radius_km)
         
+        # Step 3: Format response
+        return self._format_response(user_query, extraction, recommendations, isochrone_radius_km)
+    
+    async def arecommend_locations(self, user_query: str, isochrone_radius_km: float = 1.0,
+                                   deep_research: bool = False) -> Dict[str, Any]:
+        """
+        Async recommend_locations for async endpoints. Extraction and database
+        work run in worker threads; the isochrone fan-out (and, with
+        deep_research, the area research) is awaited without holding a thread.
+        """
+        extraction = await asyncio.to_thread(self.extract_business_type, user_query)
+        
+        if not extraction.get("super_category"):
+            return self._extraction_failed(extraction)
+        
+        super_category = extraction["super_category"]
+        business_type = extraction.get("business_type", super_category)
+        
+        if deep_research:
+            recommendations = await self.recommender.arecommend_with_research(
+                super_category, business_type, isochrone_radius_km
+            )
+        else:
+            recommendations = await self.recommender.afind_best_locations(
+                super_category, isochrone_radius_km
+            )
+        
+        return self._format_response(user_query, extraction, recommendations, isochrone_radius_km)
+    
+    def _extraction_failed(self, extraction: Dict[str, Any]) -> Dict[str, Any]:
+        """Response when no business type could be extracted"""
+        return {
+            "success": False,
+            "error": "Could not understand the business type from your query",
+            "extraction": extraction,
+            "recommendations": []
+        }
+    
+    def _format_response(self, user_query: str, extraction: Dict[str, Any], recommendations: Dict,
+                         isochrone_radius_km: float) -> Dict[str, Any]:
+        """Final response for a query from its extraction and recommendations"""
         if "error" in recommendations:
             return {
                 "success": False,
@@ -276,12 +390,11 @@ Examples:
                 "recommendations": []
             }
         
-        # Step 3: Format response
         return {
             "success": True,
             "query": user_query,
             "business_type": extraction.get("business_type"),
-            "super_category": super_category,
+            "super_category": extraction["super_category"],
             "confidence": extraction.get("confidence"),
             "reasoning": extraction.get("reasoning"),
             "complementary_categories": recommendations.get("complementary_categories", []),
@@ -301,18 +414,20 @@ Examples:
         
         top_3 = recommendations["recommendations"][:3]
         
-        message = f"Based on my analysis for **{business}** ({super_cat}), here are the top 3 recommended areas:\n\n"
-        
-        for i, rec in enumerate(top_3, 1):
-            message += f"**{i}. {rec['area']}** - Score: {rec['composite_score']}/100\n"
-            message += f"   - Area Score: {rec['area_score']} | "
-            message += f"Opportunity: {rec['opportunity_score']} ({rec['competitors']} competitors) | "
-            message += f"Ecosystem: {rec['ecosystem_score']} ({rec['complementary']} complementary businesses)\n\n"
-        
-        message += f"\n💡 **Recommendation:** Start with **{top_3[0]['area']}** - it has the best balance of "
-        message += f"location factors, low competition, and a strong ecosystem of complementary businesses."
+        parts = [f"Based on my analysis for **{business}** ({super_cat}), here are the top 3 recommended areas:\n\n"]
+        parts.extend(
+            f"**{i}. {rec['area']}** - Score: {rec['composite_score']}/100\n"
+            f"   - Area Score: {rec['area_score']} | "
+            f"Opportunity: {rec['opportunity_score']} ({rec['competitors']} competitors) | "
+            f"Ecosystem: {rec['ecosystem_score']} ({rec['complementary']} complementary businesses)\n\n"
+            for i, rec in enumerate(top_3, 1)
+        )
+        parts.append(
+            f"\n💡 **Recommendation:** Start with **{top_3[0]['area']}** - it has the best balance of "
+            f"location factors, low competition, and a strong ecosystem of complementary businesses."
+        )
         
-        return message
+        return "".join(parts)
 
 
 # Singleton instance
@@ -5,23 +5,62 @@ for business location and area analysis recommendations.
 """
 import os
 import asyncio
-from typing import Dict, List, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 
 try:
-    from tavily import TavilyClient
+    import httpx
     TAVILY_AVAILABLE = True
 except ImportError:
     TAVILY_AVAILABLE = False
 
-from langchain_groq import ChatGroq
+# HTTP/2 lets concurrent searches share one connection (needs the h2 package)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from pydantic import BaseModel, Field
+from app.core.llm import get_groq_llm
+from app.core.io_loop import run_sync, await_on_io_loop
 
 # Initialize clients
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# Thread pool for parallel searches
-executor = ThreadPoolExecutor(max_workers=3)
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+TAVILY_TIMEOUT_S = 10.0
+
+# Tavily search queries per research call (str.format templates)
+AREA_QUERY_TEMPLATES = (
+    "{business_type} business in {area} {city} market trends 2024 2025",
+    "{area} {city} commercial real estate footfall business environment",
+    "starting {business_type} in {area} Delhi challenges opportunities",
+)
+CATEGORY_QUERY_TEMPLATES = (
+    "{category} business market potential {area} {city} 2024 2025",
+    "{category} industry trends Delhi NCR growth opportunities",
+    "successful {category} businesses {area} {city} case study",
+)
+
+# Search results included in the LLM context per research call, the
+# characters kept from each, and the opening used to spot duplicate copies
+MAX_CONTEXT_SOURCES = 8
+MAX_SOURCE_CHARS = 400
+SOURCE_PREFIX_CHARS = 80
+
+class AreaResearchReport(BaseModel):
+    """Structured LLM output for one area / business type"""
+    pros: List[str] = Field(description="Specific pros of opening the business in the area")
+    cons: List[str] = Field(description="Specific cons of opening the business in the area")
+    market_insights: str = Field(description="2-3 sentence market insight summary")
+
+
+class CategoryResearchReport(BaseModel):
+    """Structured LLM output for one business category / area"""
+    market_potential: str = Field(description="2-3 sentence market potential assessment")
+    trends: List[str] = Field(description="Relevant market trends")
+    opportunities: List[str] = Field(description="Specific opportunities")
+    challenges: List[str] = Field(description="Specific challenges")
 
 
 class DeepResearchAgent:
@@ -29,44 +68,98 @@ class DeepResearchAgent:
     
     def __init__(self):
         if TAVILY_AVAILABLE and TAVILY_API_KEY:
-            self.tavily = TavilyClient(api_key=TAVILY_API_KEY)
+            # One pooled, keep-alive session for every Tavily search this agent makes
+            self.tavily = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=TAVILY_TIMEOUT_S,
+                headers={"Authorization": f"Bearer {TAVILY_API_KEY}"}
+            )
         else:
             self.tavily = None
         
-        if GROQ_API_KEY:
-            self.llm = ChatGroq(
-                model="openai/gpt-oss-120b",
-                api_key=GROQ_API_KEY,
-                temperature=0.3
-            )  # type: ignore
-        else:
-            self.llm = None
+        self.llm = get_groq_llm(temperature=0.3)
+        if self.llm is not None:
+            self.area_report_llm = self.llm.with_structured_output(AreaResearchReport)
+            self.category_report_llm = self.llm.with_structured_output(CategoryResearchReport)
     
     def is_available(self) -> bool:
         """Check if research capabilities are available"""
         return self.tavily is not None and self.llm is not None
     
-    def _search_tavily(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+    async def _search_tavily(self, query: str, max_results: int = 5) -> Dict[str, Any]:
         """Perform a Tavily search and return results"""
         if not self.tavily:
             return {"results": [], "answer": None}
         
         try:
-            response = self.tavily.search(
-                query=query,
-                search_depth="basic",
-                max_results=max_results,
-                include_answer=True
-            )
-            return response if isinstance(response, dict) else {"results": [], "answer": None}
+            response = await self.tavily.post(TAVILY_SEARCH_URL, json={
+                "query": query,
+                "search_depth": "basic",
+                "max_results": max_results,
+                "include_answer": True
+            })
+            response.raise_for_status()
+            data = response.json()
+            return data if isinstance(data, dict) else {"results": [], "answer": None}
         except Exception as e:
             print(f"Tavily search error: {e}")
             return {"results": [], "answer": None}
     
-    def _summarize_with_llm(self, context: str, prompt: str) -> str:
-        """Use LLM to summarize and extract insights from search results"""
+    async def _search_all(self, queries: List[str], max_results: int = 5) -> Tuple[List[Dict], List[str], List[str]]:
+        """
+        Run Tavily searches concurrently; returns (results, source urls, answers) in query order.
+        A page returned by several queries is kept once, so it isn't repeated in the LLM context.
+        """
+        responses = await asyncio.gather(*(self._search_tavily(query, max_results) for query in queries))
+        
+        all_results = []
+        all_sources: Dict[str, None] = {}  # insertion-ordered set
+        answer_parts = []
+        for response in responses:
+            for r in response.get("results") or []:
+                url = r.get("url")
+                if url:
+                    if url in all_sources:
+                        continue
+                    all_sources[url] = None
+                all_results.append(r)
+            if response.get("answer"):
+                answer_parts.append(response["answer"])
+        return all_results, list(all_sources), answer_parts
+    
+    def _build_context(self, all_results: List[Dict], answer_parts: List[str]) -> str:
+        """
+        LLM context: quick answers (if any) then up to MAX_CONTEXT_SOURCES results,
+        each trimmed to MAX_SOURCE_CHARS and skipped if its opening repeats an
+        earlier source (syndicated copies of the same article)
+        """
+        parts = []
+        if answer_parts:
+            parts.extend(("Quick Answers:\n", "\n".join(answer_parts), "\n\nDetailed Results:\n"))
+        
+        seen_prefixes = set()
+        included = 0
+        for r in all_results:
+            if included == MAX_CONTEXT_SOURCES:
+                break
+            content = r.get('content') or ''
+            prefix = content[:SOURCE_PREFIX_CHARS]
+            if prefix and prefix in seen_prefixes:
+                continue
+            seen_prefixes.add(prefix)
+            if included:
+                parts.append("\n\n")
+            parts.extend(("Source: ", r.get('title', 'Unknown'), "\n", content[:MAX_SOURCE_CHARS]))
+            included += 1
+        return "".join(parts)
+    
+    async def _report_with_llm(self, structured_llm, context: str, prompt: str) -> Optional[BaseModel]:
+        """
+        Summarize search results into a structured report in one LLM call
+        (the search context is sent once for every field of the report)
+        """
         if not self.llm:
-            return ""
+            return None
         
         try:
             full_prompt = f"""Based on the following web search results, {prompt}
@@ -77,14 +170,17 @@ Web Search Results:
 Provide a concise, factual response. Focus on recent information and cite specific details when available.
 If the search results don't contain relevant information, say so briefly."""
             
-            response = self.llm.invoke(full_prompt)
-            content = response.content
-            return content if isinstance(content, str) else str(content)
+            return await structured_llm.ainvoke(full_prompt)
         except Exception as e:
             print(f"LLM summarization error: {e}")
-            return ""
+            return None
     
     def research_area_for_business(self, area: str, business_type: str, city: str = "Delhi") -> Dict[str, Any]:
+        """Synchronous wrapper around research_area_for_business_async"""
+        return run_sync(self.research_area_for_business_async(area, business_type, city))
+    
+    async def research_area_for_business_async(self, area: str, business_type: str,
+                                               city: str = "Delhi") -> Dict[str, Any]:
         """
         Research a specific area for a business type.
         Used by Location Recommender to validate recommended areas.
@@ -104,59 +200,25 @@ If the search results don't contain relevant information, say so briefly."""
             return self._empty_research_result(area, business_type)
         
         # Search queries for comprehensive research
-        queries = [
-            f"{business_type} business in {area} {city} market trends 2024 2025",
-            f"{area} {city} commercial real estate footfall business environment",
-            f"starting {business_type} in {area} Delhi challenges opportunities"
-        ]
-        
-        all_results = []
-        all_sources = []
-        answer_parts = []
+        queries = [t.format(business_type=business_type, area=area, city=city) for t in AREA_QUERY_TEMPLATES]
         
-        for query in queries:
-            response = self._search_tavily(query, max_results=3)
-            if response.get("results"):
-                all_results.extend(response["results"])
-                all_sources.extend([r.get("url", "") for r in response["results"] if r.get("url")])
-            if response.get("answer"):
-                answer_parts.append(response["answer"])
+        all_results, all_sources, answer_parts = await self._search_all(queries, max_results=3)
         
         # Build context from search results
-        context = "\n\n".join([
-            f"Source: {r.get('title', 'Unknown')}\n{r.get('content', '')}"
-            for r in all_results[:8]  # Limit to top 8 results
-        ])
-        
-        if answer_parts:
-            context = "Quick Answers:\n" + "\n".join(answer_parts) + "\n\nDetailed Results:\n" + context
+        context = self._build_context(all_results, answer_parts)
         
-        # Extract pros and cons using LLM
-        pros_cons_prompt = f"""extract specific PROS and CONS of opening a {business_type} in {area}, {city}.
-
-Format your response EXACTLY as:
-PROS:
-- [specific pro 1]
-- [specific pro 2]
-- [specific pro 3]
-
-CONS:
-- [specific con 1]
-- [specific con 2]
-- [specific con 3]
+        # Pros, cons and market insights in one structured LLM call
+        report_prompt = f"""report on opening a {business_type} in {area}, {city}:
+- pros: 3 specific PROS
+- cons: 3 specific CONS
+- market_insights: a brief 2-3 sentence market insight summary focusing on current market conditions, customer demographics, and business viability
 
 Be specific to {area} and {business_type}. Include facts like rental costs, footfall, competition if mentioned."""
         
-        pros_cons_response = self._summarize_with_llm(context, pros_cons_prompt)
-        
-        # Parse pros and cons
-        pros, cons = self._parse_pros_cons(pros_cons_response)
-        
-        # Get market insights summary
-        insights_prompt = f"""provide a brief 2-3 sentence market insight summary for opening a {business_type} in {area}, {city}. 
-Focus on: current market conditions, customer demographics, and business viability."""
-        
-        market_insights = self._summarize_with_llm(context, insights_prompt)
+        report = await self._report_with_llm(self.area_report_llm, context, report_prompt)
+        pros = self._clean_items(report.pros) if report else []
+        cons = self._clean_items(report.cons) if report else []
+        market_insights = report.market_insights.strip() if report else ""
         
         return {
             "area": area,
@@ -165,10 +227,15 @@ Focus on: current market conditions, customer demographics, and business viabili
             "pros": pros[:4] if pros else ["Research data limited - area shows general business activity"],
             "cons": cons[:4] if cons else ["Limited specific data available for this business type"],
             "market_insights": market_insights or f"Market research for {business_type} in {area} is being analyzed.",
-            "sources": list(set(all_sources))[:5]
+            "sources": all_sources[:5]
         }
     
     def research_business_category_in_area(self, category: str, area: str, city: str = "Delhi") -> Dict[str, Any]:
+        """Synchronous wrapper around research_business_category_in_area_async"""
+        return run_sync(self.research_business_category_in_area_async(category, area, city))
+    
+    async def research_business_category_in_area_async(self, category: str, area: str,
+                                                       city: str = "Delhi") -> Dict[str, Any]:
         """
         Research a business category's potential in a specific area.
         Used by Area Business Analyzer to validate recommended categories.
@@ -188,59 +255,27 @@ Focus on: current market conditions, customer demographics, and business viabili
             return self._empty_category_research(category, area)
         
         # Search queries
-        queries = [
-            f"{category} business market potential {area} {city} 2024 2025",
-            f"{category} industry trends Delhi NCR growth opportunities",
-            f"successful {category} businesses {area} {city} case study"
-        ]
-        
-        all_results = []
-        all_sources = []
-        answer_parts = []
-        
-        for query in queries:
-            response = self._search_tavily(query, max_results=3)
-            if response.get("results"):
-                all_results.extend(response["results"])
-                all_sources.extend([r.get("url", "") for r in response["results"] if r.get("url")])
-            if response.get("answer"):
-                answer_parts.append(response["answer"])
-        
-        # Build context
-        context = "\n\n".join([
-            f"Source: {r.get('title', 'Unknown')}\n{r.get('content', '')}"
-            for r in all_results[:8]
-        ])
-        
-        if answer_parts:
-            context = "Quick Answers:\n" + "\n".join(answer_parts) + "\n\nDetailed Results:\n" + context
-        
-        # Extract market potential
-        potential_prompt = f"""assess the market potential for {category} businesses in {area}, {city}.
-Provide a brief 2-3 sentence assessment covering demand, growth prospects, and competitive landscape."""
+        queries = [t.format(category=category, area=area, city=city) for t in CATEGORY_QUERY_TEMPLATES]
         
-        market_potential = self._summarize_with_llm(context, potential_prompt)
+        all_results, all_sources, answer_parts = await self._search_all(queries, max_results=3)
         
-        # Extract trends, opportunities, challenges
-        analysis_prompt = f"""analyze {category} business opportunities in {area}, {city}.
-
-Format your response EXACTLY as:
-TRENDS:
-- [trend 1]
-- [trend 2]
-
-OPPORTUNITIES:
-- [opportunity 1]
-- [opportunity 2]
-
-CHALLENGES:
-- [challenge 1]
-- [challenge 2]
+        # Build context from search results
+        context = self._build_context(all_results, answer_parts)
+        
+        # Market potential, trends, opportunities and challenges in one structured LLM call
+        report_prompt = f"""analyze {category} business opportunities in {area}, {city}:
+- market_potential: a brief 2-3 sentence assessment covering demand, growth prospects, and competitive landscape
+- trends: 2 market trends
+- opportunities: 2 specific opportunities
+- challenges: 2 specific challenges
 
 Be specific and factual based on the search results."""
         
-        analysis_response = self._summarize_with_llm(context, analysis_prompt)
-        trends, opportunities, challenges = self._parse_trends_analysis(analysis_response)
+        report = await self._report_with_llm(self.category_report_llm, context, report_prompt)
+        market_potential = report.market_potential.strip() if report else ""
+        trends = self._clean_items(report.trends) if report else []
+        opportunities = self._clean_items(report.opportunities) if report else []
+        challenges = self._clean_items(report.challenges) if report else []
         
         return {
             "category": category,
@@ -249,81 +284,52 @@ Be specific and factual based on the search results."""
             "trends": trends[:3] if trends else ["Growing demand for quality services"],
             "opportunities": opportunities[:3] if opportunities else ["Underserved market segments exist"],
             "challenges": challenges[:3] if challenges else ["Competition from established players"],
-            "sources": list(set(all_sources))[:5]
+            "sources": all_sources[:5]
         }
     
     def research_multiple_areas(self, areas: List[str], business_type: str, city: str = "Delhi") -> List[Dict]:
         """Research multiple areas in parallel for a business type"""
         if not self.is_available():
             return [self._empty_research_result(area, business_type) for area in areas]
-        
-        results = []
-        for area in areas[:3]:  # Limit to top 3
-            result = self.research_area_for_business(area, business_type, city)
-            results.append(result)
-        
-        return results
+        return run_sync(self.research_multiple_areas_async(areas, business_type, city))
+    
+    async def aresearch_multiple_areas(self, areas: List[str], business_type: str,
+                                       city: str = "Delhi") -> List[Dict]:
+        """research_multiple_areas for async callers on any event loop (no thread is blocked)"""
+        if not self.is_available():
+            return [self._empty_research_result(area, business_type) for area in areas]
+        return await await_on_io_loop(self.research_multiple_areas_async(areas, business_type, city))
+    
+    async def research_multiple_areas_async(self, areas: List[str], business_type: str,
+                                            city: str = "Delhi") -> List[Dict]:
+        """Research up to 3 areas concurrently on the shared I/O loop"""
+        return list(await asyncio.gather(*(
+            self.research_area_for_business_async(area, business_type, city)
+            for area in areas[:3]  # Limit to top 3
+        )))
     
     def research_multiple_categories(self, categories: List[str], area: str, city: str = "Delhi") -> List[Dict]:
         """Research multiple business categories in parallel for an area"""
         if not self.is_available():
             return [self._empty_category_research(cat, area) for cat in categories]
-        
-        results = []
-        for category in categories[:3]:  # Limit to top 3
-            result = self.research_business_category_in_area(category, area, city)
-            results.append(result)
-        
-        return results
+        return run_sync(self.research_multiple_categories_async(categories, area, city))
     
-    def _parse_pros_cons(self, text: str) -> tuple:
-        """Parse PROS and CONS from LLM response"""
-        pros = []
-        cons = []
-        
-        current_section = None
-        for line in text.split('\n'):
-            line = line.strip()
-            if 'PROS:' in line.upper():
-                current_section = 'pros'
-            elif 'CONS:' in line.upper():
-                current_section = 'cons'
-            elif line.startswith('-') or line.startswith('•'):
-                item = line.lstrip('-•').strip()
-                if item and len(item) > 5:
-                    if current_section == 'pros':
-                        pros.append(item)
-                    elif current_section == 'cons':
-                        cons.append(item)
-        
-        return pros, cons
+    async def research_multiple_categories_async(self, categories: List[str], area: str,
+                                                 city: str = "Delhi") -> List[Dict]:
+        """Research up to 3 categories concurrently on the shared I/O loop"""
+        return list(await asyncio.gather(*(
+            self.research_business_category_in_area_async(category, area, city)
+            for category in categories[:3]  # Limit to top 3
+        )))
     
-    def _parse_trends_analysis(self, text: str) -> tuple:
-        """Parse TRENDS, OPPORTUNITIES, CHALLENGES from LLM response"""
-        trends = []
-        opportunities = []
-        challenges = []
-        
-        current_section = None
-        for line in text.split('\n'):
-            line = line.strip()
-            if 'TRENDS:' in line.upper():
-                current_section = 'trends'
-            elif 'OPPORTUNITIES:' in line.upper():
-                current_section = 'opportunities'
-            elif 'CHALLENGES:' in line.upper():
-                current_section = 'challenges'
-            elif line.startswith('-') or line.startswith('•'):
-                item = line.lstrip('-•').strip()
-                if item and len(item) > 5:
-                    if current_section == 'trends':
-                        trends.append(item)
-                    elif current_section == 'opportunities':
-                        opportunities.append(item)
-                    elif current_section == 'challenges':
-                        challenges.append(item)
-        
-        return trends, opportunities, challenges
+    def _clean_items(self, items: List[str]) -> List[str]:
+        """Strip list bullets and drop empty or trivially short report items"""
+        cleaned = []
+        for item in items:
+            item = item.strip().lstrip('-•').strip()
+            if item and len(item) > 5:
+                cleaned.append(item)
+        return cleaned
     
     def _empty_research_result(self, area: str, business_type: str) -> Dict:
         """Return empty result when research is not available"""
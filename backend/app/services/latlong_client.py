@@ -1,6 +1,439 @@
 import os
-import requests
-from typing import Dict, Any, Optional, List
+import copy
+import json
+import random
+import time
+import sqlite3
+import tempfile
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+import httpx
+from cachetools import TTLCache
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjson for faster decoding of large GeoJSON responses (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# (connect, read) timeouts in seconds for LatLong API calls
+REQUEST_TIMEOUT = (3.05, 10)
+# Pool shared by every endpoint; with HTTP/2 concurrent calls multiplex
+# over one connection instead of each holding a keep-alive socket
+CLIENT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+CLIENT_TIMEOUT = httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0])
+
+# Successful GET responses are memoized for a day, keyed on the endpoint and
+# its params. Coordinates are rounded to 4 decimals (~11 m) before the call,
+# so nearby lookups for the same spot share one entry.
+RESPONSE_CACHE_SIZE = 10_000
+RESPONSE_CACHE_TTL = 86_400
+COORD_PRECISION = 4
+COORD_PARAMS = frozenset({"lat", "lon", "latitude", "longitude"})
+
+EARTH_RADIUS_KM = 6371.0
+
+# Transient failures (connection errors, timeouts, 429/5xx) are retried with
+# full-jitter exponential backoff before a call is reported as failed
+RETRY_TOTAL = 2
+RETRY_BACKOFF_S = 0.3
+RETRY_MAX_BACKOFF_S = 2.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Client-side pacing below the provider's rate limit (requests/second,
+# shared by the sync and async clients); bursts up to the same size pass.
+# 0 or a negative value disables the limiter.
+RATE_LIMIT_PER_SEC = float(os.getenv("LATLONG_RATE_LIMIT", "10"))
+
+# Circuit breaker: after this many consecutive upstream failures, calls
+# fail fast (callers fall back, e.g. get_distance to haversine) and one
+# trial call is let through every BREAKER_RESET_S seconds
+BREAKER_FAIL_MAX = 5
+BREAKER_RESET_S = 30.0
+
+# Slow isochrone calls (the recommender's tail latency) get a backup request
+# after roughly their p95; only idempotent, expensive endpoints are hedged
+HEDGED_ENDPOINTS = frozenset({"isochrone.json"})
+HEDGE_AFTER_S = 0.5
+
+# Bulkhead: synchronous calls run on a small dedicated pool with a bounded
+# backlog, so a degraded upstream can't tie up every server worker thread;
+# once the backlog is full, calls are shed with BulkheadFull
+BULKHEAD_WORKERS = 8
+BULKHEAD_QUEUE = 32
+BULKHEAD_RETRY_AFTER_S = 5
+
+# Isochrones are a pure function of (lat, lon, distance), so they are also
+# kept on disk for 30 days and survive restarts and redeploys
+PERSISTENT_ENDPOINTS = frozenset({"isochrone.json"})
+PERSISTENT_CACHE_PATH = os.getenv("LATLONG_CACHE_PATH", os.path.join(tempfile.gettempdir(), "latlong_cache.sqlite"))
+PERSISTENT_CACHE_TTL = 30 * 86_400
+# Expired entries that carried an ETag/Last-Modified are kept this long and
+# revalidated with a conditional GET; a 304 reuses the stored body
+REVALIDATE_TTL = 90 * 86_400
+
+# "Nothing here" POI answers (niche categories in sparse cells) are common
+# and tiny: they go to their own larger, longer-lived cache so they neither
+# evict real responses nor expire with them
+NEGATIVE_CACHE_ENDPOINTS = frozenset({"point_of_interest.json"})
+NEGATIVE_CACHE_SIZE = 100_000
+NEGATIVE_CACHE_TTL = 7 * 86_400
+
+# Shared by the sync and async clients. The in-memory caches and the SQLite
+# connection have separate locks, so disk I/O never holds up memory hits.
+_response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+_response_cache_lock = threading.Lock()
+_empty_responses = TTLCache(maxsize=NEGATIVE_CACHE_SIZE, ttl=NEGATIVE_CACHE_TTL)
+_cache_stats = {"hits": 0, "misses": 0, "disk_hits": 0, "empty_hits": 0}
+_disk_cache: Optional[sqlite3.Connection] = None
+_disk_cache_lock = threading.Lock()
+_disk_cache_failed = False
+
+
+def _get_disk_cache() -> Optional[sqlite3.Connection]:
+    """Open the SQLite response cache on first use (call with the disk cache lock held)"""
+    global _disk_cache, _disk_cache_failed
+    if _disk_cache is None and not _disk_cache_failed:
+        try:
+            conn = sqlite3.connect(PERSISTENT_CACHE_PATH, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "endpoint TEXT, params_json TEXT, body TEXT, ts REAL, "
+                "etag TEXT, last_modified TEXT, "
+                "PRIMARY KEY (endpoint, params_json))"
+            )
+            # Caches created before validators were stored
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            for column in ("etag", "last_modified"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+            now = time.time()
+            conn.execute(
+                "DELETE FROM responses WHERE ts < ? OR "
+                "(ts < ? AND etag IS NULL AND last_modified IS NULL)",
+                (now - REVALIDATE_TTL, now - PERSISTENT_CACHE_TTL)
+            )
+            conn.commit()
+            _disk_cache = conn
+        except sqlite3.Error as e:
+            print(f"[LatLong] Disk cache disabled: {e}")
+            _disk_cache_failed = True
+    return _disk_cache
+
+
+def _disk_get(key: Tuple) -> Optional[Dict[str, Any]]:
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT body FROM responses WHERE endpoint = ? AND params_json = ? AND ts >= ?",
+                (key[0], json.dumps(key[1]), time.time() - PERSISTENT_CACHE_TTL)
+            ).fetchone()
+            return _loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[LatLong] Disk cache read failed: {e}")
+            return None
+
+
+def _disk_put(key: Tuple, result: Dict[str, Any], etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> None:
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(endpoint, params_json, body, ts, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?)",
+                (key[0], json.dumps(key[1]), json.dumps(result), time.time(), etag, last_modified)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[LatLong] Disk cache write failed: {e}")
+
+
+def _disk_get_validators(key: Tuple) -> Optional[Tuple[Dict[str, Any], Optional[str], Optional[str]]]:
+    """Body, ETag and Last-Modified of a stored entry that can be revalidated"""
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT body, etag, last_modified FROM responses WHERE endpoint = ? AND params_json = ? "
+                "AND (etag IS NOT NULL OR last_modified IS NOT NULL)",
+                (key[0], json.dumps(key[1]))
+            ).fetchone()
+            return (_loads(row[0]), row[1], row[2]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[LatLong] Disk cache read failed: {e}")
+            return None
+
+
+def _disk_touch(key: Tuple) -> None:
+    """Mark a revalidated (304) entry fresh again"""
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "UPDATE responses SET ts = ? WHERE endpoint = ? AND params_json = ?",
+                (time.time(), key[0], json.dumps(key[1]))
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[LatLong] Disk cache write failed: {e}")
+
+
+def _conditional_request(endpoint: str, params: Dict[str, Any]) -> Tuple[Optional[Dict[str, str]], Optional[Dict[str, Any]]]:
+    """If-None-Match / If-Modified-Since headers and the stored body to reuse on a 304"""
+    if endpoint not in PERSISTENT_ENDPOINTS:
+        return None, None
+    stored = _disk_get_validators(_cache_key(endpoint, params))
+    if stored is None:
+        return None, None
+    body, etag, last_modified = stored
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers, body
+
+
+def _read_response(endpoint: str, params: Dict[str, Any], response: httpx.Response,
+                   stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Decode a response (raising HTTPStatusError on failures, ValueError on a
+    body that isn't a JSON object). A 304 reuses the stored body; persistent
+    endpoints are written to disk with their validators.
+    """
+    if response.status_code == 304 and stored is not None:
+        _disk_touch(_cache_key(endpoint, params))
+        return stored
+    response.raise_for_status()
+    result = _loads(response.content)
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+    if endpoint in PERSISTENT_ENDPOINTS and result.get("status") == "success":
+        _disk_put(_cache_key(endpoint, params), result,
+                  response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return result
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long to wait for a token"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative queues the caller behind earlier reservations
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _NoRateLimit:
+    """Stand-in for _TokenBucket when LATLONG_RATE_LIMIT <= 0"""
+    
+    def reserve(self) -> float:
+        return 0.0
+
+
+if RATE_LIMIT_PER_SEC > 0:
+    _rate_limiter = _TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_PER_SEC)
+else:
+    print(f"[LatLong] Rate limiter disabled (LATLONG_RATE_LIMIT={RATE_LIMIT_PER_SEC:g})")
+    _rate_limiter = _NoRateLimit()
+
+
+class _CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by the sync and async clients"""
+    
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                # Half-open: this caller is the trial; others keep failing fast
+                self.opened_at = now
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        with self.lock:
+            if self.opened_at is not None:
+                print("[LatLong] Circuit closed")
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.fail_max:
+                if self.opened_at is None:
+                    print(f"[LatLong] Circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+
+
+class BulkheadFull(Exception):
+    """Raised when the LatLong bulkhead's backlog is full (shed load, retry later)"""
+    
+    def __init__(self):
+        super().__init__("LatLong API is busy, please retry shortly")
+        self.retry_after = BULKHEAD_RETRY_AFTER_S
+
+
+_LL_POOL = ThreadPoolExecutor(max_workers=BULKHEAD_WORKERS, thread_name_prefix="latlong")
+# Running plus queued calls
+_bulkhead_slots = threading.BoundedSemaphore(BULKHEAD_WORKERS + BULKHEAD_QUEUE)
+
+
+def _run_in_bulkhead(fn, *args):
+    """Run fn on the LatLong pool and wait for it, or raise BulkheadFull if saturated"""
+    if not _bulkhead_slots.acquire(blocking=False):
+        raise BulkheadFull()
+    try:
+        future = _LL_POOL.submit(fn, *args)
+    except BaseException:
+        _bulkhead_slots.release()
+        raise
+    future.add_done_callback(lambda _: _bulkhead_slots.release())
+    return future.result()
+
+
+_breaker = _CircuitBreaker(BREAKER_FAIL_MAX, BREAKER_RESET_S)
+CIRCUIT_OPEN_ERROR = {"status": "error", "error": "LatLong API unavailable (circuit open)"}
+
+
+def _is_upstream_failure(status_code: Optional[int]) -> bool:
+    """Timeouts, connection errors, 429 and 5xx count against the breaker; other 4xx don't"""
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+    if retry_after and retry_after.isdigit():
+        return min(RETRY_MAX_BACKOFF_S, float(retry_after))
+    return random.uniform(0, min(RETRY_MAX_BACKOFF_S, RETRY_BACKOFF_S * 2 ** attempt))
+
+
+def _loads(data):
+    """Decode a JSON body (bytes or str); malformed input raises ValueError"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _retry_delay(e: httpx.HTTPError, attempt: int) -> Optional[float]:
+    """Backoff before retrying a failed attempt, or None if it is final"""
+    response = e.response if isinstance(e, httpx.HTTPStatusError) else None
+    status_code = response.status_code if response is not None else None
+    if attempt >= RETRY_TOTAL or not (status_code is None or status_code in RETRY_STATUSES):
+        return None
+    return _backoff_delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+
+
+def _failure(e: Exception) -> Dict[str, Any]:
+    """
+    Error response for a failed call (an httpx error or an undecodable body),
+    counting it against the circuit breaker
+    """
+    status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+    if _is_upstream_failure(status_code):
+        _breaker.record_failure()
+    return {"status": "error", "error": str(e)}
+
+
+def _quantize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Round coordinate params so repeated lookups of the same spot match"""
+    return {
+        k: round(v, COORD_PRECISION) if k in COORD_PARAMS and isinstance(v, float) else v
+        for k, v in params.items()
+    }
+
+
+def _cache_key(endpoint: str, params: Dict[str, Any]) -> Tuple:
+    return (endpoint, tuple(sorted(params.items())))
+
+
+def _cache_get(key: Tuple) -> Optional[Dict[str, Any]]:
+    """Cached response for key, as a copy the caller may modify"""
+    result = _memory_get(key)
+    return result if result is not None else _disk_lookup(key)
+
+
+def _memory_get(key: Tuple) -> Optional[Dict[str, Any]]:
+    """In-memory tier of _cache_get (returns a copy); misses are counted by _disk_lookup"""
+    with _response_cache_lock:
+        result = _response_cache.get(key)
+        if result is None and key[0] in NEGATIVE_CACHE_ENDPOINTS:
+            result = _empty_responses.get(key)
+            if result is not None:
+                _cache_stats["empty_hits"] += 1
+        if result is not None:
+            _cache_stats["hits"] += 1
+    return copy.deepcopy(result)
+
+
+def _disk_lookup(key: Tuple) -> Optional[Dict[str, Any]]:
+    """Disk tier of _cache_get (blocking SQLite I/O for persistent endpoints)"""
+    result = _disk_get(key) if key[0] in PERSISTENT_ENDPOINTS else None
+    with _response_cache_lock:
+        if result is not None:
+            _cache_stats["disk_hits"] += 1
+            _response_cache[key] = copy.deepcopy(result)
+        _cache_stats["hits" if result is not None else "misses"] += 1
+    return result
+
+
+def _cache_put(key: Tuple, result: Dict[str, Any]) -> None:
+    """Store a copy of a successful response (anything else isn't cached)"""
+    if result.get("status") != "success":
+        return
+    result = copy.deepcopy(result)
+    with _response_cache_lock:
+        # Only an explicit empty list is "nothing here"; a payload missing
+        # data (or shaped differently) isn't pinned for the negative TTL
+        if key[0] in NEGATIVE_CACHE_ENDPOINTS and result.get("data") == []:
+            _empty_responses[key] = result
+            return
+        _response_cache[key] = result
+
+
+def cache_info() -> Dict[str, int]:
+    """Hit/miss counters and current sizes of the response caches"""
+    with _response_cache_lock:
+        return {**_cache_stats, "size": len(_response_cache), "empty_size": len(_empty_responses)}
+
 
 class LatLongClient:
     """
@@ -13,6 +446,14 @@ class LatLongClient:
         self.base_url = "https://apihub.latlong.ai/v4"
         if not self.token:
             print("Warning: LATLONG_TOKEN not set in environment variables")
+        
+        # One pooled client for every endpoint, so repeated calls reuse
+        # TCP/TLS connections instead of handshaking per request
+        self.client = httpx.Client(**self._client_options())
+        
+        # Single-flight: concurrent identical requests share one in-flight call
+        self._inflight: Dict[Tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
 
     def _get_headers(self) -> Dict[str, str]:
         """Get headers with X-Authorization-Token for LatLong API."""
@@ -20,19 +461,77 @@ class LatLongClient:
             "X-Authorization-Token": self.token
         }
 
-    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make a GET request to the LatLong API."""
+    def _client_options(self) -> Dict[str, Any]:
+        """httpx client settings shared by the sync and async clients"""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "headers": self._get_headers() if self.token else None,
+            "limits": CLIENT_LIMITS,
+            "timeout": CLIENT_TIMEOUT
+        }
+
+    def _make_request(self, endpoint: str, params: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Make a GET request to the LatLong API.
+        Served from the response cache when possible; callers asking for the
+        same request while it is in flight wait on that call instead. Every
+        caller gets its own copy, so mutating a result never alters the cache.
+        """
+        params = _quantize_params(params)
+        key = _cache_key(endpoint, params)
+        if use_cache:
+            cached = _cache_get(key)
+            if cached is not None:
+                return cached
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return copy.deepcopy(future.result())
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/{endpoint}",
-                headers=self._get_headers(),
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "error": str(e)}
+            result = self._fetch(endpoint, params)
+            if use_cache:
+                _cache_put(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
+    def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Issue the HTTP request on the bulkhead pool"""
+        return _run_in_bulkhead(self._send, endpoint, params)
+    
+    def _send(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Issue the HTTP request once the circuit breaker and rate limiter allow it"""
+        if not _breaker.allow():
+            return dict(CIRCUIT_OPEN_ERROR)
+        delay = _rate_limiter.reserve()
+        if delay:
+            time.sleep(delay)
+        headers, stored = _conditional_request(endpoint, params)
+        for attempt in range(RETRY_TOTAL + 1):
+            try:
+                response = self.client.get(f"{self.base_url}/{endpoint}", params=params, headers=headers)
+                result = _read_response(endpoint, params, response, stored)
+            except httpx.HTTPError as e:
+                delay = _retry_delay(e, attempt)
+                if delay is not None:
+                    time.sleep(delay)
+                    continue
+                return _failure(e)
+            except ValueError as e:
+                # A 200 whose body isn't JSON (e.g. a proxy's HTML error page)
+                return _failure(e)
+            _breaker.record_success()
+            return result
 
     def autocomplete(self, query: str, lat: Optional[float] = None, lon: Optional[float] = None, 
                      limit: int = 10, language: str = "en") -> Dict[str, Any]:
@@ -95,7 +594,7 @@ class LatLongClient:
         }
         return self._make_request("reverse_geocode.json", params)
 
-    def validate_address(self, address: str, lat: float, lon: float) -> Dict[str, Any]:
+    def validate_address(self, address: str, lat: float, lon: float, use_cache: bool = False) -> Dict[str, Any]:
         """
         Validate if an address matches given coordinates.
         
@@ -103,6 +602,7 @@ class LatLongClient:
             address: Address to validate
             lat: Expected latitude
             lon: Expected longitude
+            use_cache: Serve repeated validations from the response cache (default False)
         
         Returns:
             Validation results showing which components match (Colony, Locality, City, etc.)
@@ -112,7 +612,7 @@ class LatLongClient:
             "latitude": lat,
             "longitude": lon
         }
-        return self._make_request("geovalidation.json", params)
+        return self._make_request("geovalidation.json", params, use_cache=use_cache)
 
     def get_isochrone(self, lat: float, lon: float, distance_km: float = 1.0) -> Dict[str, Any]:
         """
@@ -171,6 +671,21 @@ class LatLongClient:
             
         return self._make_request("point_of_interest.json", params)
 
+    def get_distances_bulk(self, origin_lat: float, origin_lon: float,
+                           lats, lons) -> np.ndarray:
+        """
+        Aerial distances in km from one origin to many points.
+        Computed locally with a vectorized haversine (no API calls).
+        
+        Args:
+            origin_lat, origin_lon: Origin coordinates
+            lats, lons: Destination latitudes and longitudes (sequences or arrays)
+        
+        Returns:
+            float64 array of distances, one per destination
+        """
+        return haversine_km(origin_lat, origin_lon, lats, lons)
+
     # Convenience method for backward compatibility
     def get_distance(self, origin_lat: float, origin_lon: float, 
                      dest_lat: float, dest_lon: float) -> Dict[str, Any]:
@@ -193,26 +708,184 @@ class LatLongClient:
             lon=dest_lon
         )
         
-        if result.get("status") == "success" and "data" in result:
-            distance_data = result["data"].get("distance", {})
-            return {
-                "status": "success",
-                "aerial_distance": distance_data.get("aerial", "N/A"),
-                "driving_distance": distance_data.get("driving", "N/A")
-            }
-        
-        # Fallback: Calculate aerial distance manually
-        import math
-        R = 6371  # Earth's radius in km
-        lat1, lon1 = math.radians(origin_lat), math.radians(origin_lon)
-        lat2, lon2 = math.radians(dest_lat), math.radians(dest_lon)
-        dlat, dlon = lat2 - lat1, lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        distance_km = R * c
-        
+        return _distance_from_validation(result, origin_lat, origin_lon, dest_lat, dest_lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; accepts scalars or arrays (broadcast, one vectorized pass)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+def _distance_from_validation(result: Dict[str, Any], origin_lat: float, origin_lon: float,
+                              dest_lat: float, dest_lon: float) -> Dict[str, Any]:
+    """Distances from a geovalidation response, else the haversine aerial distance"""
+    if result.get("status") == "success" and "data" in result:
+        distance_data = result["data"].get("distance", {})
         return {
-            "status": "calculated",
-            "aerial_distance": f"{distance_km:.2f} km",
-            "driving_distance": "N/A"
+            "status": "success",
+            "aerial_distance": distance_data.get("aerial", "N/A"),
+            "driving_distance": distance_data.get("driving", "N/A")
         }
+
+    # Fallback: Calculate aerial distance manually
+    distance_km = float(haversine_km(origin_lat, origin_lon, dest_lat, dest_lon))
+
+    return {
+        "status": "calculated",
+        "aerial_distance": f"{distance_km:.2f} km",
+        "driving_distance": "N/A"
+    }
+
+
+class AsyncLatLongClient(LatLongClient):
+    """
+    Async variant of LatLongClient for fanning out many lookups at once.
+    Endpoint methods are inherited and return awaitables, since they all
+    delegate to _make_request (a coroutine here). The httpx connection pool
+    is bound to the shared I/O loop, so use it there (app.core.io_loop).
+    """
+    
+    def __init__(self):
+        self.token = os.getenv("LATLONG_TOKEN")
+        self.base_url = "https://apihub.latlong.ai/v4"
+        self._client: Optional[httpx.AsyncClient] = None
+        # Only touched on the I/O loop's thread, so no lock is needed
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled async HTTP client on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options())
+        return self._client
+    
+    async def _make_request(self, endpoint: str, params: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """Async _make_request (see LatLongClient._make_request)"""
+        params = _quantize_params(params)
+        key = _cache_key(endpoint, params)
+        if use_cache:
+            cached = _memory_get(key)
+            if cached is None:
+                # SQLite reads block, so they run off the event loop
+                cached = (await asyncio.to_thread(_disk_lookup, key) if endpoint in PERSISTENT_ENDPOINTS
+                          else _disk_lookup(key))
+            if cached is not None:
+                return cached
+        
+        future = self._inflight.get(key)
+        if future is not None:
+            # shield: one cancelled waiter must not cancel the shared call
+            return copy.deepcopy(await asyncio.shield(future))
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        
+        try:
+            result = await self._fetch(endpoint, params)
+            if use_cache:
+                _cache_put(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+    
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Issue the HTTP request once the circuit breaker and rate limiter allow it"""
+        if not _breaker.allow():
+            return dict(CIRCUIT_OPEN_ERROR)
+        await self._throttle()
+        if endpoint in HEDGED_ENDPOINTS:
+            return await self._send_hedged(endpoint, params)
+        return await self._send(endpoint, params)
+    
+    async def _throttle(self) -> None:
+        delay = _rate_limiter.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+    
+    async def _send_hedged(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Hedged request: if the call hasn't answered within HEDGE_AFTER_S, fire
+        an identical backup and take whichever succeeds first.
+        """
+        primary = asyncio.ensure_future(self._send(endpoint, params))
+        done, pending = await asyncio.wait({primary}, timeout=HEDGE_AFTER_S)
+        try:
+            if not done:
+                pending.add(asyncio.ensure_future(self._send_backup(endpoint, params)))
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                result = done.pop().result()
+                # An error from one copy still leaves the other in the race
+                if result.get("status") != "error" or not (done or pending):
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _send_backup(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self._throttle()
+        return await self._send(endpoint, params)
+    
+    async def _send(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Issue the HTTP request, retrying transient failures with backoff"""
+        # Persistent endpoints read and write the SQLite cache, off the event loop
+        persistent = endpoint in PERSISTENT_ENDPOINTS
+        headers, stored = (await asyncio.to_thread(_conditional_request, endpoint, params) if persistent
+                           else (None, None))
+        for attempt in range(RETRY_TOTAL + 1):
+            try:
+                response = await self._get_client().get(f"{self.base_url}/{endpoint}", params=params, headers=headers)
+                result = (await asyncio.to_thread(_read_response, endpoint, params, response, stored) if persistent
+                          else _read_response(endpoint, params, response, stored))
+            except httpx.HTTPError as e:
+                delay = _retry_delay(e, attempt)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+                return _failure(e)
+            except ValueError as e:
+                # A 200 whose body isn't JSON (e.g. a proxy's HTML error page)
+                return _failure(e)
+            _breaker.record_success()
+            return result
+    
+    async def get_distance(self, origin_lat: float, origin_lon: float,
+                           dest_lat: float, dest_lon: float) -> Dict[str, Any]:
+        """Async get_distance (see LatLongClient.get_distance)"""
+        result = await self.validate_address(
+            address="Distance calculation point",
+            lat=dest_lat,
+            lon=dest_lon
+        )
+        return _distance_from_validation(result, origin_lat, origin_lon, dest_lat, dest_lon)
+    
+    async def aclose(self) -> None:
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance (shares one connection pool across the app)
+_client = None
+
+def get_latlong_client() -> LatLongClient:
+    """Get singleton instance of LatLongClient"""
+    global _client
+    if _client is None:
+        _client = LatLongClient()
+    return _client
+
+
+_async_client = None
+
+def get_async_latlong_client() -> AsyncLatLongClient:
+    """Get singleton instance of AsyncLatLongClient"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncLatLongClient()
+    return _async_client
@@ -6,12 +6,17 @@ Finds top 3 best locations for any business type in Delhi using:
 3. Isochrone-based ecosystem score (more complementary businesses)
 """
 import os
+import asyncio
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from functools import cache
 from typing import Dict, List, Tuple, Optional
 from app.core.db import execute_query
-from app.services.latlong_client import LatLongClient
+from app.core.io_loop import run_sync, await_on_io_loop
+from app.services.latlong_client import get_latlong_client, get_async_latlong_client
 from shapely.geometry import shape, Point
-from shapely import wkt
 import json
 
 # Path to area scores CSV - /app/data inside Docker container
@@ -123,100 +128,187 @@ COMPLEMENTARY_CATEGORIES = {
 
 # Valid super categories
 VALID_SUPER_CATEGORIES = list(WEIGHTS.keys())
+# O(1) membership checks (the list keeps the order for prompts and JSON)
+VALID_SUPER_CATEGORIES_SET = frozenset(VALID_SUPER_CATEGORIES)
+
+# Most isochrone requests one recommendation keeps in flight at once
+MAX_CONCURRENT_ISOCHRONES = 10
+
+# Per-polygon POI counts when the batched query fails (each on its own pooled connection)
+_count_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix="poi-count")
+
+# Weights as a read-only (category x criterion) matrix of fractions, so scoring
+# every area for a category is one matrix-vector product
+CRITERIA = tuple(dict.fromkeys(f for weights in WEIGHTS.values() for f in weights))
+SUPER_CATEGORY_INDEX = {category: i for i, category in enumerate(WEIGHTS)}
+WEIGHTS_MATRIX = np.array(
+    [[weights.get(f, 0.0) for f in CRITERIA] for weights in WEIGHTS.values()]
+) / 100
+WEIGHTS_MATRIX.setflags(write=False)
+
+
+def _polygon_from_isochrone(result: Dict) -> Optional[str]:
+    """
+    GeoJSON geometry text from a LatLong isochrone response, or None.
+    PostGIS parses it directly (ST_GeomFromGeoJSON), so no Shapely object is built.
+    """
+    if result.get('status') == 'success' and 'data' in result:
+        geojson = result['data']
+        if 'geometry' in geojson:
+            return json.dumps(geojson['geometry'])
+    return None
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, in O(N) via np.partition.
+    Ties keep CSV order, exactly like a stable descending sort.
+    """
+    if len(scores) <= k:
+        return np.argsort(-scores, kind='stable')
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    idx = np.flatnonzero(scores >= kth)
+    return idx[np.argsort(-scores[idx], kind='stable')][:k]
+
+
+@cache
+def load_area_scores() -> Optional[pd.DataFrame]:
+    """Read the area scores CSV once per process (None if it is missing)"""
+    try:
+        areas_df = pd.read_csv(AREA_SCORES_CSV)
+    except FileNotFoundError:
+        print(f"[LocationRecommender] Warning: {AREA_SCORES_CSV} not found, using database")
+        return None
+    print(f"[LocationRecommender] Loaded {len(areas_df)} areas from CSV")
+    return areas_df
+
+
+def _area_score_matrix(areas_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Read-only area names and (area x criterion) matrix aligned with CRITERIA; criteria missing from the CSV score 0"""
+    names = areas_df['name'].to_numpy()
+    matrix = areas_df.reindex(columns=list(CRITERIA), fill_value=0.0).to_numpy(dtype=np.float64)
+    names.setflags(write=False)
+    matrix.setflags(write=False)
+    return names, matrix
+
+
+@cache
+def load_area_score_matrix() -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """_area_score_matrix of the shared area scores, built once"""
+    areas_df = load_area_scores()
+    return None if areas_df is None else _area_score_matrix(areas_df)
+
+
+@cache
+def load_area_centroids() -> Dict[str, Dict]:
+    """All area centroids as {name: {"name", "lon", "lat"}}, queried once per process"""
+    results = execute_query("SELECT name, longitude, latitude FROM area_with_centroid")
+    return {r[0]: {"name": r[0], "lon": r[1], "lat": r[2]} for r in results or []}
 
 
 class LocationRecommender:
     """Service to find best business locations using area scores and isochrone analysis"""
     
-    def __init__(self):
-        self.latlong_client = LatLongClient()
-        self._load_area_scores()
-    
-    def _load_area_scores(self):
-        """Load area scores from CSV"""
+    def __init__(self, areas_df: Optional[pd.DataFrame] = None):
+        """areas_df overrides the shared area scores (e.g. for tests)"""
+        self.latlong_client = get_latlong_client()
+        self._load_area_scores(areas_df)
         try:
-            self.areas_df = pd.read_csv(AREA_SCORES_CSV)
-            print(f"[LocationRecommender] Loaded {len(self.areas_df)} areas from CSV")
-        except FileNotFoundError:
-            print(f"[LocationRecommender] Warning: {AREA_SCORES_CSV} not found, using database")
-            self.areas_df = None
+            load_area_centroids()
+        except Exception as e:
+            print(f"[LocationRecommender] Could not preload area centroids: {e}")
+    
+    def _load_area_scores(self, areas_df: Optional[pd.DataFrame] = None):
+        """Use the process-wide area scores unless a DataFrame is given"""
+        if areas_df is None:
+            self.areas_df = load_area_scores()
+            tables = load_area_score_matrix()
+        else:
+            self.areas_df = areas_df
+            tables = _area_score_matrix(areas_df)
+        if tables is not None:
+            self._area_names, self._area_matrix = tables
+            # (area x super category) scores and each category's top 10, computed once
+            self._score_table = np.round(self._area_matrix @ WEIGHTS_MATRIX.T, 2)
+            self._top_areas = np.stack([top_k_indices(column, 10) for column in self._score_table.T])
     
     def get_area_centroids(self, area_names: List[str]) -> List[Dict]:
-        """Get centroids for given areas from PostGIS"""
+        """Get centroids for given areas (from the cached area_with_centroid table)"""
         if not area_names:
             return []
+        centroids = load_area_centroids()
+        return [centroids[name] for name in area_names if name in centroids]
+    
+    def top_area_scores(self, super_category: str) -> Tuple[List[str], List[float]]:
+        """Top 10 (area names, area scores) for a super category, best first, as plain lists"""
+        if self.areas_df is None:
+            return [], []
         
-        placeholders = ','.join(['%s'] * len(area_names))
-        query = f"""
-            SELECT name, longitude, latitude 
-            FROM area_with_centroid 
-            WHERE name IN ({placeholders})
-        """
-        results = execute_query(query, tuple(area_names))
-        if results is None:
-            return []
-        return [{"name": r[0], "lon": r[1], "lat": r[2]} for r in results]
+        cat_idx = SUPER_CATEGORY_INDEX.get(super_category, SUPER_CATEGORY_INDEX['Other / Misc'])
+        top = self._top_areas[cat_idx]
+        return self._area_names[top].tolist(), self._score_table[top, cat_idx].tolist()
     
     def calculate_area_scores(self, super_category: str) -> pd.DataFrame:
         """Calculate area scores based on super category weights, return top 10"""
-        if self.areas_df is None:
+        names, scores = self.top_area_scores(super_category)
+        if not names:
             return pd.DataFrame()
-        
-        weights = WEIGHTS.get(super_category, WEIGHTS['Other / Misc'])
-        
-        scores = []
-        for _, row in self.areas_df.iterrows():
-            score = 0.0
-            for feature, weight in weights.items():
-                if feature in row:
-                    score += (row[feature] * weight / 100)
-            
-            scores.append({
-                'area': row['name'],
-                'area_score': round(score, 2)
-            })
-        
-        result_df = pd.DataFrame(scores)
-        result_df = result_df.sort_values('area_score', ascending=False).head(10).reset_index(drop=True)
-        return result_df
+        return pd.DataFrame({'area': names, 'area_score': scores})
     
-    def get_isochrone_polygon(self, lat: float, lon: float, distance_km: float = 1.0) -> Optional[object]:
-        """Get isochrone polygon from LatLong API and return Shapely geometry"""
+    def get_isochrone_polygon(self, lat: float, lon: float, distance_km: float = 1.0) -> Optional[str]:
+        """Get isochrone polygon from LatLong API as GeoJSON geometry text"""
         try:
-            result = self.latlong_client.get_isochrone(lat, lon, distance_km)
-            if result.get('status') == 'success' and 'data' in result:
-                geojson = result['data']
-                if 'geometry' in geojson:
-                    return shape(geojson['geometry'])
-            return None
+            return _polygon_from_isochrone(self.latlong_client.get_isochrone(lat, lon, distance_km))
         except Exception as e:
             print(f"[LocationRecommender] Isochrone error: {e}")
             return None
     
+    async def _fetch_isochrone_polygons(self, points: List[Tuple[float, float]],
+                                        distance_km: float = 1.0) -> List[Optional[str]]:
+        """Fetch isochrone polygons for many points concurrently (None where a call fails)"""
+        client = get_async_latlong_client()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ISOCHRONES)
+        
+        async def fetch(lat: float, lon: float) -> Dict:
+            async with semaphore:
+                return await client.get_isochrone(lat, lon, distance_km)
+        
+        results = await asyncio.gather(*(fetch(lat, lon) for lat, lon in points), return_exceptions=True)
+        polygons = []
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"[LocationRecommender] Isochrone error: {result}")
+                polygons.append(None)
+                continue
+            try:
+                polygons.append(_polygon_from_isochrone(result))
+            except Exception as e:
+                print(f"[LocationRecommender] Isochrone error: {e}")
+                polygons.append(None)
+        return polygons
+    
     def count_pois_in_polygon(self, polygon, super_category: Optional[str] = None, 
                               complementary_categories: Optional[List[str]] = None) -> Tuple[int, int]:
         """
-        Count competitors and complementary businesses within a polygon.
-        Uses PostGIS ST_Contains for efficient spatial query.
+        Count competitors and complementary businesses within a polygon
+        (GeoJSON geometry text). Uses PostGIS ST_Contains for efficient spatial query.
         
         Returns: (competitor_count, complementary_count)
         """
         if polygon is None:
             return (0, 0)
         
-        # Convert Shapely polygon to WKT for PostGIS
-        polygon_wkt = polygon.wkt
-        
         # Count competitors (same super category)
         competitor_count = 0
         if super_category:
             query = """
                 SELECT COUNT(*) FROM points_super
                 WHERE super_category = %s
-                AND ST_Contains(ST_GeomFromText(%s, 4326), geom)
+                AND geom && ST_SetSRID(ST_GeomFromGeoJSON(%s::text), 4326)
+                AND ST_Contains(ST_SetSRID(ST_GeomFromGeoJSON(%s::text), 4326), geom)
             """
             try:
-                result = execute_query(query, (super_category, polygon_wkt))
+                result = execute_query(query, (super_category, polygon, polygon), prepared=True)
                 competitor_count = result[0][0] if result else 0
             except Exception as e:
                 print(f"[LocationRecommender] Competitor count error: {e}")
@@ -226,15 +318,15 @@ class LocationRecommender:
         # Count complementary businesses
         complementary_count = 0
         if complementary_categories:
-            placeholders = ','.join(['%s'] * len(complementary_categories))
-            query = f"""
+            query = """
                 SELECT COUNT(*) FROM points_super
-                WHERE super_category IN ({placeholders})
-                AND ST_Contains(ST_GeomFromText(%s, 4326), geom)
+                WHERE super_category = ANY(%s::text[])
+                AND geom && ST_SetSRID(ST_GeomFromGeoJSON(%s::text), 4326)
+                AND ST_Contains(ST_SetSRID(ST_GeomFromGeoJSON(%s::text), 4326), geom)
             """
             try:
-                params = tuple(complementary_categories) + (polygon_wkt,)
-                result = execute_query(query, params)
+                params = (list(complementary_categories), polygon, polygon)
+                result = execute_query(query, params, prepared=True)
                 complementary_count = result[0][0] if result else 0
             except Exception as e:
                 print(f"[LocationRecommender] Complementary count error: {e}")
@@ -242,28 +334,73 @@ class LocationRecommender:
         
         return (competitor_count, complementary_count)
     
+    def count_pois_in_polygons(self, polygons: List[str], super_category: str,
+                               complementary_categories: List[str]) -> List[Tuple[int, int]]:
+        """
+        count_pois_in_polygon for many polygons in one PostGIS round-trip:
+        the polygons are unnested as an array and both counts come from
+        FILTERed aggregates over a single join.
+        
+        Returns: [(competitor_count, complementary_count)] aligned with polygons
+        """
+        if not polygons:
+            return []
+        
+        query = """
+            WITH iso(idx, g) AS (
+                SELECT ord, ST_SetSRID(ST_GeomFromGeoJSON(geojson), 4326)
+                FROM unnest(%s::text[]) WITH ORDINALITY AS t(geojson, ord)
+            )
+            SELECT iso.idx,
+                   COUNT(p.geom) FILTER (WHERE p.super_category = %s),
+                   COUNT(p.geom) FILTER (WHERE p.super_category = ANY(%s::text[]))
+            FROM iso
+            LEFT JOIN points_super p
+              ON (p.super_category = %s OR p.super_category = ANY(%s::text[]))
+             AND p.geom && iso.g
+             AND ST_Contains(iso.g, p.geom)
+            GROUP BY iso.idx
+        """
+        complementary = list(complementary_categories)
+        try:
+            rows = execute_query(query, (
+                list(polygons),
+                super_category, complementary, super_category, complementary
+            ), prepared=True)
+        except Exception as e:
+            print(f"[LocationRecommender] Batched POI count error: {e}")
+            rows = None
+        if rows is None:
+            # Per-polygon queries in parallel (with their own bbox fallbacks)
+            return list(_count_executor.map(
+                lambda polygon: self.count_pois_in_polygon(polygon, super_category, complementary_categories),
+                polygons
+            ))
+        
+        counts = {idx: (competitors, complementary_count) for idx, competitors, complementary_count in rows}
+        return [counts.get(i, (0, 0)) for i in range(1, len(polygons) + 1)]
+    
     def _count_pois_bbox_fallback(self, polygon, categories, is_competitor: bool) -> int:
         """Fallback using bounding box if ST_Contains fails"""
-        bounds = polygon.bounds  # (minx, miny, maxx, maxy)
+        # Only this fallback needs Shapely, for the polygon's bounds
+        bounds = shape(json.loads(polygon)).bounds  # (minx, miny, maxx, maxy)
         
+        # geom && envelope (not ST_X/ST_Y ranges) so the GiST index is usable
         if is_competitor:
             query = """
                 SELECT COUNT(*) FROM points_super
                 WHERE super_category = %s
-                AND ST_X(geom) BETWEEN %s AND %s
-                AND ST_Y(geom) BETWEEN %s AND %s
+                AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
             """
-            result = execute_query(query, (categories, bounds[0], bounds[2], bounds[1], bounds[3]))
+            result = execute_query(query, (categories,) + tuple(bounds), prepared=True)
         else:
-            placeholders = ','.join(['%s'] * len(categories))
-            query = f"""
+            query = """
                 SELECT COUNT(*) FROM points_super
-                WHERE super_category IN ({placeholders})
-                AND ST_X(geom) BETWEEN %s AND %s
-                AND ST_Y(geom) BETWEEN %s AND %s
+                WHERE super_category = ANY(%s::text[])
+                AND geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
             """
-            params = tuple(categories) + (bounds[0], bounds[2], bounds[1], bounds[3])
-            result = execute_query(query, params)
+            params = (list(categories),) + tuple(bounds)
+            result = execute_query(query, params, prepared=True)
         
         return result[0][0] if result else 0
     
@@ -285,6 +422,18 @@ class LocationRecommender:
             # Higher value = higher score (for complementary)
             return ((value - min_val) / (max_val - min_val)) * 100
     
+    def normalize_scores(self, values: List[float], inverse: bool = False) -> List[float]:
+        """normalize_score for every value at once (min/max computed once, not per value)"""
+        if not values:
+            return []
+        min_val, max_val = min(values), max(values)
+        if max_val == min_val:
+            return [50.0] * len(values)
+        span = max_val - min_val
+        if inverse:
+            return [((max_val - v) / span) * 100 for v in values]
+        return [((v - min_val) / span) * 100 for v in values]
+    
     def find_best_locations(self, super_category: str, isochrone_distance_km: float = 1.0) -> Dict:
         """
         Find top 3 best locations for a business super category.
@@ -296,44 +445,74 @@ class LocationRecommender:
         Returns:
             Dict with top 3 areas and their scores
         """
-        if super_category not in VALID_SUPER_CATEGORIES:
+        prepared = self._prepare_candidates(super_category)
+        if "error" in prepared:
+            return prepared
+        polygons = run_sync(self._fetch_isochrone_polygons(
+            [(c['lat'], c['lon']) for _, c in prepared["candidates"]], isochrone_distance_km
+        ))
+        return self._score_candidates(super_category, isochrone_distance_km, prepared, polygons)
+    
+    async def afind_best_locations(self, super_category: str, isochrone_distance_km: float = 1.0) -> Dict:
+        """
+        Async find_best_locations: database work runs in worker threads and the
+        isochrone fan-out is awaited, so no thread is held during the HTTP calls.
+        """
+        prepared = await asyncio.to_thread(self._prepare_candidates, super_category)
+        if "error" in prepared:
+            return prepared
+        polygons = await await_on_io_loop(self._fetch_isochrone_polygons(
+            [(c['lat'], c['lon']) for _, c in prepared["candidates"]], isochrone_distance_km
+        ))
+        return await asyncio.to_thread(
+            self._score_candidates, super_category, isochrone_distance_km, prepared, polygons
+        )
+    
+    def _prepare_candidates(self, super_category: str) -> Dict:
+        """Steps 1-3: top 10 areas by area score, their centroids and the complementary categories"""
+        if super_category not in VALID_SUPER_CATEGORIES_SET:
             return {
                 "error": f"Invalid super category. Must be one of: {VALID_SUPER_CATEGORIES}",
                 "recommendations": []
             }
         
         # Step 1: Get top 10 areas by area score
-        top_10_df = self.calculate_area_scores(super_category)
-        if top_10_df.empty:
+        top_10_areas, top_10_scores = self.top_area_scores(super_category)
+        if not top_10_areas:
             return {"error": "Could not calculate area scores", "recommendations": []}
         
-        top_10_areas = top_10_df['area'].tolist()
-        
-        # Step 2: Get centroids for top 10 areas
-        centroids = self.get_area_centroids(top_10_areas)
-        centroid_map = {c['name']: c for c in centroids}
+        # Step 2: Look up centroids for the top 10 areas in the cached {name: centroid} table
+        centroids = load_area_centroids()
+        candidates = [
+            ({'area': area, 'area_score': area_score}, centroids[area])
+            for area, area_score in zip(top_10_areas, top_10_scores)
+            if area in centroids
+        ]
         
         # Step 3: Get complementary categories
         complementary_cats = COMPLEMENTARY_CATEGORIES.get(super_category, [])
+        return {"candidates": candidates, "complementary_cats": complementary_cats}
+    
+    def _score_candidates(self, super_category: str, isochrone_distance_km: float,
+                          prepared: Dict, polygons: List[Optional[str]]) -> Dict:
+        """Steps 4-6: count POIs in each candidate's isochrone (fetched concurrently) and rank"""
+        candidates = prepared["candidates"]
+        complementary_cats = prepared["complementary_cats"]
+        
+        # Step 4: Count POIs in every candidate's isochrone (one round-trip)
+        with_polygon = [i for i, polygon in enumerate(polygons) if polygon]
+        polygon_counts = dict(zip(with_polygon, self.count_pois_in_polygons(
+            [polygons[i] for i in with_polygon], super_category, complementary_cats
+        )))
         
-        # Step 4: For each area, get isochrone and count POIs
         results = []
-        for _, row in top_10_df.iterrows():
+        for i, (row, centroid) in enumerate(candidates):
             area_name = row['area']
             area_score = row['area_score']
             
-            centroid = centroid_map.get(area_name)
-            if not centroid:
-                continue
-            
-            # Get isochrone polygon
-            polygon = self.get_isochrone_polygon(centroid['lat'], centroid['lon'], isochrone_distance_km)
-            
             # Count POIs in isochrone
-            if polygon:
-                competitor_count, complementary_count = self.count_pois_in_polygon(
-                    polygon, super_category, complementary_cats
-                )
+            if i in polygon_counts:
+                competitor_count, complementary_count = polygon_counts[i]
             else:
                 # Fallback: use simple radius query
                 competitor_count, complementary_count = self._simple_radius_count(
@@ -356,12 +535,12 @@ class LocationRecommender:
             return {"error": "No areas found", "recommendations": []}
         
         # Step 5: Normalize opportunity and ecosystem scores
-        all_competitors = [r['competitors'] for r in results]
-        all_complementary = [r['complementary'] for r in results]
+        opportunity = self.normalize_scores([r['competitors'] for r in results], inverse=True)
+        ecosystem = self.normalize_scores([r['complementary'] for r in results], inverse=False)
         
-        for r in results:
-            r['opportunity_score'] = round(self.normalize_score(r['competitors'], all_competitors, inverse=True), 2)
-            r['ecosystem_score'] = round(self.normalize_score(r['complementary'], all_complementary, inverse=False), 2)
+        for r, opp, eco in zip(results, opportunity, ecosystem):
+            r['opportunity_score'] = round(opp, 2)
+            r['ecosystem_score'] = round(eco, 2)
             
             # Step 6: Calculate composite score
             r['composite_score'] = round(
@@ -407,22 +586,49 @@ class LocationRecommender:
         research_agent = get_research_agent()
         
         if not research_agent.is_available():
-            # Return base results with empty research
-            for rec in base_result.get("recommendations", []):
-                rec["research"] = {
-                    "pros": [],
-                    "cons": [],
-                    "market_insights": "Deep research not available. Set TAVILY_API_KEY to enable.",
-                    "sources": []
-                }
-            base_result["research_enabled"] = False
-            return base_result
+            return self._without_research(base_result)
         
         # Research top 3 areas
         top_areas = [rec['area'] for rec in base_result.get("recommendations", [])]
         research_results = research_agent.research_multiple_areas(top_areas, business_type)
+        return self._merge_area_research(base_result, research_results, business_type)
+    
+    async def arecommend_with_research(self, super_category: str, business_type: str,
+                                       isochrone_distance_km: float = 1.0) -> Dict:
+        """
+        Async recommend_with_research: the scoring runs in worker threads and
+        the isochrones and web research are awaited, so no thread is held
+        during the HTTP calls.
+        """
+        base_result = await self.afind_best_locations(super_category, isochrone_distance_km)
+        
+        if "error" in base_result:
+            return base_result
         
-        # Merge research into recommendations
+        from app.services.deep_research_agent import get_research_agent
+        research_agent = get_research_agent()
+        
+        if not research_agent.is_available():
+            return self._without_research(base_result)
+        
+        top_areas = [rec['area'] for rec in base_result.get("recommendations", [])]
+        research_results = await research_agent.aresearch_multiple_areas(top_areas, business_type)
+        return self._merge_area_research(base_result, research_results, business_type)
+    
+    def _without_research(self, base_result: Dict) -> Dict:
+        """Base results with empty research (research not configured)"""
+        for rec in base_result.get("recommendations", []):
+            rec["research"] = {
+                "pros": [],
+                "cons": [],
+                "market_insights": "Deep research not available. Set TAVILY_API_KEY to enable.",
+                "sources": []
+            }
+        base_result["research_enabled"] = False
+        return base_result
+    
+    def _merge_area_research(self, base_result: Dict, research_results: List[Dict], business_type: str) -> Dict:
+        """Attach each area's research to its recommendation"""
         research_map = {r['area']: r for r in research_results}
         for rec in base_result.get("recommendations", []):
             area_research = research_map.get(rec['area'], {})
@@ -440,52 +646,39 @@ class LocationRecommender:
     
     def _simple_radius_count(self, lat: float, lon: float, radius_km: float,
                              super_category: str, complementary_cats: List[str]) -> Tuple[int, int]:
-        """Fallback: count POIs within a simple radius (approximation)"""
-        # Approximate degrees for the radius
-        lat_delta = radius_km / 111.0  # ~111km per degree latitude
-        lon_delta = radius_km / (111.0 * abs(cos(radians(lat))))
-        
-        min_lat, max_lat = lat - lat_delta, lat + lat_delta
-        min_lon, max_lon = lon - lon_delta, lon + lon_delta
-        
-        # Count competitors
+        """Fallback: count POIs within radius_km of a point (both counts in one query)"""
+        # ST_DWithin on the stored geog column (GIST-indexed, no per-row cast)
+        # measures true metres, so the radius is a circle at any latitude
         query = """
-            SELECT COUNT(*) FROM points_super
-            WHERE super_category = %s
-            AND ST_Y(geom) BETWEEN %s AND %s
-            AND ST_X(geom) BETWEEN %s AND %s
+            SELECT COUNT(*) FILTER (WHERE super_category = %s),
+                   COUNT(*) FILTER (WHERE super_category = ANY(%s::text[]))
+            FROM points_super
+            WHERE (super_category = %s OR super_category = ANY(%s::text[]))
+            AND ST_DWithin(
+                geog,
+                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+                %s
+            )
         """
-        result = execute_query(query, (super_category, min_lat, max_lat, min_lon, max_lon))
-        competitor_count = result[0][0] if result else 0
-        
-        # Count complementary
-        if complementary_cats:
-            placeholders = ','.join(['%s'] * len(complementary_cats))
-            query = f"""
-                SELECT COUNT(*) FROM points_super
-                WHERE super_category IN ({placeholders})
-                AND ST_Y(geom) BETWEEN %s AND %s
-                AND ST_X(geom) BETWEEN %s AND %s
-            """
-            params = tuple(complementary_cats) + (min_lat, max_lat, min_lon, max_lon)
-            result = execute_query(query, params)
-            complementary_count = result[0][0] if result else 0
-        else:
-            complementary_count = 0
-        
+        complementary = list(complementary_cats)
+        result = execute_query(query, (
+            super_category, complementary, super_category, complementary, lon, lat, radius_km * 1000
+        ), prepared=True)
+        if not result:
+            return (0, 0)
+        competitor_count, complementary_count = result[0]
         return (competitor_count, complementary_count)
 
 
-# Add missing import
-from math import cos, radians
-
-
-# Singleton instance
+# Singleton instance (double-checked lock: concurrent first requests build it once)
 _recommender = None
+_recommender_lock = threading.Lock()
 
 def get_recommender() -> LocationRecommender:
     """Get singleton instance of LocationRecommender"""
     global _recommender
     if _recommender is None:
-        _recommender = LocationRecommender()
+        with _recommender_lock:
+            if _recommender is None:
+                _recommender = LocationRecommender()
     return _recommender
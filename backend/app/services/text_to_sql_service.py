@@ -1,8 +1,8 @@
 import duckdb
-import json
 import os
 from pathlib import Path
 from groq import Groq
+from app.core.llm import parse_llm_json
 from typing import Tuple, Optional, Dict, Any, List
 import pandas as pd
 import numpy as np
@@ -126,7 +126,7 @@ Do NOT include markdown formatting, code blocks, or any extra text outside the J
             )
             
             response_text = completion.choices[0].message.content
-            result = json.loads(response_text)
+            result = parse_llm_json(response_text)
             
             return result.get("sql", ""), result.get("explanation", "")
         except Exception as e:
@@ -12,9 +12,22 @@ Usage:
     python location_finder.py gym
     python location_finder.py restaurant
 """
+import numpy as np
 import pandas as pd
+import os
 import sqlite3
 import sys
+from functools import cache, lru_cache
+
+# Optional: pyarrow lets the areas CSV be cached as a Feather file next to it
+try:
+    import pyarrow  # noqa: F401
+    FEATHER_AVAILABLE = True
+except ImportError:
+    FEATHER_AVAILABLE = False
+
+AREAS_CSV = 'Delhi_Areas_All_11_Criteria_Real_Data.csv'
+AREAS_FEATHER = 'Delhi_Areas_All_11_Criteria_Real_Data.feather'
 
 
 # ============================================================================
@@ -125,26 +138,27 @@ COMPLEMENTARY_CATEGORIES = {
 # ============================================================================
 # STEP 1: AREA SCORE CALCULATION
 # ============================================================================
+def top_k_indices(scores, k):
+    """Indices of the k highest scores, best first (ties in CSV order), without a full sort"""
+    if len(scores) <= k:
+        return np.argsort(-scores, kind='stable')
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    idx = np.flatnonzero(scores >= kth)
+    return idx[np.argsort(-scores[idx], kind='stable')][:k]
+
+
+@cache
 def load_category_mapping():
-    """Load category to super category mapping"""
+    """Load category to super category mapping (parsed once per run)"""
     df = pd.read_csv('categoryAndSuper.csv')
-    category_map = {}
     
-    for _, row in df.iterrows():
-        super_cat = row['super_category']
-        cat_dict_str = row['category_dict']
-        
-        try:
-            cat_dict_str = cat_dict_str.strip('{}')
-            pairs = cat_dict_str.split(', ')
-            for pair in pairs:
-                if '=' in pair:
-                    category = pair.split('=')[0].strip().strip("'\"")
-                    category_map[category.lower()] = super_cat
-        except:
-            pass
+    # One "key=value" pair per row, split out of every category_dict at once
+    pairs = df['category_dict'].str.strip('{}').str.split(', ')
+    pairs = pd.DataFrame({'pair': pairs, 'super_category': df['super_category']}).explode('pair')
+    pairs = pairs[pairs['pair'].str.contains('=', regex=False, na=False)]
+    categories = pairs['pair'].str.split('=', n=1).str[0].str.strip().str.strip("'\"").str.lower()
     
-    return category_map
+    return dict(zip(categories, pairs['super_category']))
 
 
 def get_super_category(business_category):
@@ -153,26 +167,41 @@ def get_super_category(business_category):
     return category_map.get(business_category.lower(), 'Other / Misc')
 
 
+@cache
+def load_areas():
+    """
+    Load the area criteria table once per run. With pyarrow installed the CSV
+    is converted to Feather on first use and read from there while it is current.
+    """
+    if not FEATHER_AVAILABLE:
+        return pd.read_csv(AREAS_CSV)
+    
+    if os.path.exists(AREAS_FEATHER) and (
+        not os.path.exists(AREAS_CSV) or os.path.getmtime(AREAS_FEATHER) >= os.path.getmtime(AREAS_CSV)
+    ):
+        return pd.read_feather(AREAS_FEATHER)
+    
+    areas_df = pd.read_csv(AREAS_CSV)
+    try:
+        areas_df.to_feather(AREAS_FEATHER)
+    except OSError as e:
+        print(f"Warning: could not write {AREAS_FEATHER}: {e}")
+    return areas_df
+
+
 def calculate_area_scores(business_category):
     """Calculate area scores for all areas and return top 10"""
-    areas_df = pd.read_csv('Delhi_Areas_All_11_Criteria_Real_Data.csv')
+    areas_df = load_areas()
     super_category = get_super_category(business_category)
     weights = WEIGHTS[super_category]
     
-    scores = []
-    for _, row in areas_df.iterrows():
-        score = 0.0
-        for feature, weight in weights.items():
-            if feature in row:
-                score += (row[feature] * weight / 100)
-        
-        scores.append({
-            'Area': row['name'],
-            'Score': round(score, 2)
-        })
+    # Weighted sum of every area's criteria in one matrix-vector product
+    features = [f for f in weights if f in areas_df.columns]
+    weight_vec = np.array([weights[f] for f in features]) / 100
+    scores = np.round(areas_df[features].to_numpy(dtype=np.float64) @ weight_vec, 2)
+    top = top_k_indices(scores, 10)
     
-    result_df = pd.DataFrame(scores)
-    result_df = result_df.sort_values('Score', ascending=False).head(10).reset_index(drop=True)
+    result_df = pd.DataFrame({'Area': areas_df['name'].to_numpy()[top], 'Score': scores[top]})
     result_df.index = result_df.index + 1
     
     return result_df, super_category
@@ -181,6 +210,20 @@ def calculate_area_scores(business_category):
 # ============================================================================
 # STEP 2: COMPOSITE SCORE CALCULATION
 # ============================================================================
+def ensure_count_indexes(conn):
+    """
+    Create the indexes behind the area/category count joins if they are missing
+    (once per database): area lookups range-scan pointsArea, and the join to
+    pointsSuper checks super_category straight from the index.
+    """
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_pa_area_id ON pointsArea(area, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_ps_id_super ON pointsSuper(id, super_category)")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not create count indexes: {e}")
+
+
 def count_competitors_in_area(conn, area_name, super_category):
     """Count competitors (same super category) in the area"""
     query = """
@@ -190,9 +233,9 @@ def count_competitors_in_area(conn, area_name, super_category):
     WHERE pa.area = ? AND ps.super_category = ?
     """
     try:
-        result = pd.read_sql_query(query, conn, params=(area_name, super_category))
-        return result['competitor_count'].iloc[0]
-    except:
+        return conn.execute(query, (area_name, super_category)).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"⚠️  Competitor count failed for {area_name}: {e}")
         return 50
 
 
@@ -208,14 +251,92 @@ def count_complementary_businesses(conn, area_name, complementary_categories):
     INNER JOIN pointsArea pa ON ps.id = pa.id
     WHERE pa.area = ? AND ps.super_category IN ({placeholders})
     """
+    params = [area_name] + list(complementary_categories)
     try:
-        params = [area_name] + complementary_categories
-        result = pd.read_sql_query(query, conn, params=params)
-        return result['complementary_count'].iloc[0]
-    except:
+        return conn.execute(query, params).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"⚠️  Complementary count failed for {area_name}: {e}")
         return 30
 
 
+def count_competitors_bulk(conn, areas, super_category):
+    """Competitor counts for many areas in one grouped query: {area: count}"""
+    placeholders = ','.join('?' * len(areas))
+    query = f"""
+    SELECT pa.area, COUNT(*)
+    FROM pointsSuper ps
+    INNER JOIN pointsArea pa ON ps.id = pa.id
+    WHERE pa.area IN ({placeholders}) AND ps.super_category = ?
+    GROUP BY pa.area
+    """
+    try:
+        rows = conn.execute(query, list(areas) + [super_category]).fetchall()
+    except sqlite3.Error as e:
+        print(f"⚠️  Competitor counts failed: {e}")
+        return {area: 50 for area in areas}
+    counts = dict(rows)
+    return {area: counts.get(area, 0) for area in areas}
+
+
+def count_complementary_bulk(conn, areas, complementary_categories):
+    """Complementary business counts for many areas in one grouped query: {area: count}"""
+    if not complementary_categories:
+        return {area: 0 for area in areas}
+    
+    area_placeholders = ','.join('?' * len(areas))
+    category_placeholders = ','.join('?' * len(complementary_categories))
+    query = f"""
+    SELECT pa.area, COUNT(*)
+    FROM pointsSuper ps
+    INNER JOIN pointsArea pa ON ps.id = pa.id
+    WHERE pa.area IN ({area_placeholders}) AND ps.super_category IN ({category_placeholders})
+    GROUP BY pa.area
+    """
+    try:
+        rows = conn.execute(query, list(areas) + list(complementary_categories)).fetchall()
+    except sqlite3.Error as e:
+        print(f"⚠️  Complementary counts failed: {e}")
+        return {area: 30 for area in areas}
+    counts = dict(rows)
+    return {area: counts.get(area, 0) for area in areas}
+
+
+def normalize_counts(counts, inverse=False):
+    """Min-max scale counts to 0-100 in one pass (all 50 if they are equal); inverse: fewer is better"""
+    counts = np.asarray(counts, dtype=np.float64)
+    lo, hi = counts.min(), counts.max()
+    if hi == lo:
+        return np.full(len(counts), 50.0)
+    if inverse:
+        return (hi - counts) / (hi - lo) * 100
+    return (counts - lo) / (hi - lo) * 100
+
+
+@lru_cache(maxsize=4)
+def get_connection(db_path):
+    """
+    One SQLite connection per database, kept open for the process so its page
+    cache stays warm between queries (memory-mapped reads, 256 MB cache)
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA mmap_size = 1073741824")
+    conn.execute("PRAGMA cache_size = -262144")
+    ensure_count_indexes(conn)
+    return conn
+
+
+@lru_cache(maxsize=128)
+def query_area_counts(db_path, db_mtime, super_category, areas):
+    """
+    (competitors, complementary) for each area, from two grouped queries.
+    Cached per process; db_mtime is part of the key so a changed database is re-queried.
+    """
+    conn = get_connection(db_path)
+    competitors = count_competitors_bulk(conn, areas, super_category)
+    complementary = count_complementary_bulk(conn, areas, COMPLEMENTARY_CATEGORIES.get(super_category, []))
+    return tuple((competitors[area], complementary[area]) for area in areas)
+
+
 def calculate_opportunity_score(competitor_count, all_counts):
     """Calculate opportunity score (fewer competitors = higher score)"""
     min_val = min(all_counts)
@@ -257,21 +378,16 @@ def calculate_composite_scores(business_category, db_path=None, use_database=Fal
     
     if use_database and db_path:
         try:
-            conn = sqlite3.connect(db_path)
-            print("\n✓ Database connected")
-            print(f"✓ Querying {len(complementary_cats)} complementary categories...")
-            
-            for _, row in top_10_df.iterrows():
-                area = row['Area']
-                competitors = count_competitors_in_area(conn, area, super_category)
-                complementary = count_complementary_businesses(conn, area, complementary_cats)
+            print(f"\n✓ Querying {len(complementary_cats)} complementary categories...")
+            areas = tuple(top_10_df['Area'].tolist())
+            counts = query_area_counts(db_path, os.path.getmtime(db_path), super_category, areas)
+            for area, area_score, (competitors, complementary) in zip(areas, top_10_df['Score'].tolist(), counts):
                 results.append({
                     'Area': area,
-                    'Area_Score': row['Score'],
+                    'Area_Score': area_score,
                     'Competitors': competitors,
                     'Complementary': complementary
                 })
-            conn.close()
         except Exception as e:
             print(f"\n⚠️  Database error: {e}")
             print("⚠️  Falling back to mock data...")
@@ -292,16 +408,9 @@ def calculate_composite_scores(business_category, db_path=None, use_database=Fal
     
     results_df = pd.DataFrame(results)
     
-    # Normalize scores
-    all_competitors = results_df['Competitors'].tolist()
-    all_complementary = results_df['Complementary'].tolist()
-    
-    results_df['Opportunity_Score'] = results_df['Competitors'].apply(
-        lambda x: calculate_opportunity_score(x, all_competitors)
-    )
-    results_df['Ecosystem_Score'] = results_df['Complementary'].apply(
-        lambda x: calculate_ecosystem_score(x, all_complementary)
-    )
+    # Normalize scores (min/max computed once per column)
+    results_df['Opportunity_Score'] = normalize_counts(results_df['Competitors'].to_numpy(), inverse=True)
+    results_df['Ecosystem_Score'] = normalize_counts(results_df['Complementary'].to_numpy())
     
     # Calculate composite score
     results_df['Composite_Score'] = (
@@ -336,24 +445,24 @@ def find_best_locations(business_type, db_path=None, use_database=False):
     
     top_3, all_10 = calculate_composite_scores(business_type, db_path, use_database)
     
-    print("\n" + "="*80)
-    print("🏆 TOP 3 RECOMMENDED AREAS")
-    print("="*80)
-    
+    # Build the report and write it in one call
+    lines = ["", "="*80, "🏆 TOP 3 RECOMMENDED AREAS", "="*80]
     for idx, row in top_3.iterrows():
-        print(f"\n#{idx}. {row['Area']}")
-        print(f"   {'─'*74}")
-        print(f"   📊 Area Score:      {row['Area_Score']:6.2f}/100  (Weight: 60%)")
-        print(f"   💼 Opportunity:     {row['Opportunity_Score']:6.2f}/100  (Weight: 20%) - {row['Competitors']} competitors")
-        print(f"   🌐 Ecosystem:       {row['Ecosystem_Score']:6.2f}/100  (Weight: 20%) - {row['Complementary']} complementary")
-        print(f"   {'─'*74}")
-        print(f"   ⭐ COMPOSITE SCORE: {row['Composite_Score']:6.2f}/100")
-    
-    print("\n" + "="*80)
-    print("✅ ANALYSIS COMPLETE")
-    print("="*80)
-    print(f"\n💡 Recommendation: Start with #{top_3.index[0]} - {top_3.iloc[0]['Area']}")
-    print(f"   Composite Score: {top_3.iloc[0]['Composite_Score']}/100\n")
+        lines += [
+            f"\n#{idx}. {row['Area']}",
+            f"   {'─'*74}",
+            f"   📊 Area Score:      {row['Area_Score']:6.2f}/100  (Weight: 60%)",
+            f"   💼 Opportunity:     {row['Opportunity_Score']:6.2f}/100  (Weight: 20%) - {row['Competitors']} competitors",
+            f"   🌐 Ecosystem:       {row['Ecosystem_Score']:6.2f}/100  (Weight: 20%) - {row['Complementary']} complementary",
+            f"   {'─'*74}",
+            f"   ⭐ COMPOSITE SCORE: {row['Composite_Score']:6.2f}/100",
+        ]
+    lines += [
+        "", "="*80, "✅ ANALYSIS COMPLETE", "="*80,
+        f"\n💡 Recommendation: Start with #{top_3.index[0]} - {top_3.iloc[0]['Area']}",
+        f"   Composite Score: {top_3.iloc[0]['Composite_Score']}/100\n",
+    ]
+    print("\n".join(lines))
     
     return top_3
 
@@ -5,18 +5,24 @@ Run this after the PostGIS container is up and healthy.
 
 Usage:
     python migrate_to_postgis.py
+    python migrate_to_postgis.py --refresh   # only refresh materialized views
     
 Or from docker:
     docker compose exec backend python -m scripts.migrate_to_postgis
 """
+import io
+import multiprocessing
 import os
+import struct
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import duckdb
+import h3
 import psycopg2
 from psycopg2.extras import execute_values
 
@@ -28,6 +34,22 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "atlas_secret")
 DB_NAME = os.getenv("DB_NAME", "atlas_db")
 DUCKDB_PATH = os.getenv("DUCKDB_PATH", "/app/data/delhi.db")
 
+# H3 resolution used to pre-index points_super (~200 m hexagons)
+H3_RESOLUTION = 9
+
+# Rows fetched from DuckDB and inserted into PostGIS per batch
+MIGRATION_BATCH_SIZE = 50_000
+
+# Bulk-loaded points tables: created without a primary key (ids come from
+# DuckDB), which is added with the other indexes once the data is in
+POINTS_TABLES = ('delhi_points', 'points_area', 'points_in_city', 'points_pincode', 'points_super')
+
+# Sort memory for the post-load index builds
+INDEX_BUILD_MEMORY = os.getenv("MIGRATION_MAINTENANCE_WORK_MEM", "512MB")
+
+# Worker processes loading tables concurrently (each with its own connections)
+MIGRATION_WORKERS = int(os.getenv("MIGRATION_WORKERS", "4"))
+
 # Fallback for local development
 if not Path(DUCKDB_PATH).exists():
     DUCKDB_PATH = str(Path(__file__).parent.parent.parent / "data" / "delhi.db")
@@ -52,12 +74,74 @@ def get_postgis_connection():
     )
 
 
+def get_migration_connection():
+    """
+    PostGIS connection for bulk loading. Migrated tables are fully rebuilt
+    from DuckDB, so per-commit fsync is skipped.
+    """
+    conn = get_postgis_connection()
+    with conn.cursor() as cursor:
+        cursor.execute("SET synchronous_commit = OFF")
+    conn.commit()
+    return conn
+
+
+def iter_duckdb_batches(duck_conn, query, batch_size=MIGRATION_BATCH_SIZE):
+    """Yield query results in lists of up to batch_size rows, so a whole table never sits in memory."""
+    result = duck_conn.execute(query)
+    while True:
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+# DuckDB expression for a point's hex EWKB with SRID 4326: DuckDB's
+# little-endian WKB header (0101000000) swapped for one carrying the SRID
+# flag and SRID, followed by the unchanged x, y
+POINT_EWKB_SQL = "'0101000020E6100000' || substr(ST_AsHEXWKB(geom), 11)"
+
+# Rows with a usable point geometry
+POINT_FILTER_SQL = "geom IS NOT NULL AND NOT ST_IsEmpty(geom)"
+
+
+def point_ewkb(lon, lat):
+    """Hex EWKB for an SRID 4326 point; PostGIS reads it straight into a geometry column"""
+    # little-endian, type Point with the SRID flag, SRID, x, y
+    return struct.pack('<BIIdd', 1, 0x20000001, 4326, lon, lat).hex()
+
+
+def copy_field(value):
+    """A value in COPY text format: \\N for NULL, backslash escapes for the rest"""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Bulk-load rows with COPY ... FROM STDIN, which skips the per-row SQL
+    parsing and planning of INSERT.
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(copy_field(value) for value in row))
+        buf.write("\n")
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
 def init_postgis_schema(pg_conn):
     """Create PostGIS schema with all required tables."""
     cursor = pg_conn.cursor()
+    # Collected and sent as one multi-statement batch (one round trip)
+    statements = []
     
     # Enable PostGIS
-    cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+    statements.append("CREATE EXTENSION IF NOT EXISTS postgis;")
+    # Trigram indexes back the LIKE '%name%' lookups used for area/POI search
+    statements.append("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
     
     # Drop existing tables to ensure clean migration
     tables = [
@@ -66,10 +150,10 @@ def init_postgis_schema(pg_conn):
         'delhi_points', 'delhi_pincode', 'delhi_area', 'delhi_city'
     ]
     for table in tables:
-        cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE;")
+        statements.append(f"DROP TABLE IF EXISTS {table} CASCADE;")
     
     # Create delhi_city table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE delhi_city (
             id SERIAL PRIMARY KEY,
             name VARCHAR(255),
@@ -78,7 +162,7 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create delhi_area table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE delhi_area (
             id SERIAL PRIMARY KEY,
             name VARCHAR(255),
@@ -87,7 +171,7 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create delhi_pincode table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE delhi_pincode (
             id SERIAL PRIMARY KEY,
             name VARCHAR(50),
@@ -96,9 +180,9 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create delhi_points table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE delhi_points (
-            id SERIAL PRIMARY KEY,
+            id INTEGER,
             name VARCHAR(500),
             category VARCHAR(255),
             geom GEOMETRY(POINT, 4326)
@@ -106,7 +190,7 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create area_with_centroid table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE area_with_centroid (
             id SERIAL PRIMARY KEY,
             name VARCHAR(255),
@@ -116,7 +200,7 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create area_scores table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE area_scores (
             id SERIAL PRIMARY KEY,
             name VARCHAR(255),
@@ -136,9 +220,9 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create points_area table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE points_area (
-            id SERIAL PRIMARY KEY,
+            id INTEGER,
             name VARCHAR(500),
             category VARCHAR(255),
             geom GEOMETRY(POINT, 4326),
@@ -147,9 +231,9 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create points_in_city table (points within city boundary, no extra columns)
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE points_in_city (
-            id SERIAL PRIMARY KEY,
+            id INTEGER,
             name VARCHAR(500),
             category VARCHAR(255),
             geom GEOMETRY(POINT, 4326)
@@ -157,9 +241,9 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create points_pincode table
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE points_pincode (
-            id SERIAL PRIMARY KEY,
+            id INTEGER,
             name VARCHAR(500),
             category VARCHAR(255),
             geom GEOMETRY(POINT, 4326),
@@ -168,16 +252,20 @@ def init_postgis_schema(pg_conn):
     """)
     
     # Create points_super table (points with super_category)
-    cursor.execute("""
+    statements.append("""
         CREATE TABLE points_super (
-            id SERIAL PRIMARY KEY,
+            id INTEGER,
             name VARCHAR(500),
             category VARCHAR(255),
             geom GEOMETRY(POINT, 4326),
-            super_category VARCHAR(255)
+            super_category VARCHAR(255),
+            h3_9 BIGINT,
+            area_id INT,
+            geog GEOGRAPHY(POINT, 4326) GENERATED ALWAYS AS (geom::geography) STORED
         );
     """)
     
+    cursor.execute(";\n".join(sql.strip().rstrip(";") for sql in statements) + ";")
     pg_conn.commit()
     print("PostGIS schema created.")
 
@@ -188,38 +276,25 @@ def migrate_geometry_table(duck_conn, pg_conn, table_name, pg_table_name=None):
     cursor = pg_conn.cursor()
     
     try:
-        # Get data from DuckDB with geometry as WKT
-        query = f"SELECT id, name, ST_AsText(geom) as geom_wkt FROM {table_name}"
+        # Get data from DuckDB with geometry as WKB bytes; PostGIS decodes
+        # them directly (no WKT text to format in Python or parse on the server)
+        query = f"SELECT id, name, ST_AsWKB(geom)::BLOB as geom_wkb FROM {table_name} WHERE geom IS NOT NULL"
         rows = duck_conn.execute(query).fetchall()
         
         if not rows:
             print(f"  No data in {table_name}")
             return 0
         
-        # Insert into PostGIS
-        insert_sql = f"""
-            INSERT INTO {pg_table} (id, name, geom)
-            VALUES %s
-        """
-        
-        # Convert WKT to PostGIS geometry
-        values = []
-        for row in rows:
-            id_val, name, geom_wkt = row
-            if geom_wkt:
-                values.append((id_val, name, f"SRID=4326;{geom_wkt}"))
-        
-        if values:
-            execute_values(
-                cursor,
-                f"INSERT INTO {pg_table} (id, name, geom) VALUES %s",
-                values,
-                template="(%s, %s, ST_GeomFromEWKT(%s))"
-            )
+        execute_values(
+            cursor,
+            f"INSERT INTO {pg_table} (id, name, geom) VALUES %s",
+            rows,
+            template="(%s, %s, ST_GeomFromWKB(%s, 4326))"
+        )
         
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from {table_name} -> {pg_table}")
-        return len(values)
+        print(f"  Migrated {len(rows)} rows from {table_name} -> {pg_table}")
+        return len(rows)
         
     except Exception as e:
         print(f"  Error migrating {table_name}: {e}")
@@ -232,35 +307,23 @@ def migrate_points_table(duck_conn, pg_conn):
     cursor = pg_conn.cursor()
     
     try:
-        query = """
-            SELECT id, name, category, ST_AsText(geom) as geom_wkt 
+        query = f"""
+            SELECT id, name, category, {POINT_EWKB_SQL} as geom_ewkb
             FROM delhi_points
+            WHERE {POINT_FILTER_SQL}
         """
-        rows = duck_conn.execute(query).fetchall()
+        migrated = 0
+        for rows in iter_duckdb_batches(duck_conn, query):
+            copy_rows(cursor, "delhi_points", ("id", "name", "category", "geom"), rows)
+            migrated += len(rows)
         
-        if not rows:
+        if not migrated:
             print("  No data in delhi_points")
             return 0
         
-        # Batch insert
-        values = []
-        for row in rows:
-            id_val, name, category, geom_wkt = row
-            if geom_wkt:
-                values.append((id_val, name, category, f"SRID=4326;{geom_wkt}"))
-        
-        if values:
-            execute_values(
-                cursor,
-                "INSERT INTO delhi_points (id, name, category, geom) VALUES %s",
-                values,
-                template="(%s, %s, %s, ST_GeomFromEWKT(%s))",
-                page_size=5000
-            )
-        
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from delhi_points")
-        return len(values)
+        print(f"  Migrated {migrated} rows from delhi_points")
+        return migrated
         
     except Exception as e:
         print(f"  Error migrating delhi_points: {e}")
@@ -280,11 +343,7 @@ def migrate_area_with_centroid(duck_conn, pg_conn):
             print("  No data in areaWithCentroid")
             return 0
         
-        execute_values(
-            cursor,
-            "INSERT INTO area_with_centroid (id, name, longitude, latitude) VALUES %s",
-            rows
-        )
+        copy_rows(cursor, "area_with_centroid", ("id", "name", "longitude", "latitude"), rows)
         
         pg_conn.commit()
         print(f"  Migrated {len(rows)} rows from areaWithCentroid -> area_with_centroid")
@@ -314,16 +373,12 @@ def migrate_area_scores(duck_conn, pg_conn):
             print("  No data in areaScores")
             return 0
         
-        execute_values(
-            cursor,
-            """INSERT INTO area_scores 
-               (id, name, longitude, latitude, 
-                score_population_density, score_footfall, score_transit,
-                score_traffic, score_rent_value, score_parking,
-                score_night_activity, score_walkability, score_safety, score_poi_synergy) 
-               VALUES %s""",
-            rows
-        )
+        copy_rows(cursor, "area_scores", (
+            "id", "name", "longitude", "latitude",
+            "score_population_density", "score_footfall", "score_transit",
+            "score_traffic", "score_rent_value", "score_parking",
+            "score_night_activity", "score_walkability", "score_safety", "score_poi_synergy"
+        ), rows)
         
         pg_conn.commit()
         print(f"  Migrated {len(rows)} rows from areaScores -> area_scores")
@@ -340,40 +395,25 @@ def migrate_points_area(duck_conn, pg_conn):
     cursor = pg_conn.cursor()
     
     try:
-        # Use ROW_NUMBER to deduplicate by id
-        query = """
-            WITH ranked AS (
-                SELECT id, name, category, ST_AsText(geom) as geom_wkt, area,
-                       ROW_NUMBER() OVER (PARTITION BY id ORDER BY id) as rn
-                FROM pointsArea
-            )
-            SELECT id, name, category, geom_wkt, area
-            FROM ranked WHERE rn = 1
+        # DISTINCT ON keeps one whole row per id (a hash aggregate in DuckDB,
+        # no window sort); per-column ANY_VALUE could mix columns of duplicates
+        query = f"""
+            SELECT DISTINCT ON (id) id, name, category, {POINT_EWKB_SQL} as geom_ewkb, area
+            FROM pointsArea
+            WHERE {POINT_FILTER_SQL}
         """
-        rows = duck_conn.execute(query).fetchall()
+        migrated = 0
+        for rows in iter_duckdb_batches(duck_conn, query):
+            copy_rows(cursor, "points_area", ("id", "name", "category", "geom", "area"), rows)
+            migrated += len(rows)
         
-        if not rows:
+        if not migrated:
             print("  No data in pointsArea")
             return 0
         
-        values = []
-        for row in rows:
-            id_val, name, category, geom_wkt, area = row
-            if geom_wkt:
-                values.append((id_val, name, category, f"SRID=4326;{geom_wkt}", area))
-        
-        if values:
-            execute_values(
-                cursor,
-                "INSERT INTO points_area (id, name, category, geom, area) VALUES %s",
-                values,
-                template="(%s, %s, %s, ST_GeomFromEWKT(%s), %s)",
-                page_size=5000
-            )
-        
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from pointsArea -> points_area")
-        return len(values)
+        print(f"  Migrated {migrated} rows from pointsArea -> points_area")
+        return migrated
         
     except Exception as e:
         print(f"  Error migrating pointsArea: {e}")
@@ -386,34 +426,23 @@ def migrate_points_in_city(duck_conn, pg_conn):
     cursor = pg_conn.cursor()
     
     try:
-        query = """
-            SELECT id, name, category, ST_AsText(geom) as geom_wkt 
+        query = f"""
+            SELECT id, name, category, {POINT_EWKB_SQL} as geom_ewkb
             FROM pointsInCity
+            WHERE {POINT_FILTER_SQL}
         """
-        rows = duck_conn.execute(query).fetchall()
+        migrated = 0
+        for rows in iter_duckdb_batches(duck_conn, query):
+            copy_rows(cursor, "points_in_city", ("id", "name", "category", "geom"), rows)
+            migrated += len(rows)
         
-        if not rows:
+        if not migrated:
             print("  No data in pointsInCity")
             return 0
         
-        values = []
-        for row in rows:
-            id_val, name, category, geom_wkt = row
-            if geom_wkt:
-                values.append((id_val, name, category, f"SRID=4326;{geom_wkt}"))
-        
-        if values:
-            execute_values(
-                cursor,
-                "INSERT INTO points_in_city (id, name, category, geom) VALUES %s",
-                values,
-                template="(%s, %s, %s, ST_GeomFromEWKT(%s))",
-                page_size=5000
-            )
-        
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from pointsInCity -> points_in_city")
-        return len(values)
+        print(f"  Migrated {migrated} rows from pointsInCity -> points_in_city")
+        return migrated
         
     except Exception as e:
         print(f"  Error migrating pointsInCity: {e}")
@@ -426,34 +455,23 @@ def migrate_points_pincode(duck_conn, pg_conn):
     cursor = pg_conn.cursor()
     
     try:
-        query = """
-            SELECT id, name, category, ST_AsText(geom) as geom_wkt, pincode 
+        query = f"""
+            SELECT id, name, category, {POINT_EWKB_SQL} as geom_ewkb, pincode
             FROM pointsPincode
+            WHERE {POINT_FILTER_SQL}
         """
-        rows = duck_conn.execute(query).fetchall()
+        migrated = 0
+        for rows in iter_duckdb_batches(duck_conn, query):
+            copy_rows(cursor, "points_pincode", ("id", "name", "category", "geom", "pincode"), rows)
+            migrated += len(rows)
         
-        if not rows:
+        if not migrated:
             print("  No data in pointsPincode")
             return 0
         
-        values = []
-        for row in rows:
-            id_val, name, category, geom_wkt, pincode = row
-            if geom_wkt:
-                values.append((id_val, name, category, f"SRID=4326;{geom_wkt}", pincode))
-        
-        if values:
-            execute_values(
-                cursor,
-                "INSERT INTO points_pincode (id, name, category, geom, pincode) VALUES %s",
-                values,
-                template="(%s, %s, %s, ST_GeomFromEWKT(%s), %s)",
-                page_size=5000
-            )
-        
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from pointsPincode -> points_pincode")
-        return len(values)
+        print(f"  Migrated {migrated} rows from pointsPincode -> points_pincode")
+        return migrated
         
     except Exception as e:
         print(f"  Error migrating pointsPincode: {e}")
@@ -466,34 +484,29 @@ def migrate_points_super(duck_conn, pg_conn):
     cursor = pg_conn.cursor()
     
     try:
-        query = """
-            SELECT id, name, category, ST_AsText(geom) as geom_wkt, super_category 
+        query = f"""
+            SELECT id, name, category, ST_X(geom) as lon, ST_Y(geom) as lat, super_category
             FROM pointsSuper
+            WHERE {POINT_FILTER_SQL}
         """
-        rows = duck_conn.execute(query).fetchall()
-        
-        if not rows:
+        migrated = 0
+        for rows in iter_duckdb_batches(duck_conn, query):
+            # Python builds the rows here only because the H3 cell is computed client-side
+            values = [
+                (id_val, name, category, point_ewkb(lon, lat), super_category,
+                 h3.str_to_int(h3.latlng_to_cell(lat, lon, H3_RESOLUTION)))
+                for id_val, name, category, lon, lat, super_category in rows
+            ]
+            copy_rows(cursor, "points_super", ("id", "name", "category", "geom", "super_category", "h3_9"), values)
+            migrated += len(values)
+        
+        if not migrated:
             print("  No data in pointsSuper")
             return 0
         
-        values = []
-        for row in rows:
-            id_val, name, category, geom_wkt, super_category = row
-            if geom_wkt:
-                values.append((id_val, name, category, f"SRID=4326;{geom_wkt}", super_category))
-        
-        if values:
-            execute_values(
-                cursor,
-                "INSERT INTO points_super (id, name, category, geom, super_category) VALUES %s",
-                values,
-                template="(%s, %s, %s, ST_GeomFromEWKT(%s), %s)",
-                page_size=5000
-            )
-        
         pg_conn.commit()
-        print(f"  Migrated {len(values)} rows from pointsSuper -> points_super")
-        return len(values)
+        print(f"  Migrated {migrated} rows from pointsSuper -> points_super")
+        return migrated
         
     except Exception as e:
         print(f"  Error migrating pointsSuper: {e}")
@@ -501,11 +514,46 @@ def migrate_points_super(duck_conn, pg_conn):
         return 0
 
 
+def migration_jobs():
+    """
+    Table migrations grouped into independent jobs: the small tables share
+    one job, each large points table gets its own.
+    """
+    return [
+        [
+            (migrate_geometry_table, ("delhi_city",)),
+            (migrate_geometry_table, ("delhi_area",)),
+            (migrate_geometry_table, ("delhi_pincode",)),
+            (migrate_area_with_centroid, ()),
+            (migrate_area_scores, ()),
+        ],
+        [(migrate_points_table, ())],
+        [(migrate_points_area, ())],
+        [(migrate_points_in_city, ())],
+        [(migrate_points_pincode, ())],
+        [(migrate_points_super, ())],
+    ]
+
+
+def run_migration_job(steps):
+    """Run one job's migrate_* steps in order on its own DuckDB and PostGIS connections."""
+    duck_conn = get_duckdb_connection()
+    pg_conn = get_migration_connection()
+    try:
+        for migrate, args in steps:
+            migrate(duck_conn, pg_conn, *args)
+    finally:
+        duck_conn.close()
+        pg_conn.close()
+
+
 def create_spatial_indexes(pg_conn):
-    """Create spatial and regular indexes for performance."""
+    """Create primary keys on the points tables, then spatial and regular indexes for performance."""
     cursor = pg_conn.cursor()
+    # Index builds sort in memory instead of spilling to disk
+    cursor.execute("SELECT set_config('maintenance_work_mem', %s, false)", (INDEX_BUILD_MEMORY,))
     
-    indexes = [
+    indexes = [f"ALTER TABLE {table} ADD PRIMARY KEY (id);" for table in POINTS_TABLES] + [
         "CREATE INDEX IF NOT EXISTS idx_delhi_city_geom ON delhi_city USING GIST(geom);",
         "CREATE INDEX IF NOT EXISTS idx_delhi_area_geom ON delhi_area USING GIST(geom);",
         "CREATE INDEX IF NOT EXISTS idx_delhi_pincode_geom ON delhi_pincode USING GIST(geom);",
@@ -514,22 +562,180 @@ def create_spatial_indexes(pg_conn):
         "CREATE INDEX IF NOT EXISTS idx_points_in_city_geom ON points_in_city USING GIST(geom);",
         "CREATE INDEX IF NOT EXISTS idx_points_pincode_geom ON points_pincode USING GIST(geom);",
         "CREATE INDEX IF NOT EXISTS idx_points_super_geom ON points_super USING GIST(geom);",
+        "CREATE INDEX IF NOT EXISTS idx_points_super_geog ON points_super USING GIST(geog);",
         "CREATE INDEX IF NOT EXISTS idx_area_with_centroid_name ON area_with_centroid(LOWER(name));",
         "CREATE INDEX IF NOT EXISTS idx_area_scores_name ON area_scores(name);",
         "CREATE INDEX IF NOT EXISTS idx_points_area_area ON points_area(area);",
         "CREATE INDEX IF NOT EXISTS idx_delhi_points_category ON delhi_points(category);",
         "CREATE INDEX IF NOT EXISTS idx_points_pincode_pincode ON points_pincode(pincode);",
-        "CREATE INDEX IF NOT EXISTS idx_points_super_super_category ON points_super(super_category);",
+        # Covering: category-filtered counts can test ST_Contains / && on the
+        # included geom with an index-only scan (no heap visits once vacuumed)
+        "CREATE INDEX IF NOT EXISTS idx_points_super_super_category ON points_super(super_category) INCLUDE (geom);",
+        "CREATE INDEX IF NOT EXISTS idx_points_super_h3_9 ON points_super(h3_9);",
+        "CREATE INDEX IF NOT EXISTS idx_points_super_name_trgm ON points_super USING GIN (LOWER(name) gin_trgm_ops);",
+        "CREATE INDEX IF NOT EXISTS idx_area_with_centroid_name_trgm ON area_with_centroid USING GIN (LOWER(name) gin_trgm_ops);",
+    ]
+    
+    # All indexes in one round trip; if any fails, redo them one by one, each
+    # under its own savepoint, so the rest still get built and the error is reported
+    cursor.execute("SAVEPOINT create_indexes")
+    try:
+        cursor.execute("\n".join(indexes))
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT create_indexes")
+        for idx_sql in indexes:
+            cursor.execute("SAVEPOINT create_index")
+            try:
+                cursor.execute(idx_sql)
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT create_index")
+                print(f"  Warning creating index: {e}")
+    
+    pg_conn.commit()
+    print("Spatial indexes created.")
+
+
+def analyze_tables(pg_conn):
+    """
+    VACUUM ANALYZE the freshly loaded tables: planner statistics so spatial
+    predicates pick the GiST/btree indexes, and a current visibility map so
+    covering indexes can serve index-only scans.
+    """
+    tables = [
+        'delhi_city', 'delhi_area', 'delhi_pincode', 'delhi_points',
+        'area_with_centroid', 'area_scores', 'points_area',
+        'points_in_city', 'points_pincode', 'points_super'
     ]
+    # VACUUM cannot run inside a transaction block
+    pg_conn.commit()
+    pg_conn.autocommit = True
+    try:
+        with pg_conn.cursor() as cursor:
+            for table in tables:
+                cursor.execute(f"VACUUM (ANALYZE) {table}")
+    finally:
+        pg_conn.autocommit = False
+    print("Tables analyzed.")
+
+
+# Single-row data version the API keys its cached analyses on
+DATA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0
+    );
+"""
+BUMP_DATA_VERSION_SQL = """
+    INSERT INTO data_version (id, version) VALUES (TRUE, 1)
+    ON CONFLICT (id) DO UPDATE SET version = data_version.version + 1;
+"""
+
+
+def create_derived_tables(pg_conn):
+    """
+    Create precomputed aggregates used by the API.
+    Tables are rebuilt on every migration, so these are refreshed implicitly
+    (the DROP ... CASCADE in init_postgis_schema removes the old ones).
+    """
+    cursor = pg_conn.cursor()
     
-    for idx_sql in indexes:
+    statements = [
+        # Area polygons cut into pieces of at most 256 vertices: tighter
+        # bounding boxes and cheaper point-in-polygon tests for the GIST join.
+        # area_size (of the whole area) ranks overlapping areas below.
+        "DROP TABLE IF EXISTS delhi_area_subdivided;",
+        """
+        CREATE TABLE delhi_area_subdivided AS
+        SELECT id AS area_id, ST_Area(geom) AS area_size, ST_Subdivide(geom, 256) AS geom
+        FROM delhi_area;
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_delhi_area_subdivided_geom ON delhi_area_subdivided USING GIST(geom);",
+        # Stamp each POI with its containing area once, so area lookups
+        # become integer equi-joins instead of spatial joins. ST_Intersects
+        # (not ST_ContainsProperly) so points on subdivision seams still match.
+        # Where area polygons overlap, a POI belongs to the smallest area that
+        # contains it (lowest id on ties), so it is counted in exactly one
+        # area instead of in every overlapping one.
+        """
+        UPDATE points_super ps SET area_id = m.area_id
+        FROM (
+            SELECT DISTINCT ON (p.id) p.id, das.area_id
+            FROM points_super p
+            JOIN delhi_area_subdivided das ON ST_Intersects(das.geom, p.geom)
+            ORDER BY p.id, das.area_size, das.area_id
+        ) m
+        WHERE ps.id = m.id;
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_points_super_area_id ON points_super(area_id);",
+        # Keep area_id current for rows inserted or moved after the migration
+        # (same smallest-area rule)
+        """
+        CREATE OR REPLACE FUNCTION points_super_set_area_id() RETURNS trigger AS $$
+        BEGIN
+            SELECT das.area_id INTO NEW.area_id
+            FROM delhi_area_subdivided das
+            WHERE ST_Intersects(das.geom, NEW.geom)
+            ORDER BY das.area_size, das.area_id
+            LIMIT 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        """
+        CREATE TRIGGER trg_points_super_area_id
+        BEFORE INSERT OR UPDATE OF geom ON points_super
+        FOR EACH ROW EXECUTE FUNCTION points_super_set_area_id();
+        """,
+        # Average POI count per super category across Delhi areas
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS delhi_category_avg AS
+        SELECT super_category,
+               COUNT(*)::float / GREATEST((SELECT COUNT(*) FROM delhi_area), 1) AS avg_count
+        FROM points_super
+        GROUP BY super_category;
+        """,
+        # POI count per (area, super category), replaces the per-request
+        # spatial join between points_super and delhi_area
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS area_category_counts AS
+        SELECT da.name AS area_name, ps.super_category, COUNT(*) AS cnt
+        FROM points_super ps
+        JOIN delhi_area da ON da.id = ps.area_id
+        WHERE ps.super_category IS NOT NULL
+        GROUP BY 1, 2;
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_area_category_counts_area ON area_category_counts (LOWER(area_name));",
+        # Unique key required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_area_category_counts_key ON area_category_counts (area_name, super_category);",
+        # data_version survives re-migrations and is bumped on each one
+        DATA_VERSION_DDL,
+        BUMP_DATA_VERSION_SQL,
+    ]
+    
+    for sql in statements:
         try:
-            cursor.execute(idx_sql)
+            cursor.execute(sql)
         except Exception as e:
-            print(f"  Warning creating index: {e}")
+            print(f"  Warning creating derived table: {e}")
+            pg_conn.rollback()
+            continue
+        pg_conn.commit()
     
+    print("Derived tables created.")
+
+
+def refresh_derived_tables(pg_conn):
+    """
+    Refresh precomputed aggregates in place after POIs change, without
+    blocking readers (area_category_counts has the unique key this needs),
+    and bump data_version so the API drops its cached analyses.
+    """
+    cursor = pg_conn.cursor()
+    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY area_category_counts;")
+    cursor.execute("REFRESH MATERIALIZED VIEW delhi_category_avg;")
+    cursor.execute(BUMP_DATA_VERSION_SQL)
     pg_conn.commit()
-    print("Spatial indexes created.")
+    print("Derived tables refreshed.")
 
 
 def run_migration():
@@ -546,33 +752,33 @@ def run_migration():
         sys.exit(1)
     
     print("\nConnecting to databases...")
+    # Also installs the spatial extension once, before the workers load it
     duck_conn = get_duckdb_connection()
-    pg_conn = get_postgis_connection()
+    pg_conn = get_migration_connection()
     
     print("\nInitializing PostGIS schema...")
     init_postgis_schema(pg_conn)
     
     print("\nMigrating tables...")
     
-    # Migrate geometry tables
-    migrate_geometry_table(duck_conn, pg_conn, "delhi_city")
-    migrate_geometry_table(duck_conn, pg_conn, "delhi_area")
-    migrate_geometry_table(duck_conn, pg_conn, "delhi_pincode")
-    
-    # Migrate points
-    migrate_points_table(duck_conn, pg_conn)
-    
-    # Migrate derived tables
-    migrate_area_with_centroid(duck_conn, pg_conn)
-    migrate_area_scores(duck_conn, pg_conn)
-    migrate_points_area(duck_conn, pg_conn)
-    migrate_points_in_city(duck_conn, pg_conn)
-    migrate_points_pincode(duck_conn, pg_conn)
-    migrate_points_super(duck_conn, pg_conn)
+    # Every table has its own DuckDB read and PostGIS write, so the jobs run
+    # in parallel processes (the per-row conversion is CPU-bound Python).
+    # Spawned, not forked: DuckDB isn't fork-safe, and a forked child could
+    # reuse this process's open DuckDB instance without its worker threads.
+    with ProcessPoolExecutor(max_workers=MIGRATION_WORKERS,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        for future in [executor.submit(run_migration_job, job) for job in migration_jobs()]:
+            future.result()
     
     print("\nCreating indexes...")
     create_spatial_indexes(pg_conn)
     
+    print("\nCreating derived tables...")
+    create_derived_tables(pg_conn)
+    
+    print("\nAnalyzing tables...")
+    analyze_tables(pg_conn)
+    
     # Verify migration
     print("\nVerifying migration...")
     cursor = pg_conn.cursor()
@@ -595,4 +801,11 @@ def run_migration():
 
 
 if __name__ == "__main__":
-    run_migration()
+    if "--refresh" in sys.argv:
+        conn = get_postgis_connection()
+        try:
+            refresh_derived_tables(conn)
+        finally:
+            conn.close()
+    else:
+        run_migration()
@@ -0,0 +1,40 @@
+"""
+Regression check for area-name matching
+Landmarks must not fuzzy-match onto a similarly named area (they fall
+through to the POI-name search); typos of real areas still resolve.
+"""
+import csv
+from app.services.area_business_analyzer import AREA_SCORES_CSV, match_area_name
+
+
+def load_area_names():
+    with open(AREA_SCORES_CSV, newline='') as f:
+        return [(row['name'] or '').lower() for row in csv.DictReader(f)]
+
+
+def test_area_matching():
+    """Check landmark, exact, partial and typo lookups against the area list"""
+    names = load_area_names()
+
+    # Previously WRatio >= 70 mapped these to Saket, Siri Fort,
+    # Motilal Nehru Marg Area, Delhi Race Club and Ali
+    for landmark in ["Khan Market", "Red Fort", "Nehru Place", "IIT Delhi", "AIIMS"]:
+        match = match_area_name(landmark, names)
+        assert match is None, f"{landmark!r} matched area {names[match]!r}"
+
+    expected = {
+        "Saket": "saket",
+        "Lajpat Nagar": "lajpat nagar",
+        "dwarka": "dwarka north",     # shortest name containing it
+        "Laxmi Nagr": "laxmi nagar",  # typo
+        "rajouri gardn": "rajouri garden",
+    }
+    for query, area in expected.items():
+        match = match_area_name(query, names)
+        assert match is not None and names[match] == area, f"{query!r} -> {match and names[match]!r}"
+
+    print("✓ Area name matching OK")
+
+
+if __name__ == "__main__":
+    test_area_matching()
@@ -2,7 +2,7 @@ import random
 import duckdb
 from shapely.geometry import Point, Polygon, MultiPolygon
 import json
-from app.core.db import get_db_connection, init_db
+from app.core.duckdb_legacy import get_db_connection, init_db
 
 def generate_delhi_data():
     """